@@ -0,0 +1,227 @@
+"""
+Writes a synthetic MedDRA release: one .asc file for every type the loader maps.
+
+Terms form a consistent hierarchy (SOC > HLGT > HLT > PT > LLT) with multiaxial
+PTs, so the relation files, MDHIER and the SMQ files reference codes that exist.
+Names mix accented Latin-1 words and repeat the way MedDRA names do. At scale 1.0
+the term counts are close to a current English release.
+"""
+import argparse
+import os
+import random
+import sys
+from typing import Callable, Dict, List, Optional
+
+# Term counts of a release at scale 1.0
+BASE_COUNTS = {
+    'soc': 27,
+    'hlgt': 337,
+    'hlt': 1737,
+    'pt': 27000,
+    'llt': 85000,
+    'smq': 230,
+    'smq_content': 120000,
+}
+
+WORDS = [
+    'anémie', 'hépatite', 'fièvre', 'douleur', 'réaction', 'cardiaque', 'rénale', 'système',
+    'síndrome', 'inflamación', 'trastorno', 'infección', 'lesión', 'pulmonar', 'gástrico', 'piel',
+    'Müller', 'Ångström', 'Sjögren', 'Ménière', 'Guillain', 'Barré', 'Crohn', 'Addison',
+    'acute', 'chronic', 'disorder', 'neoplasm', 'congenital', 'vascular', 'nervous', 'ocular',
+    'hémorragie', 'oesophagite', 'fracture', 'toxicité', 'allergique', 'dermatite',
+]
+
+SEPARATOR = '$'
+
+class ReleaseGenerator:
+    """Generates the terms of a synthetic release and renders its files."""
+
+    def __init__(self, scale: float = 1.0, seed: int = 0, version: str = '28.0'):
+        self.random = random.Random(seed)
+        self.version = version
+        self.counts = {name: max(1, round(count * scale)) for name, count in BASE_COUNTS.items()}
+        self._next_code = 10000001
+        self._build_hierarchy()
+
+    def _code(self) -> int:
+        # MedDRA codes are unique across all levels
+        self._next_code += self.random.randint(1, 9)
+        return self._next_code
+
+    def _name(self, words: int) -> str:
+        name = ' '.join(self.random.choice(WORDS) for _ in range(words))
+        return name[:1].upper() + name[1:]
+
+    def _build_hierarchy(self) -> None:
+        counts = self.counts
+        self.socs = [{'code': self._code(), 'name': self._name(3), 'abbrev': f"S{position:03d}"}
+                     for position in range(counts['soc'])]
+        self.hlgts = [{'code': self._code(), 'name': self._name(3), 'soc': self.random.choice(self.socs)}
+                      for _ in range(counts['hlgt'])]
+        self.hlts = [{'code': self._code(), 'name': self._name(4), 'hlgt': self.random.choice(self.hlgts)}
+                     for _ in range(counts['hlt'])]
+
+        self.pts = []
+        for _ in range(counts['pt']):
+            # About one PT in four is linked to a second HLT (multiaxiality)
+            hlts = [self.random.choice(self.hlts)]
+            if self.random.random() < 0.25:
+                hlts.append(self.random.choice(self.hlts))
+            self.pts.append({'code': self._code(), 'name': self._name(3), 'hlts': hlts})
+
+        self.llts = []
+        for position in range(counts['llt']):
+            # Every PT is also an LLT of itself
+            pt = self.pts[position] if position < len(self.pts) else self.random.choice(self.pts)
+            name = pt['name'] if position < len(self.pts) else self._name(4)
+            code = pt['code'] if position < len(self.pts) else self._code()
+            self.llts.append({'code': code, 'name': name, 'pt': pt,
+                              'current': 'Y' if self.random.random() < 0.8 else 'N'})
+
+        self.smqs = [{'code': 20000001 + position, 'name': self._name(3), 'level': self.random.randint(1, 5)}
+                     for position in range(counts['smq'])]
+
+    # Row builders return the meaningful columns of each file; the rest are filled by type
+
+    def soc_rows(self):
+        for soc in self.socs:
+            yield {'soc_code': soc['code'], 'soc_name': soc['name'], 'soc_abbrev': soc['abbrev']}
+
+    def hlgt_rows(self):
+        for hlgt in self.hlgts:
+            yield {'hlgt_code': hlgt['code'], 'hlgt_name': hlgt['name']}
+
+    def hlt_rows(self):
+        for hlt in self.hlts:
+            yield {'hlt_code': hlt['code'], 'hlt_name': hlt['name']}
+
+    def pt_rows(self):
+        for pt in self.pts:
+            yield {'pt_code': pt['code'], 'pt_name': pt['name'],
+                   'pt_soc_code': pt['hlts'][0]['hlgt']['soc']['code']}
+
+    def llt_rows(self):
+        for llt in self.llts:
+            yield {'llt_code': llt['code'], 'llt_name': llt['name'], 'pt_code': llt['pt']['code'],
+                   'llt_currency': llt['current']}
+
+    def soc_hlgt_rows(self):
+        for hlgt in self.hlgts:
+            yield {'soc_code': hlgt['soc']['code'], 'hlgt_code': hlgt['code']}
+
+    def hlgt_hlt_rows(self):
+        for hlt in self.hlts:
+            yield {'hlgt_code': hlt['hlgt']['code'], 'hlt_code': hlt['code']}
+
+    def hlt_pt_rows(self):
+        for pt in self.pts:
+            for hlt in pt['hlts']:
+                yield {'hlt_code': hlt['code'], 'pt_code': pt['code']}
+
+    def mdhier_rows(self):
+        for pt in self.pts:
+            primary_soc = pt['hlts'][0]['hlgt']['soc']
+            for hlt in pt['hlts']:
+                hlgt = hlt['hlgt']
+                soc = hlgt['soc']
+                yield {
+                    'pt_code': pt['code'], 'hlt_code': hlt['code'], 'hlgt_code': hlgt['code'],
+                    'soc_code': soc['code'], 'pt_name': pt['name'], 'hlt_name': hlt['name'],
+                    'hlgt_name': hlgt['name'], 'soc_name': soc['name'], 'soc_abbrev': soc['abbrev'],
+                    'pt_soc_code': primary_soc['code'], 'primary_soc_fg': 'Y' if soc is primary_soc else 'N',
+                }
+
+    def intl_ord_rows(self):
+        for position, soc in enumerate(self.socs, start=1):
+            yield {'intl_ord_code': position, 'soc_code': soc['code']}
+
+    def meddra_release_rows(self):
+        yield {'meddra_version': self.version, 'language_version': self.version}
+
+    def smq_list_rows(self):
+        for smq in self.smqs:
+            yield {
+                'smq_code': smq['code'], 'smq_name': smq['name'], 'smq_level': smq['level'],
+                'smq_description': ' '.join(self._name(6) for _ in range(4)) + '.',
+                'smq_source': self._name(8), 'smq_note': self._name(5),
+                'meddra_version': self.version, 'status': 'A', 'smq_algorithm': 'N',
+            }
+
+    def smq_content_rows(self):
+        for _ in range(self.counts['smq_content']):
+            term = self.random.choice(self.llts)
+            yield {
+                'smq_code': self.random.choice(self.smqs)['code'], 'term_code': term['code'],
+                'term_level': 4 if term['code'] == term['pt']['code'] else 5,
+                'term_scope': self.random.choice((1, 2)), 'term_category': self.random.choice('ABCD'),
+                'term_weight': 0, 'term_status': 'A',
+                'term_addition_version': self.version, 'term_last_modified_version': self.version,
+            }
+
+    def builder_for(self, file_type: str) -> Optional[Callable]:
+        """Returns the row builder of a file type, if one is defined."""
+        return getattr(self, file_type.rsplit('.', 1)[0] + '_rows', None)
+
+    def filler_for(self, column_type) -> Callable[[], str]:
+        """Returns a generator of values for a column no builder fills."""
+        from sqlalchemy import Integer, Numeric, String
+
+        if isinstance(column_type, (Integer, Numeric)):
+            return lambda: str(self._code())
+        if isinstance(column_type, String) and column_type.length:
+            return lambda: self._name(2)[:column_type.length]
+        return lambda: self._name(8)
+
+def write_release(output_dir: str, scale: float = 1.0, seed: int = 0, version: str = '28.0',
+                  encoding: str = 'latin-1') -> Dict[str, int]:
+    """Writes one file per mapped type and returns the number of lines of each."""
+    from models import generate_meddra_file_mappings, get_prunable_columns
+
+    os.makedirs(output_dir, exist_ok=True)
+    generator = ReleaseGenerator(scale, seed, version)
+    line_counts = {}
+
+    for file_type, mapping in generate_meddra_file_mappings().items():
+        table = mapping['model'].__table__
+        prunable = set(get_prunable_columns(mapping['model']))
+        fillers = {col: generator.filler_for(table.c[col].type) for col in mapping['columns']}
+
+        builder = generator.builder_for(file_type)
+        rows = builder() if builder else ({} for _ in range(max(1, round(1000 * scale))))
+
+        lines = 0
+        with open(os.path.join(output_dir, file_type), 'w', encoding=encoding, newline='') as f:
+            for row in rows:
+                fields = []
+                for col in mapping['columns']:
+                    if col in row:
+                        fields.append(str(row[col]))
+                    elif col in prunable:
+                        fields.append('')
+                    else:
+                        fields.append(fillers[col]())
+                # MedDRA lines end with the separator
+                f.write(SEPARATOR.join(fields) + SEPARATOR + '\r\n')
+                lines += 1
+        line_counts[file_type] = lines
+
+    return line_counts
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Write a synthetic MedDRA release')
+    parser.add_argument('--output', required=True, help='Directory the .asc files are written to')
+    parser.add_argument('--scale', type=float, default=0.1,
+                        help='Size relative to a full release; 1.0 writes about 85k LLTs (default: 0.1)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--version', default='28.0', help='MedDRA version written in the files (default: 28.0)')
+    parser.add_argument('--encoding', default='latin-1', help='File encoding (default: latin-1)')
+    args = parser.parse_args(argv)
+
+    line_counts = write_release(args.output, args.scale, args.seed, args.version, args.encoding)
+    for file_type, lines in line_counts.items():
+        print(f"{file_type:<20} {lines:>8} lines")
+    print(f"Wrote {sum(line_counts.values())} lines to {args.output}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
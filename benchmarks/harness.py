@@ -0,0 +1,282 @@
+"""
+Measures each stage of a load against one or more databases and reports it as JSON.
+
+Files are streamed through the same components as a real load, and every chunk is
+timed at each stage:
+
+- read: the configured reader engine parsing the chunk
+- preprocess: FileProcessor._preprocess_chunk
+- records: the writer turning the frame into its payload (writer.prepare)
+- write: the writer sending the payload in its own transaction (writer.write)
+
+Rows are written under a dedicated benchmark version, which is deleted again once
+a file is measured, so tables are never dropped.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from utils.metrics import current_rss_mb, peak_rss_mb
+
+STAGES = ('read', 'preprocess', 'records', 'write')
+
+@dataclass
+class StageStats:
+    """Time, rows and highest RSS seen right after a stage, summed over chunks."""
+    seconds: float = 0.0
+    rows: int = 0
+    peak_rss_mb: float = 0.0
+
+    def add(self, seconds: float, rows: int) -> None:
+        self.seconds += seconds
+        self.rows += rows
+        self.peak_rss_mb = max(self.peak_rss_mb, current_rss_mb())
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            **asdict(self),
+            'rows_per_sec': self.rows / self.seconds if self.seconds else None,
+        }
+
+class BenchmarkHarness:
+    """Runs the stages of a load for each file against one database."""
+
+    def __init__(self, database_url: str, processing_config):
+        from config import DatabaseConfig
+        from core.file_processor import FileProcessor
+        from core.writers import get_writer
+        from database.connection import DatabaseManager
+
+        self.config = processing_config
+        self.db_manager = DatabaseManager(DatabaseConfig(url=database_url))
+        self.processor = FileProcessor(self.db_manager, processing_config)
+        self.writer = get_writer(processing_config.writer, self.db_manager)
+
+    def prepare_database(self) -> None:
+        """Creates any missing MedDRA tables; existing tables are kept as they are."""
+        import models
+        models.Base.metadata.create_all(self.db_manager.engine)
+
+    def run_file(self, file_path: str) -> Dict[str, Any]:
+        """Streams one file through every stage and returns its measurements."""
+        from utils.file_utils import get_file_type_from_path, inspect_file
+
+        file_type = get_file_type_from_path(file_path)
+        mapping = self.processor.file_mappings[file_type]
+        model_class = mapping['model']
+        stats = {stage: StageStats() for stage in STAGES}
+        result = {'file_type': file_type, 'bytes': os.path.getsize(file_path), 'rows': 0, 'error': None}
+        next_id = self._first_supplied_id(model_class.__table__)
+        result['supplied_ids'] = next_id is not None
+
+        chunks = self.processor.reader.read_chunks(
+            file_path, mapping['columns'], inspect_file(file_path)['encoding'],
+            dtypes=mapping['dtypes'], usecols=mapping['usecols']
+        )
+        start_time = time.perf_counter()
+        try:
+            self.processor._ensure_partition(model_class)
+            while True:
+                stage_start = time.perf_counter()
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                rows = len(chunk.data)
+                stats['read'].add(time.perf_counter() - stage_start, rows)
+
+                stage_start = time.perf_counter()
+                df = self.processor._preprocess_chunk(chunk.data, mapping['columns'])
+                if next_id is not None:
+                    df = df.assign(id=range(next_id, next_id + rows))
+                    next_id += rows
+                stats['preprocess'].add(time.perf_counter() - stage_start, rows)
+
+                stage_start = time.perf_counter()
+                payload = self.writer.prepare(df, model_class)
+                stats['records'].add(time.perf_counter() - stage_start, rows)
+
+                stage_start = time.perf_counter()
+                with self.db_manager.session_scope() as session:
+                    self.writer.write(session, payload, model_class)
+                stats['write'].add(time.perf_counter() - stage_start, rows)
+
+                result['rows'] += rows
+        except Exception as e:
+            result['error'] = f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"
+        finally:
+            self._cleanup(model_class)
+
+        result['seconds'] = time.perf_counter() - start_time
+        result['stages'] = {stage: stat.to_dict() for stage, stat in stats.items()}
+        return result
+
+    def _first_supplied_id(self, table) -> Optional[int]:
+        """
+        Returns the first id to give the rows of a table whose ids the database does not generate.
+
+        SQLite only generates the ids of INTEGER primary keys, so the Numeric ids of
+        llt and pt are numbered here, after the highest id already in the table.
+        """
+        from sqlalchemy import Integer, func, select
+
+        if self.db_manager.engine.dialect.name != 'sqlite' or 'id' not in table.c:
+            return None
+        if isinstance(table.c.id.type, Integer):
+            return None
+        with self.db_manager.engine.connect() as conn:
+            return int(conn.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+    def _cleanup(self, model_class) -> None:
+        """Removes the rows written under the benchmark version."""
+        self.processor.partitions.remove_version(model_class.__table__, self.config.version, self.config.language)
+
+    def close(self) -> None:
+        self.db_manager.close()
+
+def _summarize(files: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sums the stages of the files measured without error against one database."""
+    totals = {}
+    for stage in STAGES:
+        measured = [f['stages'][stage] for f in files if f['error'] is None]
+        seconds = sum(s['seconds'] for s in measured)
+        rows = sum(s['rows'] for s in measured)
+        totals[stage] = {
+            'seconds': seconds,
+            'rows': rows,
+            'rows_per_sec': rows / seconds if seconds else None,
+            'peak_rss_mb': max((s['peak_rss_mb'] for s in measured), default=0.0),
+        }
+    return totals
+
+def run_benchmark(data_dir: str, database_urls: List[str], processing_config,
+                  files: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Measures every file of a release against each database."""
+    from sqlalchemy.engine import make_url
+    from utils.file_utils import find_meddra_files, get_file_type_from_path
+
+    file_paths = find_meddra_files(data_dir)
+    if files:
+        file_paths = [path for path in file_paths if get_file_type_from_path(path) in files]
+
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'host': {
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count(),
+        },
+        'config': {
+            'reader': processing_config.reader,
+            'writer': processing_config.writer,
+            'batch_size': processing_config.batch_size,
+            'load_profile': processing_config.load_profile,
+        },
+        'data_dir': os.path.abspath(data_dir),
+        'targets': [],
+    }
+
+    for url in database_urls:
+        harness = BenchmarkHarness(url, processing_config)
+        try:
+            harness.prepare_database()
+            dialect = harness.db_manager.engine.dialect.name
+            results = []
+            for file_path in file_paths:
+                result = harness.run_file(file_path)
+                results.append(result)
+                status = result['error'] or f"{result['rows'] / result['seconds']:.0f} rows/s"
+                print(f"[{dialect}] {result['file_type']:<20} {result['rows']:>8} rows  {status}", file=sys.stderr)
+        finally:
+            harness.close()
+
+        report['targets'].append({
+            'dialect': dialect,
+            'url': make_url(url).render_as_string(hide_password=True),
+            'writer': harness.writer.name,
+            'files': results,
+            'totals': _summarize(results),
+            'failed_files': [result['file_type'] for result in results if result['error'] is not None],
+            'peak_rss_mb': peak_rss_mb(),
+        })
+
+    return report
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """Describes the change in rows/sec of each stage between two reports, per database and file."""
+    lines = []
+    previous = {
+        (target['dialect'], result['file_type']): result
+        for target in baseline['targets'] for result in target['files'] if result['error'] is None
+    }
+    for target in current['targets']:
+        for result in target['files']:
+            before = previous.get((target['dialect'], result['file_type']))
+            if before is None or result['error'] is not None:
+                continue
+            for stage in STAGES:
+                old_rate = before['stages'][stage]['rows_per_sec']
+                new_rate = result['stages'][stage]['rows_per_sec']
+                if old_rate and new_rate:
+                    lines.append(f"[{target['dialect']}] {result['file_type']:<20} {stage:<10} "
+                                 f"{old_rate:>10.0f} -> {new_rate:>10.0f} rows/s "
+                                 f"({(new_rate / old_rate - 1) * 100:+.1f}%)")
+    return lines
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Measure the load stages of a MedDRA release')
+    parser.add_argument('--data', required=True, help='Directory with the .asc files (see benchmarks.generate)')
+    parser.add_argument('--database-url', action='append', dest='database_urls',
+                        help='Database to write to; repeat for several (default: a temporary SQLite file)')
+    parser.add_argument('--files', help='Comma separated file types to measure (default: all)')
+    parser.add_argument('--reader', default='pandas', help='Reader engine (default: pandas)')
+    parser.add_argument('--writer', default='core', help='Write engine (default: core)')
+    parser.add_argument('--batch-size', type=int, default=5000, help='Lines per chunk (default: 5000)')
+    parser.add_argument('--load-profile', default='full', help='Load profile (default: full)')
+    parser.add_argument('--version', type=float, default=99.99,
+                        help='Version the rows are written and deleted under (default: 99.99)')
+    parser.add_argument('--output', help='File the JSON report is written to (default: stdout)')
+    parser.add_argument('--compare', help='Previous JSON report to compare rows/sec with')
+    args = parser.parse_args(argv)
+
+    from config import ProcessingConfig
+
+    processing_config = ProcessingConfig(
+        version=args.version,
+        batch_size=args.batch_size,
+        reader=args.reader,
+        writer=args.writer,
+        load_profile=args.load_profile
+    )
+
+    with tempfile.TemporaryDirectory(prefix='meddra-bench-') as scratch:
+        database_urls = args.database_urls or [f"sqlite:///{os.path.join(scratch, 'bench.db')}"]
+        report = run_benchmark(
+            args.data, database_urls, processing_config, args.files.split(',') if args.files else None
+        )
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            for line in compare_reports(json.load(f), report):
+                print(line, file=sys.stderr)
+
+    failed = [(target['dialect'], file_type)
+              for target in report['targets'] for file_type in target['failed_files']]
+    for dialect, file_type in failed:
+        print(f"[{dialect}] {file_type} failed and is left out of the totals", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
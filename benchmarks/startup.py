@@ -0,0 +1,77 @@
+"""
+Measures how long the CLI takes to start for calls that never load a file.
+
+Each case is run several times in a fresh interpreter and compared with a bare
+interpreter start, so the reported overhead is what the CLI's own imports cost on
+this host. The run fails if a case exceeds the budget or imports a module that
+should only be loaded once a load starts.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join(ROOT, 'meddra-cli.py')
+
+CASES = {
+    'help': ['--help'],
+    'argument error': ['--batch-size', '10'],
+    'invalid configuration': ['--path', ROOT, '--batch-size', '0'],
+    'unsupported file type': ['--file-path', os.path.join(ROOT, 'requirements.txt')],
+    'missing file': ['--file-path', os.path.join(ROOT, 'missing', 'llt.asc')],
+}
+
+# Modules that must not be imported before a load starts
+HEAVY_MODULES = ('pandas', 'numpy', 'sqlalchemy', 'models', 'dotenv')
+
+def time_command(command: List[str], runs: int) -> float:
+    """Returns the median wall time of a command in milliseconds."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def heavy_imports(arguments: List[str]) -> List[str]:
+    """Returns the heavy modules the CLI imports for the given arguments."""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', CLI, *arguments],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    imported = {line.rsplit('|', 1)[-1].strip() for line in completed.stderr.splitlines()
+                if line.startswith('import time:')}
+    return sorted(name for name in imported if name.split('.')[0] in HEAVY_MODULES)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Measure the startup time of meddra-cli.py')
+    parser.add_argument('--runs', type=int, default=10, help='Runs per case (default: 10)')
+    parser.add_argument('--budget-ms', type=float, default=100.0,
+                        help='Maximum startup overhead over a bare interpreter, in ms (default: 100)')
+    args = parser.parse_args()
+
+    baseline = time_command([sys.executable, '-c', 'pass'], args.runs)
+    print(f"Bare interpreter: {baseline:.1f} ms")
+
+    failed = False
+    for name, arguments in CASES.items():
+        elapsed = time_command([sys.executable, CLI, *arguments], args.runs)
+        overhead = elapsed - baseline
+        heavy = heavy_imports(arguments)
+
+        status = 'ok'
+        if overhead > args.budget_ms or heavy:
+            status = 'FAIL'
+            failed = True
+        print(f"{name:<24} {elapsed:7.1f} ms  (+{overhead:.1f} ms)  {status}")
+        if heavy:
+            print(f"  imports: {', '.join(heavy)}")
+
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
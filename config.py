@@ -1,8 +1,16 @@
 import os
 from dataclasses import dataclass
-from dotenv import load_dotenv
+from typing import Optional
 
-load_dotenv()
+_dotenv_loaded = False
+
+def load_env() -> None:
+    """Loads the .env file into the environment, once, when a setting is first read."""
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _dotenv_loaded = True
 
 @dataclass
 class DatabaseConfig:
@@ -10,6 +18,7 @@ class DatabaseConfig:
     
     @classmethod
     def from_env(cls) -> 'DatabaseConfig':
+        load_env()
         url = os.getenv("DATABASE_URL")
 
         if not url:
@@ -21,12 +30,69 @@ class ProcessingConfig:
     version: float = 28.0
     language: str = "en"
     batch_size: int = 5000
+    adaptive_batch_size: bool = False
+    target_batch_seconds: float = 1.0
+    memory_budget_mb: Optional[float] = None
     encoding: str = "UTF-8"
     separator: str = "$"
+    writer: str = "orm"
+    reader: str = "pandas"
+    jobs: int = 1
+    pipeline_workers: int = 0
+    backend: str = "sync"
+    async_concurrency: int = 4
+    resume: bool = False
+    staging: bool = False
+    defer_indexes: bool = False
+    delta_from: Optional[float] = None
+    force: bool = False
+    load_profile: str = "full"
+    progress_interval: float = 2.0
+    report: Optional[str] = None
+    prometheus_textfile: Optional[str] = None
+    profile: Optional[str] = None
+    check_integrity: bool = False
+    snapshot_dir: Optional[str] = None
+    snapshot_max_mb: float = 1024.0
     
     def __post_init__(self):
         if self.batch_size <= 0:
             raise ValueError("batch_size must be positive")
+        if self.target_batch_seconds <= 0:
+            raise ValueError("target_batch_seconds must be positive")
+        if self.memory_budget_mb is not None and self.memory_budget_mb <= 0:
+            raise ValueError("memory_budget_mb must be positive")
+        if self.jobs <= 0:
+            raise ValueError("jobs must be positive")
+        if self.pipeline_workers < 0:
+            raise ValueError("pipeline_workers must not be negative")
+        if self.backend not in ("sync", "async"):
+            raise ValueError("backend must be 'sync' or 'async'")
+        if self.load_profile not in ("full", "pruned"):
+            raise ValueError("load_profile must be 'full' or 'pruned'")
+        if self.profile not in (None, "cpu", "mem", "both"):
+            raise ValueError("profile must be 'cpu', 'mem' or 'both'")
+        if self.snapshot_max_mb <= 0:
+            raise ValueError("snapshot_max_mb must be positive")
+        if self.progress_interval < 0:
+            raise ValueError("progress_interval must not be negative")
+        if self.async_concurrency <= 0:
+            raise ValueError("async_concurrency must be positive")
+        if self.writer != "orm" and self.backend == "async":
+            raise ValueError("writer cannot be chosen with the async backend, which writes with asyncpg COPY")
+        if self.pipeline_workers and self.backend == "async":
+            raise ValueError("pipeline_workers is not supported with the async backend; use async_concurrency")
+        if self.resume and self.backend == "async":
+            raise ValueError("resume is not supported with the async backend")
+        if self.staging and self.backend == "async":
+            raise ValueError("staging is not supported with the async backend")
+        if self.delta_from is not None:
+            if self.backend == "async":
+                raise ValueError("delta_from is not supported with the async backend")
+            if self.resume:
+                raise ValueError("delta_from cannot be combined with resume")
+            if self.delta_from == self.version:
+                raise ValueError("delta_from must differ from version")
         if self.version <= 0:
             raise ValueError("version must be positive")
 
@@ -0,0 +1,181 @@
+import asyncio
+import datetime
+import decimal
+import time
+from typing import Any, Callable, Dict, List, Tuple, Type
+import pandas as pd
+from sqlalchemy import BigInteger, DateTime, Integer, Numeric
+from core.base import FileChunk, ProcessorResult
+from core.batch_processor import BatchProcessor
+from core.file_processor import FileProcessor
+from core.manifest import LoadManifest
+from core.writers import dataframe_to_rows
+from exceptions import BatchProcessingError
+from utils.progress import ProgressTracker
+
+class AsyncBatchProcessor(BatchProcessor):
+    """Writes batches with asyncpg's native binary COPY through the async engine pool."""
+    
+    async def process_batch_async(self, df_chunk: pd.DataFrame, model_class: Type, batch_number: int) -> ProcessorResult:
+        """Processes a single batch of data on a pooled asyncio connection."""
+        try:
+            table = model_class.__table__
+            timings = dict.fromkeys(('records', 'flush', 'commit'), 0.0)
+            
+            stage_start = time.perf_counter()
+            columns, records = self._create_copy_records(df_chunk, table)
+            timings['records'] = time.perf_counter() - stage_start
+            
+            if records:
+                async with self.db_manager.async_engine.connect() as conn:
+                    raw_connection = await conn.get_raw_connection()
+                    driver_connection = raw_connection.driver_connection
+                    
+                    async with driver_connection.transaction():
+                        stage_start = time.perf_counter()
+                        await driver_connection.copy_records_to_table(
+                            table.name,
+                            records=records,
+                            columns=columns,
+                            schema_name=table.schema
+                        )
+                        timings['flush'] = time.perf_counter() - stage_start
+                        stage_start = time.perf_counter()
+                    timings['commit'] = time.perf_counter() - stage_start
+            
+            return ProcessorResult(
+                success=True,
+                records_processed=len(records),
+                details={
+                    'batch_number': batch_number,
+                    'model_class': model_class.__name__,
+                    'writer': 'asyncpg-copy',
+                    'timings': timings
+                }
+            )
+            
+        except Exception as e:
+            error = BatchProcessingError(batch_number, e)
+            return ProcessorResult(success=False, error=error)
+    
+    def _create_copy_records(self, df: pd.DataFrame, table) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+        """Converts a chunk into tuples typed for the binary COPY codecs."""
+        rows = dataframe_to_rows(df, table)
+        if not rows:
+            return [], []
+        
+        columns = list(rows[0].keys())
+        converters = [self._get_converter(table.c[col].type) for col in columns]
+        
+        records = [
+            tuple(None if value is None else convert(value) for value, convert in zip(row.values(), converters))
+            for row in rows
+        ]
+        return columns, records
+    
+    def _get_converter(self, column_type) -> Callable[[Any], Any]:
+        """Returns the Python type conversion expected by asyncpg for a column type."""
+        if isinstance(column_type, (Integer, BigInteger)):
+            return int
+        if isinstance(column_type, Numeric):
+            return lambda value: value if isinstance(value, decimal.Decimal) else decimal.Decimal(repr(value))
+        if isinstance(column_type, DateTime):
+            return self._to_aware_datetime
+        return str
+    
+    @staticmethod
+    def _to_aware_datetime(value: Any) -> datetime.datetime:
+        # asyncpg reads naive datetimes as UTC; make them aware in the local timezone
+        if isinstance(value, pd.Timestamp):
+            value = value.to_pydatetime()
+        return value.astimezone() if value.tzinfo is None else value
+
+class AsyncFileProcessor(FileProcessor):
+    """Processes MedDRA files on an asyncio event loop with concurrent batch writes."""
+    
+    def __init__(self, db_manager, config):
+        super().__init__(db_manager, config)
+        self.batch_processor = AsyncBatchProcessor(db_manager, config)
+    
+    def _process_file(self, file_path: str) -> ProcessorResult:
+        """Processes a single file in a new event loop, for synchronous callers."""
+        return asyncio.run(self._process_and_close(file_path))
+    
+    async def _process_and_close(self, file_path: str) -> ProcessorResult:
+        # Pooled connections are bound to the event loop that created them
+        try:
+            return await self.process_async(file_path)
+        finally:
+            await self.db_manager.close_async()
+    
+    async def process_async(self, file_path: str) -> ProcessorResult:
+        """Processes a single MedDRA file with up to async_concurrency batches in flight."""
+        try:
+            file_type, file_info, mapping, progress_tracker = self._start_file(file_path)
+            batch_sizer = self._create_batch_sizer(mapping['model'], progress_tracker)
+            await asyncio.to_thread(self._ensure_partition, mapping['model'])
+            manifest = LoadManifest(self.db_manager, self.config)
+            await asyncio.to_thread(manifest.start, file_type)
+            
+            chunks = self._read_file_chunks(
+                file_path, mapping['columns'], file_info['encoding'], dtypes=mapping['dtypes'],
+                usecols=mapping['usecols'], batch_size=batch_sizer, checksum=file_info['checksum']
+            )
+            total_records, batch_count = await self._process_chunks_async(chunks, mapping, progress_tracker)
+            await asyncio.to_thread(manifest.complete, file_type, file_info['checksum'], total_records)
+            
+            details = {'batch_sizing': batch_sizer.summary()} if batch_sizer else None
+            return self._complete_file(file_path, file_type, total_records, batch_count, progress_tracker, details)
+            
+        except Exception as e:
+            self._log_error(f"Processing {file_path}", e)
+            return ProcessorResult(success=False, error=e)
+    
+    async def _process_chunks_async(self, chunks, mapping: Dict[str, Any],
+                                    progress_tracker: ProgressTracker) -> Tuple[int, int]:
+        """Reads chunks off the event loop and schedules their writes concurrently."""
+        in_flight = asyncio.Semaphore(self.config.async_concurrency)
+        state = {'records': 0, 'batches': 0, 'bytes': 0}
+        errors = []
+        tasks = []
+        
+        async def write_batch(chunk: FileChunk, processed_chunk: pd.DataFrame) -> None:
+            try:
+                batch_result = await self.batch_processor.process_batch_async(
+                    processed_chunk, mapping['model'], chunk.batch_number
+                )
+                if not batch_result.success:
+                    errors.append(batch_result.error)
+                    return
+                
+                state['records'] += batch_result.records_processed
+                state['batches'] += 1
+                state['bytes'] += chunk.size
+                progress_tracker.update(state['batches'], len(processed_chunk), state['records'], state['bytes'])
+                progress_tracker.record_batch(chunk.batch_number, len(processed_chunk), chunk.size,
+                                              {**chunk.timings, **batch_result.details['timings']})
+                progress_tracker.print_progress()
+            finally:
+                in_flight.release()
+        
+        iterator = iter(chunks)
+        
+        while not errors:
+            # Parsing is blocking; keep the event loop free for in-flight writes
+            chunk = await asyncio.to_thread(next, iterator, None)
+            if chunk is None:
+                break
+            
+            stage_start = time.perf_counter()
+            processed_chunk = self._preprocess_chunk(chunk.data, mapping['columns'])
+            chunk.timings['preprocess'] = time.perf_counter() - stage_start
+            
+            await in_flight.acquire()
+            tasks.append(asyncio.create_task(write_batch(chunk, processed_chunk)))
+        
+        await asyncio.gather(*tasks)
+        
+        if errors:
+            raise errors[0]
+        
+        return state['records'], state['batches']
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional
+import pandas as pd
 from config import ProcessingConfig
 from database.connection import DatabaseManager
 from utils.progress import ProgressTracker
@@ -17,9 +19,11 @@ class BaseProcessor(ABC):
         """Main processing method to be implemented by subclasses."""
         pass
     
-    def _create_progress_tracker(self, total_items: int, operation_name: str) -> ProgressTracker:
+    def _create_progress_tracker(self, total_items: int, operation_name: str,
+                                 total_bytes: Optional[int] = None) -> ProgressTracker:
         """Creates a progress tracker for the operation."""
-        self.progress_tracker = ProgressTracker(total_items, operation_name)
+        self.progress_tracker = ProgressTracker(total_items, operation_name, total_bytes,
+                                                self.config.progress_interval)
         return self.progress_tracker
     
     def _log_start(self, operation_name: str, **details) -> None:
@@ -57,4 +61,19 @@ class ProcessorResult:
         if self.success:
             return f"Success: {self.records_processed} records processed"
         else:
-            return f"Failed: {self.error}"
\ No newline at end of file
+            return f"Failed: {self.error}"
+
+@dataclass
+class FileChunk:
+    """A chunk of whole lines read from a file, with its position in the raw bytes."""
+    batch_number: int
+    data: pd.DataFrame
+    start_offset: int
+    end_offset: int
+    # Seconds spent on the chunk per stage, filled in as it moves through the load
+    timings: Dict[str, float] = field(default_factory=dict)
+    
+    @property
+    def size(self) -> int:
+        """Number of bytes of the file covered by the chunk."""
+        return self.end_offset - self.start_offset
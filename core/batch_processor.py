@@ -1,25 +1,66 @@
+import threading
+import time
 import pandas as pd
-from typing import List, Type, Any
+from typing import Callable, Optional, Type
+from sqlalchemy import Table
+from sqlalchemy.orm import Session
 from core.base import BaseProcessor, ProcessorResult
+from core.writers import BaseWriter, get_writer
 from exceptions import BatchProcessingError
 
 class BatchProcessor(BaseProcessor):
     """Processes data in batches and saves to database."""
     
-    def process_batch(self, df_chunk: pd.DataFrame, model_class: Type, batch_number: int) -> ProcessorResult:
-        """Processes a single batch of data."""
+    def __init__(self, db_manager, config):
+        super().__init__(db_manager, config)
+        self._writer = None
+        # Pipeline writer threads share the processor
+        self._writer_lock = threading.Lock()
+    
+    @property
+    def writer(self) -> BaseWriter:
+        """Lazy initialization of the configured writer, created once across threads."""
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = get_writer(self.config.writer, self.db_manager, staging=self.config.staging)
+        return self._writer
+    
+    def process_batch(self, df_chunk: pd.DataFrame, model_class: Type, batch_number: int,
+                      checkpoint: Optional[Callable[[Session, int], None]] = None,
+                      table: Optional[Table] = None) -> ProcessorResult:
+        """
+        Processes a single batch of data.
+        
+        Rows go to the model's table unless another table with the same columns
+        (such as a staging table) is given. The optional checkpoint callback runs in
+        the batch transaction, after the rows are written, so it commits or rolls
+        back together with them.
+        
+        The result details time the records, flush and commit stages of the batch.
+        """
         try:
-            records = self._create_records_from_dataframe(df_chunk, model_class)
+            stage_start = time.perf_counter()
+            payload = self.writer.prepare(df_chunk, model_class, table)
+            timings = {'records': time.perf_counter() - stage_start}
             
             with self.db_manager.session_scope() as session:
-                session.bulk_save_objects(records)
+                stage_start = time.perf_counter()
+                records_written = self.writer.write(session, payload, model_class, table)
+                if checkpoint is not None:
+                    checkpoint(session, records_written)
+                timings['flush'] = time.perf_counter() - stage_start
+                stage_start = time.perf_counter()
+            timings['commit'] = time.perf_counter() - stage_start
             
             return ProcessorResult(
                 success=True,
-                records_processed=len(records),
+                records_processed=records_written,
                 details={
                     'batch_number': batch_number,
-                    'model_class': model_class.__name__
+                    'model_class': model_class.__name__,
+                    'writer': self.writer.name,
+                    'timings': timings
                 }
             )
             
@@ -27,31 +68,6 @@ class BatchProcessor(BaseProcessor):
             error = BatchProcessingError(batch_number, e)
             return ProcessorResult(success=False, error=error)
     
-    def _create_records_from_dataframe(self, df: pd.DataFrame, model_class: Type) -> List[Any]:
-        """Creates model instances from dataframe rows."""
-        records = []
-        
-        for _, row in df.iterrows():
-            original_columns = [col for col in df.columns if col not in 
-                              ['created_at', 'updated_at', 'language', 'version']]
-            
-            # Create record data with original columns
-            record_data = {col: row[col] for col in original_columns if col in row}
-            
-            # Add metadata
-            record_data.update({
-                'created_at': row['created_at'],
-                'updated_at': row['updated_at'],
-                'language': row['language'],
-                'version': row['version']
-            })
-            
-            # Create model instance
-            record = model_class(**record_data)
-            records.append(record)
-        
-        return records
-    
     def process(self, *args, **kwargs) -> ProcessorResult:
         """Main process method - delegates to process_batch."""
-        return self.process_batch(*args, **kwargs)
\ No newline at end of file
+        return self.process_batch(*args, **kwargs)
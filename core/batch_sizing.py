@@ -0,0 +1,86 @@
+from typing import Any, Dict, List, Optional, Type
+from sqlalchemy import BigInteger, Integer, Numeric, String
+
+# Declared bytes of the file columns a chunk should start with
+INITIAL_BATCH_BYTES = 1024 * 1024
+# Width assumed for text columns without a declared length
+TEXT_COLUMN_WIDTH = 1000
+
+def estimate_row_width(model_class: Type) -> int:
+    """Estimates the width of a row of a file from the declared types of its columns."""
+    table = model_class.__table__
+    width = 0
+    for col in model_class.__meddra_file_info__['_column_order']:
+        column_type = table.c[col].type
+        if isinstance(column_type, (Integer, BigInteger, Numeric)):
+            width += 8
+        elif isinstance(column_type, String) and column_type.length:
+            width += column_type.length
+        else:
+            width += TEXT_COLUMN_WIDTH
+    return width
+
+class BatchSizeController:
+    """
+    Sizes the chunks of a file with additive increase, multiplicative decrease.
+
+    After each written batch its write latency (records, flush and commit) and the
+    process RSS are compared with the targets. While both are met the size grows by
+    a fixed step; when either is exceeded the size is halved. Like TCP congestion
+    control, it probes upwards slowly and backs off quickly, so it settles just
+    below the largest size that meets both targets.
+    """
+
+    MIN_SIZE = 100
+    MAX_SIZE = 50000
+    DECREASE_FACTOR = 0.5
+    WRITE_STAGES = ('records', 'flush', 'commit')
+
+    def __init__(self, initial_size: int, target_seconds: float, memory_budget_mb: Optional[float] = None):
+        self.size = min(self.MAX_SIZE, max(self.MIN_SIZE, initial_size))
+        self.initial_size = self.size
+        self.target_seconds = target_seconds
+        self.memory_budget_mb = memory_budget_mb
+        self.step = max(self.MIN_SIZE, self.size // 4)
+        self.increases = 0
+        self.decreases = 0
+        # Size chosen after each batch
+        self.sizes: List[int] = []
+
+    @classmethod
+    def for_model(cls, model_class: Type, target_seconds: float,
+                  memory_budget_mb: Optional[float] = None) -> 'BatchSizeController':
+        """Creates a controller starting at a size suited to the width of the model's rows."""
+        return cls(INITIAL_BATCH_BYTES // estimate_row_width(model_class), target_seconds, memory_budget_mb)
+
+    def __call__(self) -> int:
+        """Returns the number of lines of the next chunk."""
+        return self.size
+
+    def observe(self, batch: Dict[str, Any]) -> None:
+        """Adjusts the size after a written batch, as recorded by the progress tracker."""
+        if not batch['rows']:
+            return
+
+        latency = sum(batch['seconds'].get(stage, 0.0) for stage in self.WRITE_STAGES)
+        over_memory = self.memory_budget_mb is not None and batch['rss_mb'] > self.memory_budget_mb
+
+        if latency > self.target_seconds or over_memory:
+            self.size = max(self.MIN_SIZE, int(self.size * self.DECREASE_FACTOR))
+            self.decreases += 1
+        elif self.size < self.MAX_SIZE:
+            self.size = min(self.MAX_SIZE, self.size + self.step)
+            self.increases += 1
+        self.sizes.append(self.size)
+
+    def summary(self) -> Dict[str, Any]:
+        """Returns the sizes chosen for the run report."""
+        return {
+            'initial_size': self.initial_size,
+            'final_size': self.size,
+            'min_size': min(self.sizes + [self.initial_size]),
+            'max_size': max(self.sizes + [self.initial_size]),
+            'increases': self.increases,
+            'decreases': self.decreases,
+            'sizes': self.sizes
+        }
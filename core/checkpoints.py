@@ -0,0 +1,129 @@
+from datetime import datetime
+from functools import partial
+from typing import Callable, Iterable, Iterator, List, Tuple
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from config import ProcessingConfig
+from core.base import FileChunk
+from database.connection import DatabaseManager
+from exceptions import CheckpointError
+from models import MeddraLoadCheckpoint
+
+class ResumeState:
+    """The batches of a file already committed by a previous run."""
+    
+    def __init__(self, ranges: List[Tuple[int, int, int, int]] = None):
+        # (start_offset, end_offset, batch_number, records_loaded), ordered by offset
+        ranges = sorted(ranges or [])
+        
+        self.batches_loaded = len(ranges)
+        self.records_loaded = sum(records for _, _, _, records in ranges)
+        
+        # Everything up to resume_offset is committed; reading starts there
+        self.resume_offset = 0
+        self.first_batch_number = 1
+        position = 0
+        while position < len(ranges) and ranges[position][0] == self.resume_offset:
+            self.resume_offset = ranges[position][1]
+            self.first_batch_number = ranges[position][2] + 1
+            position += 1
+        
+        # Batches committed out of order (by pipeline writers) after a gap
+        self._pending = [(start, end) for start, end, _, _ in ranges[position:]]
+    
+    def is_committed(self, chunk: FileChunk) -> bool:
+        """Checks if a chunk was already committed after the resume offset."""
+        for start, end in self._pending:
+            if (start, end) == (chunk.start_offset, chunk.end_offset):
+                return True
+            if start < chunk.end_offset and chunk.start_offset < end:
+                raise CheckpointError(
+                    f"Batch {chunk.batch_number} overlaps a committed batch at bytes {start}-{end}; "
+                    f"resume with the same --batch-size as the interrupted load"
+                )
+        return False
+    
+    def skip_committed(self, chunks: Iterable[FileChunk]) -> Iterator[FileChunk]:
+        """Filters out chunks that were already committed."""
+        for chunk in chunks:
+            if not self.is_committed(chunk):
+                yield chunk
+
+class CheckpointLedger:
+    """
+    Ledger of committed batches for one file, version and language.
+    
+    Each batch records its byte range in the same transaction as its rows, so the
+    ledger always matches what is in the table and a failed load can be resumed
+    without duplicating data.
+    """
+    
+    def __init__(self, db_manager: DatabaseManager, config: ProcessingConfig,
+                 file_type: str, file_checksum: str):
+        self.db_manager = db_manager
+        self.config = config
+        self.file_type = file_type
+        self.file_checksum = file_checksum
+    
+    def prepare(self) -> ResumeState:
+        """Returns the state to resume from, clearing the ledger for a fresh load."""
+        MeddraLoadCheckpoint.__table__.create(self.db_manager.engine, checkfirst=True)
+        
+        if self.config.resume:
+            return self._load_state()
+        
+        with self.db_manager.session_scope() as session:
+            self.clear(session)
+        return ResumeState()
+    
+    def clear(self, session: Session) -> None:
+        """Removes the checkpoints of the file inside the given session."""
+        session.execute(delete(MeddraLoadCheckpoint).where(*self._key_filter()))
+    
+    def checkpoint_for(self, chunk: FileChunk) -> Callable[[Session, int], None]:
+        """Returns the callback that records a chunk inside its batch transaction."""
+        return partial(self.record, chunk=chunk)
+    
+    def record(self, session: Session, records_loaded: int, chunk: FileChunk) -> None:
+        """Adds the checkpoint of a committed chunk to the batch session."""
+        session.add(MeddraLoadCheckpoint(
+            file_type=self.file_type,
+            file_checksum=self.file_checksum,
+            batch_number=chunk.batch_number,
+            start_offset=chunk.start_offset,
+            end_offset=chunk.end_offset,
+            records_loaded=records_loaded,
+            created_at=datetime.now(),
+            language=self.config.language,
+            version=self.config.version
+        ))
+    
+    def _load_state(self) -> ResumeState:
+        with self.db_manager.session_scope() as session:
+            rows = session.execute(
+                select(
+                    MeddraLoadCheckpoint.file_checksum,
+                    MeddraLoadCheckpoint.start_offset,
+                    MeddraLoadCheckpoint.end_offset,
+                    MeddraLoadCheckpoint.batch_number,
+                    MeddraLoadCheckpoint.records_loaded
+                ).where(*self._key_filter())
+            ).all()
+        
+        if any(row.file_checksum != self.file_checksum for row in rows):
+            raise CheckpointError(
+                f"{self.file_type} changed since the interrupted load; "
+                f"remove its partially loaded rows and load it again without --resume"
+            )
+        
+        return ResumeState([
+            (row.start_offset, row.end_offset, row.batch_number, row.records_loaded)
+            for row in rows
+        ])
+    
+    def _key_filter(self) -> List:
+        return [
+            MeddraLoadCheckpoint.file_type == self.file_type,
+            MeddraLoadCheckpoint.version == self.config.version,
+            MeddraLoadCheckpoint.language == self.config.language
+        ]
@@ -0,0 +1,150 @@
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Type
+import numpy as np
+import pandas as pd
+from sqlalchemy import BigInteger, Integer, Numeric, Table, insert, literal, select
+from sqlalchemy.orm import Session
+from config import ProcessingConfig
+from core.base import FileChunk
+from database.connection import DatabaseManager
+
+FINGERPRINT_FETCH_SIZE = 50000
+
+def fingerprint_rows(df: pd.DataFrame, table: Table, columns: List[str]) -> np.ndarray:
+    """
+    Computes a stable 64-bit hash of each row over the given columns.
+
+    Values are first normalised by column type, so rows parsed from a file and
+    rows read back from the database hash identically.
+    """
+    canonical = {}
+    for col in columns:
+        series = df[col]
+        if isinstance(table.c[col].type, (Integer, BigInteger, Numeric)):
+            canonical[col] = pd.to_numeric(series, errors='coerce').astype('Float64')
+        else:
+            text_values = series.astype('string')
+            canonical[col] = text_values.mask(text_values == '')
+
+    return pd.util.hash_pandas_object(pd.DataFrame(canonical), index=False).to_numpy()
+
+def _with_occurrences(fingerprints: np.ndarray, seen: Optional[pd.Series] = None) -> pd.DataFrame:
+    """Numbers repeated fingerprints so identical rows are matched one to one."""
+    frame = pd.DataFrame({'fingerprint': fingerprints})
+    frame['occurrence'] = frame.groupby('fingerprint').cumcount()
+    if seen is not None and not seen.empty:
+        frame['occurrence'] += seen.reindex(frame['fingerprint'], fill_value=0).to_numpy()
+    return frame
+
+class DeltaLoader:
+    """
+    Loads a file as the difference against a previous version already in the database.
+
+    Rows whose fingerprint matches a row of the previous version are not written
+    again: their previous rows are copied forward server side with INSERT ... SELECT.
+    Only new and changed rows go through the writer, and rows missing from the
+    file are simply not carried forward.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, config: ProcessingConfig, model_class: Type,
+                 columns: List[str]):
+        self.db_manager = db_manager
+        self.config = config
+        self.table = model_class.__table__
+        self.columns = columns
+        self._previous: Optional[pd.DataFrame] = None
+        self._seen = pd.Series(dtype='int64')
+        self._carried_ids: List[np.ndarray] = []
+        self.rows_written = 0
+        self.rows_carried = 0
+
+    @property
+    def previous_rows(self) -> int:
+        return 0 if self._previous is None else len(self._previous)
+
+    def load_previous(self) -> int:
+        """Fingerprints the rows of the previous version, returning how many there are."""
+        query = select(self.table.c.id, *[self.table.c[col] for col in self.columns]).where(
+            self.table.c.version == self.config.delta_from,
+            self.table.c.language == self.config.language
+        )
+
+        parts = []
+        with self.db_manager.engine.connect() as conn:
+            for df in pd.read_sql(query, conn, chunksize=FINGERPRINT_FETCH_SIZE):
+                parts.append(pd.DataFrame({
+                    'id': df['id'].to_numpy(),
+                    'fingerprint': fingerprint_rows(df, self.table, self.columns)
+                }))
+
+        previous = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(
+            {'id': pd.Series(dtype=object), 'fingerprint': pd.Series(dtype='uint64')}
+        )
+        previous['occurrence'] = previous.groupby('fingerprint').cumcount()
+        self._previous = previous.set_index(['fingerprint', 'occurrence'])
+        return len(self._previous)
+
+    def filter_chunks(self, chunks: Iterable[FileChunk]) -> Iterator[FileChunk]:
+        """Yields each chunk with only the rows that differ from the previous version."""
+        for chunk in chunks:
+            frame = _with_occurrences(fingerprint_rows(chunk.data, self.table, self.columns), self._seen)
+            self._seen = self._seen.add(frame['fingerprint'].value_counts(), fill_value=0).astype('int64')
+
+            positions = self._previous.index.get_indexer(
+                pd.MultiIndex.from_frame(frame[['fingerprint', 'occurrence']])
+            )
+            unchanged = positions >= 0
+
+            self._carried_ids.append(self._previous['id'].to_numpy()[positions[unchanged]])
+            self.rows_carried += int(unchanged.sum())
+            self.rows_written += int((~unchanged).sum())
+
+            yield FileChunk(
+                chunk.batch_number,
+                chunk.data.loc[~unchanged].reset_index(drop=True),
+                chunk.start_offset,
+                chunk.end_offset,
+                chunk.timings
+            )
+
+    def carry_forward(self, session: Session, target: Optional[Table] = None) -> int:
+        """
+        Copies the unchanged rows of the previous version into the new one.
+
+        Runs in the caller's session, so either every unchanged row is carried
+        forward or, if any batch fails, none is.
+        """
+        target = self.table if target is None else target
+        ids = np.concatenate(self._carried_ids) if self._carried_ids else np.array([])
+        now = datetime.now()
+
+        source = self.table
+        metadata_columns = ['created_at', 'updated_at', 'language', 'version']
+        for start in range(0, len(ids), self.config.batch_size):
+            batch_ids = ids[start:start + self.config.batch_size].tolist()
+            statement = insert(target).from_select(
+                self.columns + metadata_columns,
+                select(
+                    *[source.c[col] for col in self.columns],
+                    literal(now, source.c.created_at.type),
+                    literal(now, source.c.updated_at.type),
+                    source.c.language,
+                    literal(self.config.version, source.c.version.type)
+                ).where(
+                    source.c.version == self.config.delta_from,
+                    source.c.language == self.config.language,
+                    source.c.id.in_(batch_ids)
+                )
+            )
+            session.execute(statement)
+
+        return len(ids)
+
+    def summary(self) -> Dict[str, int]:
+        """Returns the row counts of the delta."""
+        return {
+            'previous_rows': self.previous_rows,
+            'rows_written': self.rows_written,
+            'rows_carried': self.rows_carried,
+            'rows_removed': self.previous_rows - self.rows_carried
+        }
@@ -1,9 +1,21 @@
+import os
+import time
 import pandas as pd
-import numpy as np
 from datetime import datetime
-from typing import List, Dict, Any
-from core.base import BaseProcessor, ProcessorResult
+from typing import Callable, Iterable, Iterator, List, Dict, Any, Optional, Tuple
+from sqlalchemy import Table
+from core.base import BaseProcessor, FileChunk, ProcessorResult
 from core.batch_processor import BatchProcessor
+from core.batch_sizing import BatchSizeController
+from core.checkpoints import CheckpointLedger
+from core.delta import DeltaLoader
+from core.manifest import LoadManifest
+from core.pipeline import ChunkPipeline
+from core.readers import get_reader
+from core.snapshots import create_snapshot_cache
+from core.staging import StagingTable
+from database.partitions import PartitionManager
+from utils.progress import ProgressTracker
 from utils.file_utils import validate_file_path, get_file_info, get_file_type_from_path
 from models import generate_meddra_file_mappings
 from exceptions import UnsupportedFileTypeError, FileProcessingError
@@ -13,142 +25,300 @@ class FileProcessor(BaseProcessor):
     
     def __init__(self, db_manager, config):
         super().__init__(db_manager, config)
-        self.file_mappings = generate_meddra_file_mappings()
+        self.file_mappings = generate_meddra_file_mappings(config.load_profile)
         self.batch_processor = BatchProcessor(db_manager, config)
+        self.partitions = PartitionManager(db_manager)
+        self.reader = get_reader(config.reader, config)
+        self.snapshots = create_snapshot_cache(config)
     
     def process(self, file_path: str) -> ProcessorResult:
+        """Processes a single MedDRA file, under the configured profilers if any."""
+        if not self.config.profile:
+            return self._process_file(file_path)
+        
+        from utils.metrics import report_directory
+        from utils.profiling import FileProfiler
+        
+        profiler = FileProfiler(
+            self.config.profile,
+            report_directory(self.config.report),
+            os.path.splitext(os.path.basename(file_path))[0]
+        )
+        result, outputs = profiler.run(self._process_file, file_path)
+        result.details['profile'] = outputs
+        return result
+    
+    def _process_file(self, file_path: str) -> ProcessorResult:
         """Processes a single MedDRA file."""
         try:
-            # Validate file
-            validate_file_path(file_path)
-            file_info = get_file_info(file_path)
-            file_type = get_file_type_from_path(file_path)
-            
-            # Check if file type is supported
-            if file_type not in self.file_mappings:
-                raise UnsupportedFileTypeError(file_type)
-            
-            mapping = self.file_mappings[file_type]
-            
-            # Log start
-            self._log_start(
-                f"Processing {file_type} file",
-                file_path=file_path,
-                file_size=file_info['size'],
-                total_lines=file_info['line_count']
-            )
+            file_type, file_info, mapping, progress_tracker = self._start_file(file_path)
+            batch_sizer = self._create_batch_sizer(mapping['model'], progress_tracker)
             
-            # Create progress tracker
-            progress_tracker = self._create_progress_tracker(
-                file_info['line_count'], 
-                f"Processing {file_type}"
-            )
+            # Committed batches are recorded so an interrupted load can be resumed
+            ledger = CheckpointLedger(self.db_manager, self.config, file_type, file_info['checksum'])
+            resume_state = ledger.prepare()
+            
+            # Completed loads are recorded so unchanged files can be skipped on the next run
+            manifest = LoadManifest(self.db_manager, self.config)
+            manifest.start(file_type)
+            
+            if resume_state.batches_loaded:
+                print(f"Resuming after {resume_state.batches_loaded} committed batches "
+                      f"({resume_state.records_loaded} records, byte {resume_state.resume_offset})")
+                progress_tracker.update(0, 0, 0, resume_state.resume_offset)
+            
+            # Staging loads write to an unlogged copy and swap it in once complete
+            staging = None
+            if self.config.staging:
+                staging = StagingTable(self.db_manager, self.config, mapping['model'], self.partitions)
+                staging.create(keep_existing=self.config.resume)
+            else:
+                self._ensure_partition(mapping['model'])
+            target_table = staging.table if staging else None
             
             # Process file in chunks
-            total_records = 0
-            batch_count = 0
-            
-            for df_chunk in self._read_file_chunks(file_path, mapping['columns']):
-                batch_count += 1
-                
-                # Preprocess chunk
-                processed_chunk = self._preprocess_chunk(df_chunk, mapping['columns'])
-                
-                # Process batch
-                batch_result = self.batch_processor.process_batch(
-                    processed_chunk,
+            chunks = resume_state.skip_committed(self._read_file_chunks(
+                file_path,
+                mapping['columns'],
+                file_info['encoding'],
+                start_offset=resume_state.resume_offset,
+                first_batch_number=resume_state.first_batch_number,
+                dtypes=mapping['dtypes'],
+                usecols=mapping['usecols'],
+                batch_size=batch_sizer,
+                checksum=file_info['checksum']
+            ))
+            
+            # Delta loads only write the rows that differ from the previous version
+            delta = None
+            if self.config.delta_from is not None:
+                delta = DeltaLoader(self.db_manager, self.config, mapping['model'], mapping['usecols'])
+                print(f"Fingerprinted {delta.load_previous()} rows of version {self.config.delta_from}")
+                chunks = delta.filter_chunks(chunks)
+            
+            if self.config.pipeline_workers > 0:
+                pipeline = ChunkPipeline(self.batch_processor, self.config.pipeline_workers)
+                total_records, batch_count = pipeline.run(
+                    chunks,
+                    lambda df_chunk: self._preprocess_chunk(df_chunk, mapping['columns']),
                     mapping['model'],
-                    batch_count
+                    progress_tracker,
+                    checkpoint_for=ledger.checkpoint_for,
+                    table=target_table
+                )
+            else:
+                total_records, batch_count = self._process_chunks(
+                    chunks, mapping, progress_tracker, checkpoint_for=ledger.checkpoint_for, table=target_table
                 )
-                
-                if not batch_result.success:
-                    raise batch_result.error
-                
-                total_records += batch_result.records_processed
-                
-                # Update progress
-                progress_tracker.update(batch_count, len(processed_chunk), total_records)
-                progress_tracker.print_progress()
-            
-            # Log completion
-            self._log_completion(
-                f"Processing {file_type} file",
-                total_records=total_records,
-                batches_processed=batch_count,
-                elapsed_time=f"{progress_tracker.get_elapsed_time():.1f}s"
-            )
             
-            return ProcessorResult(
-                success=True,
-                records_processed=total_records,
-                details={
-                    'file_type': file_type,
-                    'file_path': file_path,
-                    'batches_processed': batch_count,
-                    'elapsed_time': progress_tracker.get_elapsed_time()
-                }
-            )
+            details = {}
+            if batch_sizer:
+                details['batch_sizing'] = batch_sizer.summary()
+            
+            if staging:
+                total_records = self._swap_staging(staging, ledger, delta)
+                manifest.complete(file_type, file_info['checksum'], total_records)
+            else:
+                if delta:
+                    # All unchanged rows are carried forward in one transaction, or none are
+                    with self.db_manager.session_scope() as session:
+                        total_records += delta.carry_forward(session)
+                manifest.complete(file_type, file_info['checksum'], resume_state.records_loaded + total_records)
+            
+            if delta:
+                details['delta'] = delta.summary()
+                print("Delta from {delta_from}: {rows_written} rows written, {rows_carried} carried forward, "
+                      "{rows_removed} removed".format(delta_from=self.config.delta_from, **details['delta']))
+            
+            return self._complete_file(file_path, file_type, total_records, batch_count, progress_tracker, details)
             
         except Exception as e:
             self._log_error(f"Processing {file_path}", e)
             return ProcessorResult(success=False, error=e)
     
-    def _detect_encoding(self, file_path: str) -> str:
-        """Tests different encodings and returns the first one that works."""
-        encodings = ['utf-8', 'latin1','iso-8859-1' 'cp1252']
-        
-        for encoding in encodings:
-            try:
-                # Just try to read the first line
-                with open(file_path, 'r', encoding=encoding) as f:
-                    f.readline()
-                    return encoding
-            except UnicodeDecodeError:
-                print(f"Failed to decode with {encoding}, trying next encoding...")
-                continue
-        
-        raise FileProcessingError(
-            file_path,
-            f"Could not decode file with any of these encodings: {', '.join(encodings)}"
+    def _start_file(self, file_path: str) -> Tuple[str, Dict[str, Any], Dict[str, Any], ProgressTracker]:
+        """Validates and inspects a file, returning its type, info, mapping and progress tracker."""
+        # Validate file
+        validate_file_path(file_path)
+        file_info = get_file_info(file_path)
+        file_type = get_file_type_from_path(file_path)
+        
+        # Check if file type is supported
+        if file_type not in self.file_mappings:
+            raise UnsupportedFileTypeError(file_type)
+        
+        mapping = self.file_mappings[file_type]
+        
+        # Log start
+        self._log_start(
+            f"Processing {file_type} file",
+            file_path=file_path,
+            file_size=file_info['size'],
+            total_lines=file_info['line_count']
         )
+        
+        # Create progress tracker
+        progress_tracker = self._create_progress_tracker(
+            file_info['line_count'], 
+            f"Processing {file_type}",
+            total_bytes=file_info['size']
+        )
+        
+        print(f"Using encoding: {file_info['encoding']}")
+        return file_type, file_info, mapping, progress_tracker
     
-    def _read_file_chunks(self, file_path: str, columns: List[str]):
-        """Reads file in chunks using pandas."""
-        try:
-            encoding = self._detect_encoding(file_path)
-            print(f"Using encoding: {encoding}")
+    def _create_batch_sizer(self, model_class, progress_tracker: ProgressTracker) -> Optional[BatchSizeController]:
+        """Creates the controller adjusting the chunk size to the write latency, with --batch-size auto."""
+        if not self.config.adaptive_batch_size:
+            return None
+        
+        batch_sizer = BatchSizeController.for_model(
+            model_class, self.config.target_batch_seconds, self.config.memory_budget_mb
+        )
+        progress_tracker.listeners.append(batch_sizer.observe)
+        print(f"Adaptive batch size: starting at {batch_sizer.size} lines")
+        return batch_sizer
+    
+    def _complete_file(self, file_path: str, file_type: str, total_records: int, batch_count: int,
+                       progress_tracker: ProgressTracker, details: Optional[Dict[str, Any]] = None) -> ProcessorResult:
+        """Logs the completion of a file and builds its result."""
+        # Log completion
+        self._log_completion(
+            f"Processing {file_type} file",
+            total_records=total_records,
+            batches_processed=batch_count,
+            elapsed_time=f"{progress_tracker.get_elapsed_time():.1f}s"
+        )
+        
+        return ProcessorResult(
+            success=True,
+            records_processed=total_records,
+            details={
+                'file_type': file_type,
+                'file_path': file_path,
+                'batches_processed': batch_count,
+                'elapsed_time': progress_tracker.get_elapsed_time(),
+                'metrics': progress_tracker.summary(),
+                **(details or {})
+            }
+        )
+    
+    def _process_chunks(self, chunks: Iterable[FileChunk], mapping: Dict[str, Any], progress_tracker: ProgressTracker,
+                        checkpoint_for: Optional[Callable] = None, table: Optional[Table] = None) -> Tuple[int, int]:
+        """Preprocesses and writes chunks one after another on the current thread."""
+        total_records = 0
+        batch_count = 0
+        
+        for chunk in chunks:
+            batch_count += 1
             
-            return pd.read_csv(
-                file_path,
-                sep=self.config.separator,
-                names=columns,
-                on_bad_lines='skip',
-                encoding=encoding,
-                chunksize=self.config.batch_size,
-                index_col=False,
+            # Preprocess chunk
+            stage_start = time.perf_counter()
+            processed_chunk = self._preprocess_chunk(chunk.data, mapping['columns'])
+            chunk.timings['preprocess'] = time.perf_counter() - stage_start
+            
+            # Process batch
+            batch_result = self.batch_processor.process_batch(
+                processed_chunk,
+                mapping['model'],
+                chunk.batch_number,
+                checkpoint=checkpoint_for(chunk) if checkpoint_for else None,
+                table=table
             )
+            
+            if not batch_result.success:
+                raise batch_result.error
+            
+            total_records += batch_result.records_processed
+            
+            # Update progress
+            progress_tracker.update(chunk.batch_number, len(processed_chunk), total_records, chunk.end_offset)
+            progress_tracker.record_batch(chunk.batch_number, len(processed_chunk), chunk.size,
+                                          {**chunk.timings, **batch_result.details['timings']})
+            progress_tracker.print_progress()
+        
+        return total_records, batch_count
+    
+    def _ensure_partition(self, model_class) -> None:
+        """Creates the version/language partition of a partitioned table before loading it."""
+        table = model_class.__table__
+        if self.partitions.is_partitioned(table):
+            with self.db_manager.session_scope() as session:
+                self.partitions.ensure_partition(session, table, self.config.version, self.config.language)
+    
+    def _swap_staging(self, staging: StagingTable, ledger: CheckpointLedger,
+                      delta: Optional[DeltaLoader] = None) -> int:
+        """
+        Swaps the staged rows into the live table and drops the staging table.
+        
+        The unchanged rows of a delta load are carried forward into the staging
+        table in the same transaction as the swap.
+        """
+        if staging.exchanges_partition:
+            print(f"Building indexes on {staging.table.name}")
+            staging.build_indexes()
+        
+        print(f"Swapping {staging.table.name} into {staging.live_table.name}")
+        
+        with self.db_manager.session_scope() as session:
+            if delta:
+                delta.carry_forward(session, staging.table)
+            total_records = staging.swap(session)
+            # The staged batches are gone after the swap, so are their checkpoints
+            ledger.clear(session)
+        
+        staging.drop()
+        return total_records
+    
+    def _read_file_chunks(self, file_path: str, columns: List[str], encoding: str,
+                          start_offset: int = 0, first_batch_number: int = 1,
+                          dtypes: Optional[Dict[str, str]] = None,
+                          usecols: Optional[List[str]] = None,
+                          batch_size: Optional[Callable[[], int]] = None,
+                          checksum: Optional[str] = None) -> Iterator[FileChunk]:
+        """
+        Reads file in chunks of whole lines using the configured reader engine.
+        
+        Chunks are cut on line boundaries of the raw bytes, so the byte range of each
+        chunk is exact and reading can start at any offset recorded by a checkpoint.
+        The time taken to parse each chunk is recorded on it. With a snapshot cache
+        and the file's checksum, chunks come from the file's snapshot when it has one.
+        """
+        try:
+            if self.snapshots and checksum:
+                chunks = self.snapshots.read_chunks(
+                    self.reader, file_path, checksum, columns, encoding, start_offset, first_batch_number,
+                    dtypes, usecols, batch_size
+                )
+            else:
+                chunks = self.reader.read_chunks(
+                    file_path, columns, encoding, start_offset, first_batch_number, dtypes, usecols, batch_size
+                )
+            while True:
+                stage_start = time.perf_counter()
+                chunk = next(chunks, None)
+                if chunk is None:
+                    return
+                chunk.timings['read'] = time.perf_counter() - stage_start
+                yield chunk
         except Exception as e:
             raise FileProcessingError(file_path, e)
 
     def _preprocess_chunk(self, df_chunk: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
-        """Preprocesses a data chunk."""
-        # Replace NaN with None
-        df_chunk = df_chunk.replace({np.nan: None})
-        
-        # Clean string columns
-        for col in df_chunk.columns:
-            if df_chunk[col].dtype == 'object':
-                df_chunk[col] = df_chunk[col].apply(
-                    lambda x: None if pd.isna(x) or x == '' else x
-                )
+        """
+        Preprocesses a data chunk.
         
-        # Add metadata columns
-        df_chunk['created_at'] = datetime.now()
-        df_chunk['updated_at'] = datetime.now()
-        df_chunk['language'] = self.config.language
-        df_chunk['version'] = self.config.version
-        
-        return df_chunk
+        Readers already cast the columns to the model dtypes with empty strings as
+        nulls, and the writers turn nulls into None, so only the metadata columns
+        are added here.
+        """
+        now = datetime.now()
+        return df_chunk.assign(
+            created_at=now,
+            updated_at=now,
+            language=self.config.language,
+            version=self.config.version
+        )
     
     def get_supported_file_types(self) -> List[str]:
         """Returns list of supported file types."""
@@ -156,4 +326,11 @@ class FileProcessor(BaseProcessor):
     
     def is_file_type_supported(self, file_type: str) -> bool:
         """Checks if a file type is supported."""
-        return file_type in self.file_mappings
\ No newline at end of file
+        return file_type in self.file_mappings
+
+def create_file_processor(db_manager, config) -> FileProcessor:
+    """Creates the file processor for the configured execution backend."""
+    if config.backend == 'async':
+        from core.async_processor import AsyncFileProcessor
+        return AsyncFileProcessor(db_manager, config)
+    return FileProcessor(db_manager, config)
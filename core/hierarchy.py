@@ -0,0 +1,223 @@
+from typing import Optional, Tuple
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from config import ProcessingConfig
+from core.readers import get_reader, read_file_columns
+from core.snapshots import create_snapshot_cache
+from models import MeddraLowLevelTerm, MeddraMdHierarchy, generate_meddra_file_mappings
+from utils.file_utils import inspect_file
+
+# Returned by the bulk lookups for codes that are not in the hierarchy
+MISSING = -1
+
+MDHIER_COLUMNS = ['pt_code', 'hlt_code', 'hlgt_code', 'soc_code', 'pt_soc_code', 'primary_soc_fg']
+LLT_COLUMNS = ['llt_code', 'pt_code']
+
+class CodeIndex:
+    """
+    Maps codes to their positions in a sorted array of unique codes.
+
+    MedDRA codes are dense in a narrow range, so positions are usually kept in a
+    direct-address table indexed by code minus the smallest code: a lookup is one
+    subtraction and one array read. Codes too sparse for a table of at most
+    DENSE_FACTOR slots per code are found by binary search instead.
+    """
+
+    DENSE_FACTOR = 8
+
+    def __init__(self, codes: np.ndarray):
+        self.codes = codes
+        self._table = None
+        self._base = int(codes[0]) if len(codes) else 0
+        if len(codes) and int(codes[-1]) - self._base + 1 <= self.DENSE_FACTOR * len(codes):
+            self._table = np.full(int(codes[-1]) - self._base + 1, MISSING, dtype=np.int32)
+            self._table[codes - self._base] = np.arange(len(codes), dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + (self._table.nbytes if self._table is not None else 0)
+
+    def position(self, code: int) -> int:
+        """Returns the position of a code, or MISSING."""
+        if self._table is not None:
+            offset = code - self._base
+            return int(self._table[offset]) if 0 <= offset < len(self._table) else MISSING
+        position = int(np.searchsorted(self.codes, code))
+        return position if position < len(self.codes) and self.codes[position] == code else MISSING
+
+    def positions(self, codes: np.ndarray) -> np.ndarray:
+        """Returns the position of each code, with MISSING for unknown codes."""
+        codes = np.asarray(codes, dtype=np.int64)
+        if self._table is not None:
+            offsets = codes - self._base
+            known = (offsets >= 0) & (offsets < len(self._table))
+            positions = np.full(len(codes), MISSING, dtype=np.int64)
+            positions[known] = self._table[offsets[known]]
+            return positions
+
+        positions = np.searchsorted(self.codes, codes)
+        known = positions < len(self.codes)
+        known[known] = self.codes[positions[known]] == codes[known]
+        return np.where(known, positions, MISSING)
+
+def _as_codes(values: pd.Series) -> pd.Series:
+    """
+    Parses a code column as nullable integers, which keep codes beyond 2 ** 53 exact.
+
+    convert_dtypes turns NaN into NA first, which to_numeric would keep as a non-missing value.
+    """
+    return pd.to_numeric(values.convert_dtypes(), errors='coerce', dtype_backend='numpy_nullable').astype('Int64')
+
+def _codes(df: pd.DataFrame, columns) -> pd.DataFrame:
+    """Returns the rows with all the given code columns, as int64."""
+    return df[columns].apply(_as_codes).dropna().astype(np.int64)
+
+def _take(values: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """Returns the values at the given positions, with MISSING where the position is."""
+    found = positions != MISSING
+    result = np.full(len(positions), MISSING, dtype=np.int64)
+    result[found] = values[positions[found]]
+    return result
+
+class MeddraHierarchy:
+    """
+    Resolves LLT > PT > HLT > HLGT > SOC from compact NumPy arrays.
+
+    Built from mdhier.asc and llt.asc, or from the rows of a version and language
+    in the database, it keeps only codes, a few MB for a full release:
+
+    - the PT of every LLT, aligned with a CodeIndex of LLT codes
+    - the primary SOC of every PT, aligned with a CodeIndex of PT codes
+    - the SOCs and the HLT/HLGT/SOC paths of every PT, as offsets into flat arrays
+
+    Scalar lookups return None (or an empty array) for unknown codes; bulk lookups
+    take arrays of codes and return MISSING for unknown codes.
+    """
+
+    def __init__(self, mdhier: pd.DataFrame, llt: pd.DataFrame):
+        llt = _codes(llt, LLT_COLUMNS).drop_duplicates('llt_code').sort_values('llt_code')
+        self.llts = CodeIndex(llt['llt_code'].to_numpy())
+        self._llt_pt = llt['pt_code'].to_numpy()
+
+        paths = mdhier.assign(primary=mdhier['primary_soc_fg'].astype('string').str.upper().eq('Y').fillna(False))
+        paths = _codes(paths, ['pt_code', 'hlt_code', 'hlgt_code', 'soc_code']).join(
+            paths[['pt_soc_code', 'primary']]
+        ).drop_duplicates(['pt_code', 'hlt_code', 'hlgt_code', 'soc_code'])
+        # Primary path first within each PT
+        paths = paths.sort_values(['pt_code', 'primary', 'soc_code'], ascending=[True, False, True])
+
+        pt_codes, first_rows, path_counts = np.unique(
+            paths['pt_code'].to_numpy(), return_index=True, return_counts=True
+        )
+        self.pts = CodeIndex(pt_codes)
+        self._path_offsets = np.concatenate(([0], np.cumsum(path_counts)))
+        self._paths = paths[['hlt_code', 'hlgt_code', 'soc_code']].to_numpy()
+
+        # The primary SOC is given on every row; the flagged path backs it up
+        primary = _as_codes(paths['pt_soc_code']).iloc[first_rows]
+        flagged = paths['soc_code'].to_numpy()[first_rows]
+        self._primary_soc = np.where(primary.isna(), flagged, primary.to_numpy(dtype=np.int64, na_value=0))
+
+        socs = paths[['pt_code', 'soc_code']].drop_duplicates()
+        _, soc_counts = np.unique(socs['pt_code'].to_numpy(), return_counts=True)
+        self._soc_offsets = np.concatenate(([0], np.cumsum(soc_counts)))
+        self._socs = socs['soc_code'].to_numpy()
+
+    @classmethod
+    def from_files(cls, mdhier_path: str, llt_path: str,
+                   config: Optional[ProcessingConfig] = None) -> 'MeddraHierarchy':
+        """
+        Builds the hierarchy from the mdhier.asc and llt.asc files of a release,
+        through the snapshot cache when config.snapshot_dir is set.
+        """
+        config = config or ProcessingConfig()
+        reader = get_reader(config.reader, config)
+        snapshots = create_snapshot_cache(config)
+        mappings = generate_meddra_file_mappings()
+
+        frames = []
+        for path, file_type, columns in ((mdhier_path, 'mdhier.asc', MDHIER_COLUMNS),
+                                         (llt_path, 'llt.asc', LLT_COLUMNS)):
+            mapping = mappings[file_type]
+            inspection = inspect_file(path)
+            if snapshots:
+                frames.append(snapshots.read_file_columns(
+                    reader, path, inspection['checksum'], mapping['columns'], inspection['encoding'],
+                    mapping['dtypes'], columns
+                ))
+            else:
+                frames.append(read_file_columns(
+                    reader, path, mapping['columns'], inspection['encoding'], mapping['dtypes'], columns
+                ))
+        return cls(*frames)
+
+    @classmethod
+    def from_database(cls, db_manager, version: float, language: str) -> 'MeddraHierarchy':
+        """Builds the hierarchy from the loaded tables of a version and language."""
+        frames = []
+        with db_manager.engine.connect() as conn:
+            for model_class, columns in ((MeddraMdHierarchy, MDHIER_COLUMNS), (MeddraLowLevelTerm, LLT_COLUMNS)):
+                table = model_class.__table__
+                query = select(*[table.c[col] for col in columns]).where(
+                    table.c.version == version,
+                    table.c.language == language
+                )
+                frames.append(pd.read_sql(query, conn))
+        return cls(*frames)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the arrays of the hierarchy."""
+        arrays = (self._llt_pt, self._path_offsets, self._paths, self._primary_soc, self._soc_offsets, self._socs)
+        return self.llts.nbytes + self.pts.nbytes + sum(array.nbytes for array in arrays)
+
+    def llt_to_pt(self, llt_code: int) -> Optional[int]:
+        """Returns the PT of an LLT."""
+        position = self.llts.position(llt_code)
+        return None if position == MISSING else int(self._llt_pt[position])
+
+    def primary_soc(self, pt_code: int) -> Optional[int]:
+        """Returns the primary SOC of a PT."""
+        position = self.pts.position(pt_code)
+        return None if position == MISSING else int(self._primary_soc[position])
+
+    def pt_to_socs(self, pt_code: int) -> np.ndarray:
+        """Returns the SOCs of a PT, primary SOC first."""
+        position = self.pts.position(pt_code)
+        if position == MISSING:
+            return self._socs[:0]
+        return self._socs[self._soc_offsets[position]:self._soc_offsets[position + 1]]
+
+    def pt_paths(self, pt_code: int) -> np.ndarray:
+        """Returns the (HLT, HLGT, SOC) rows of a PT, primary path first."""
+        position = self.pts.position(pt_code)
+        if position == MISSING:
+            return self._paths[:0]
+        return self._paths[self._path_offsets[position]:self._path_offsets[position + 1]]
+
+    def llts_to_pts(self, llt_codes: np.ndarray) -> np.ndarray:
+        """Returns the PT of each LLT."""
+        return _take(self._llt_pt, self.llts.positions(llt_codes))
+
+    def primary_socs(self, pt_codes: np.ndarray) -> np.ndarray:
+        """Returns the primary SOC of each PT."""
+        return _take(self._primary_soc, self.pts.positions(pt_codes))
+
+    def pts_to_socs(self, pt_codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the SOCs of each PT as (index, soc) pairs, index being the position
+        of the PT in pt_codes. Unknown PTs have no pairs.
+        """
+        positions = self.pts.positions(pt_codes)
+        known = np.flatnonzero(positions != MISSING)
+        starts = self._soc_offsets[positions[known]]
+        counts = self._soc_offsets[positions[known] + 1] - starts
+
+        index = np.repeat(known, counts)
+        # Position of every SOC: its PT's start plus its rank within the PT
+        ranks = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return index, self._socs[np.repeat(starts, counts) + ranks]
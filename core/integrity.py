@@ -0,0 +1,199 @@
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from config import ProcessingConfig
+from core.readers import get_reader, read_file_columns
+from core.snapshots import create_snapshot_cache
+from models import generate_meddra_file_mappings
+from utils.file_utils import get_file_type_from_path, inspect_file
+
+# Orphan codes kept per relationship for the report; all of them are counted
+MAX_SAMPLES = 10
+
+@dataclass(frozen=True)
+class Relationship:
+    """A code column of one file that must exist in a code column of another file."""
+    child: str
+    child_column: str
+    parent: str
+    parent_column: str
+    # Only child rows whose column holds one of the values are checked
+    only: Optional[Tuple[str, Tuple[int, ...]]] = None
+
+    def __str__(self) -> str:
+        condition = f" ({self.only[0]} in {', '.join(map(str, self.only[1]))})" if self.only else ""
+        return (f"{self.child.rsplit('.', 1)[0]}.{self.child_column}{condition} -> "
+                f"{self.parent.rsplit('.', 1)[0]}.{self.parent_column}")
+
+RELATIONSHIPS = [
+    Relationship('llt.asc', 'pt_code', 'pt.asc', 'pt_code'),
+    Relationship('pt.asc', 'pt_soc_code', 'soc.asc', 'soc_code'),
+    Relationship('hlt_pt.asc', 'hlt_code', 'hlt.asc', 'hlt_code'),
+    Relationship('hlt_pt.asc', 'pt_code', 'pt.asc', 'pt_code'),
+    Relationship('hlgt_hlt.asc', 'hlgt_code', 'hlgt.asc', 'hlgt_code'),
+    Relationship('hlgt_hlt.asc', 'hlt_code', 'hlt.asc', 'hlt_code'),
+    Relationship('soc_hlgt.asc', 'soc_code', 'soc.asc', 'soc_code'),
+    Relationship('soc_hlgt.asc', 'hlgt_code', 'hlgt.asc', 'hlgt_code'),
+    Relationship('mdhier.asc', 'pt_code', 'pt.asc', 'pt_code'),
+    Relationship('mdhier.asc', 'hlt_code', 'hlt.asc', 'hlt_code'),
+    Relationship('mdhier.asc', 'hlgt_code', 'hlgt.asc', 'hlgt_code'),
+    Relationship('mdhier.asc', 'soc_code', 'soc.asc', 'soc_code'),
+    Relationship('intl_ord.asc', 'soc_code', 'soc.asc', 'soc_code'),
+    Relationship('smq_content.asc', 'smq_code', 'smq_list.asc', 'smq_code'),
+    # Level 0 terms are sub-SMQs, levels 1 to 3 SOCs, HLGTs and HLTs, and levels 4 and 5
+    # PTs and LLTs; every PT is also an LLT
+    Relationship('smq_content.asc', 'term_code', 'smq_list.asc', 'smq_code', only=('term_level', (0,))),
+    Relationship('smq_content.asc', 'term_code', 'soc.asc', 'soc_code', only=('term_level', (1,))),
+    Relationship('smq_content.asc', 'term_code', 'hlgt.asc', 'hlgt_code', only=('term_level', (2,))),
+    Relationship('smq_content.asc', 'term_code', 'hlt.asc', 'hlt_code', only=('term_level', (3,))),
+    Relationship('smq_content.asc', 'term_code', 'llt.asc', 'llt_code', only=('term_level', (4, 5))),
+]
+
+@dataclass
+class RelationshipCheck:
+    """The orphans found for one relationship."""
+    relationship: Relationship
+    rows_checked: int = 0
+    orphan_rows: int = 0
+    orphan_codes: int = 0
+    samples: List[int] = field(default_factory=list)
+    skipped: Optional[str] = None
+
+    @property
+    def valid(self) -> bool:
+        return self.orphan_rows == 0
+
+def find_orphans(codes: np.ndarray, parent_codes: np.ndarray) -> np.ndarray:
+    """Returns a mask of the codes missing from the sorted, unique parent codes."""
+    positions = np.searchsorted(parent_codes, codes)
+    found = positions < len(parent_codes)
+    found[found] = parent_codes[positions[found]] == codes[found]
+    return ~found
+
+class IntegrityChecker:
+    """
+    Checks that the codes referenced across the hierarchy files exist.
+
+    The tables have no foreign keys, so nothing stops orphan rows from loading.
+    Only the code columns are loaded, from the files of a release or from the
+    rows of a version in the database. Each parent column becomes a sorted array
+    of unique int64 codes, and every child column is matched against it at once
+    with a binary search.
+    """
+
+    def __init__(self, config: ProcessingConfig, db_manager=None):
+        self.config = config
+        self.db_manager = db_manager
+        self.file_mappings = generate_meddra_file_mappings()
+        self.columns: Dict[str, List[str]] = {}
+        for relationship in RELATIONSHIPS:
+            self._need(relationship.child, relationship.child_column)
+            self._need(relationship.parent, relationship.parent_column)
+            if relationship.only:
+                self._need(relationship.child, relationship.only[0])
+
+    def _need(self, file_type: str, column: str) -> None:
+        columns = self.columns.setdefault(file_type, [])
+        if column not in columns:
+            columns.append(column)
+
+    def codes_from_files(self, file_paths: Iterable[str]) -> Dict[str, pd.DataFrame]:
+        """Reads the code columns of the given release files, through the snapshot cache if configured."""
+        reader = get_reader(self.config.reader, self.config)
+        snapshots = create_snapshot_cache(self.config)
+        codes = {}
+        for file_path in file_paths:
+            file_type = get_file_type_from_path(file_path)
+            if file_type not in self.columns:
+                continue
+            mapping = self.file_mappings[file_type]
+            inspection = inspect_file(file_path)
+            if snapshots:
+                codes[file_type] = snapshots.read_file_columns(
+                    reader, file_path, inspection['checksum'], mapping['columns'], inspection['encoding'],
+                    mapping['dtypes'], self.columns[file_type]
+                )
+            else:
+                codes[file_type] = read_file_columns(
+                    reader, file_path, mapping['columns'], inspection['encoding'],
+                    mapping['dtypes'], self.columns[file_type]
+                )
+        return codes
+
+    def codes_from_database(self) -> Dict[str, pd.DataFrame]:
+        """Reads the code columns of the configured version and language from the database."""
+        codes = {}
+        with self.db_manager.engine.connect() as conn:
+            for file_type, usecols in self.columns.items():
+                table = self.file_mappings[file_type]['model'].__table__
+                query = select(*[table.c[col] for col in usecols]).where(
+                    table.c.version == self.config.version,
+                    table.c.language == self.config.language
+                )
+                df = pd.read_sql(query, conn)
+                if not df.empty:
+                    codes[file_type] = df
+        return codes
+
+    def check(self, codes: Dict[str, pd.DataFrame]) -> List[RelationshipCheck]:
+        """Finds the orphan codes of every relationship whose files are both present."""
+        parents: Dict[Tuple[str, str], np.ndarray] = {}
+        results = []
+        for relationship in RELATIONSHIPS:
+            result = RelationshipCheck(relationship)
+            results.append(result)
+            missing = [name for name in (relationship.child, relationship.parent) if name not in codes]
+            if missing:
+                result.skipped = f"{', '.join(missing)} not available"
+                continue
+
+            key = (relationship.parent, relationship.parent_column)
+            if key not in parents:
+                parents[key] = np.unique(self._as_int64(codes[relationship.parent][relationship.parent_column]))
+
+            child = codes[relationship.child]
+            values = child[relationship.child_column]
+            if relationship.only:
+                column, allowed = relationship.only
+                values = values[child[column].isin(allowed).to_numpy(dtype=bool, na_value=False)]
+            child_codes = self._as_int64(values)
+
+            orphans = child_codes[find_orphans(child_codes, parents[key])]
+            orphan_codes = np.unique(orphans)
+            result.rows_checked = len(child_codes)
+            result.orphan_rows = len(orphans)
+            result.orphan_codes = len(orphan_codes)
+            result.samples = orphan_codes[:MAX_SAMPLES].tolist()
+        return results
+
+    @staticmethod
+    def _as_int64(values: pd.Series) -> np.ndarray:
+        """Returns the non-null codes of a column as int64, whatever type they were read as."""
+        # Nullable integers keep codes beyond 2 ** 53 exact, where float64 would round them;
+        # convert_dtypes turns NaN into NA first, which to_numeric would keep as a non-missing value
+        numbers = pd.to_numeric(values.convert_dtypes(), errors='coerce', dtype_backend='numpy_nullable')
+        numbers = numbers.astype('Int64').dropna()
+        return numbers.to_numpy(dtype=np.int64)
+
+def print_integrity_report(results: List[RelationshipCheck], elapsed: float) -> bool:
+    """Prints the orphans of each relationship and returns whether none were found."""
+    print(f"\n=== Integrity Check ({elapsed:.2f}s) ===")
+    for result in results:
+        if result.skipped:
+            print(f"- {result.relationship}: skipped ({result.skipped})")
+        elif result.valid:
+            print(f"✓ {result.relationship}: {result.rows_checked} rows")
+        else:
+            print(f"✗ {result.relationship}: {result.orphan_rows} of {result.rows_checked} rows reference "
+                  f"{result.orphan_codes} missing codes, e.g. {', '.join(map(str, result.samples))}")
+    return all(result.valid for result in results)
+
+def run_integrity_check(checker: IntegrityChecker, file_paths: Optional[List[str]] = None) -> bool:
+    """Checks the given files, or the database when no files are given, and prints the report."""
+    start_time = time.perf_counter()
+    codes = checker.codes_from_files(file_paths) if file_paths is not None else checker.codes_from_database()
+    results = checker.check(codes)
+    return print_integrity_report(results, time.perf_counter() - start_time)
@@ -0,0 +1,68 @@
+from datetime import datetime
+from typing import Dict, List
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from config import ProcessingConfig
+from database.connection import DatabaseManager
+from models import MeddraLoadManifest
+
+class LoadManifest:
+    """
+    Manifest of the files completely loaded for a version and language.
+
+    Each successful load records the SHA-256 checksum, load profile and row count
+    of its file. A file is unchanged when its checksum and load profile match its
+    entry, so loading it again would write the same rows. The entry of a file is
+    removed when its load starts and written again when it completes, so a failed
+    reload never leaves a matching entry behind.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, config: ProcessingConfig):
+        self.db_manager = db_manager
+        self.config = config
+
+    def loaded_files(self) -> Dict[str, MeddraLoadManifest]:
+        """Returns the manifest entries of the configured version and language by file type."""
+        MeddraLoadManifest.__table__.create(self.db_manager.engine, checkfirst=True)
+
+        with self.db_manager.session_scope() as session:
+            entries = session.scalars(select(MeddraLoadManifest).where(*self._key_filter())).all()
+            session.expunge_all()
+        return {entry.file_type: entry for entry in entries}
+
+    def is_unchanged(self, entry: MeddraLoadManifest, file_checksum: str) -> bool:
+        """Checks if a file was loaded with the same contents and load profile."""
+        return entry.file_checksum == file_checksum and entry.load_profile == self.config.load_profile
+
+    def start(self, file_type: str) -> None:
+        """Removes the entry of a file whose load is starting."""
+        MeddraLoadManifest.__table__.create(self.db_manager.engine, checkfirst=True)
+
+        with self.db_manager.session_scope() as session:
+            self.clear(session, file_type)
+
+    def complete(self, file_type: str, file_checksum: str, records_loaded: int) -> None:
+        """Records a completely loaded file."""
+        with self.db_manager.session_scope() as session:
+            self.clear(session, file_type)
+            session.add(MeddraLoadManifest(
+                file_type=file_type,
+                file_checksum=file_checksum,
+                load_profile=self.config.load_profile,
+                records_loaded=records_loaded,
+                created_at=datetime.now(),
+                language=self.config.language,
+                version=self.config.version
+            ))
+
+    def clear(self, session: Session, file_type: str) -> None:
+        """Removes the entry of a file inside the given session."""
+        session.execute(delete(MeddraLoadManifest).where(
+            MeddraLoadManifest.file_type == file_type, *self._key_filter()
+        ))
+
+    def _key_filter(self) -> List:
+        return [
+            MeddraLoadManifest.version == self.config.version,
+            MeddraLoadManifest.language == self.config.language
+        ]
@@ -0,0 +1,51 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.util import Finalize
+from typing import Iterator, List, Tuple
+from config import AppConfig
+from core.base import ProcessorResult
+from core.file_processor import create_file_processor
+from database.connection import DatabaseManager
+
+# Per-worker file processor, created by init_worker() after the worker is forked
+_file_processor = None
+
+def init_worker(config: AppConfig) -> None:
+    """Creates the database engine and file processor owned by a worker process."""
+    global _file_processor
+    
+    db_manager = DatabaseManager(config.database)
+    _file_processor = create_file_processor(db_manager, config.processing)
+    
+    # Dispose the engine when the worker exits instead of dropping its connections
+    Finalize(None, db_manager.close, exitpriority=10)
+
+def process_file(file_path: str) -> ProcessorResult:
+    """Processes a single file in the current worker process."""
+    return _file_processor.process(file_path)
+
+def schedule_largest_first(file_paths: List[str]) -> List[str]:
+    """Orders files by decreasing size so the longest loads start first."""
+    return sorted(file_paths, key=os.path.getsize, reverse=True)
+
+def process_files_in_parallel(file_paths: List[str], config: AppConfig,
+                              jobs: int) -> Iterator[Tuple[str, ProcessorResult]]:
+    """
+    Processes files across a pool of worker processes.
+    
+    Yields (file_path, result) pairs in completion order. Each worker opens its own
+    database engine, so the caller must not share a live engine with the pool.
+    """
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(config,)) as executor:
+        futures = {
+            executor.submit(process_file, file_path): file_path
+            for file_path in schedule_largest_first(file_paths)
+        }
+        
+        for future in as_completed(futures):
+            file_path = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = ProcessorResult(success=False, error=e)
+            yield file_path, result
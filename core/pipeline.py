@@ -0,0 +1,132 @@
+import queue
+import threading
+import time
+from typing import Callable, Iterable, List, Optional, Tuple, Type
+import pandas as pd
+from sqlalchemy import Table
+from core.base import FileChunk
+from core.batch_processor import BatchProcessor
+from utils.progress import ProgressTracker
+
+class ChunkPipeline:
+    """
+    Overlaps chunk parsing and database writes.
+    
+    A reader thread parses and preprocesses chunks into a bounded queue that one or
+    more writer threads drain. The queue bound provides backpressure, so at most
+    queue_size preprocessed chunks wait in memory besides those being written.
+    The first error raised by any thread stops the pipeline and is re-raised by run().
+    """
+    
+    _DONE = object()
+    _POLL_INTERVAL = 0.1
+    
+    def __init__(self, batch_processor: BatchProcessor, writers: int, queue_size: Optional[int] = None):
+        self.batch_processor = batch_processor
+        self.writers = writers
+        self.queue_size = queue_size or writers * 2
+        self._queue = None
+        self._stop = None
+        self._lock = threading.Lock()
+        self._errors: List[Exception] = []
+        self._total_records = 0
+        self._batches_done = 0
+        self._bytes_done = 0
+    
+    def run(self, chunks: Iterable[FileChunk], preprocess: Callable[[pd.DataFrame], pd.DataFrame],
+            model_class: Type, progress_tracker: ProgressTracker,
+            checkpoint_for: Optional[Callable] = None, table: Optional[Table] = None) -> Tuple[int, int]:
+        """Runs the pipeline over the chunks of a file and returns (records, batches)."""
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._stop = threading.Event()
+        self._bytes_done = progress_tracker.processed_bytes
+        
+        threads = [threading.Thread(target=self._read, args=(chunks, preprocess), name='meddra-reader')]
+        threads += [
+            threading.Thread(target=self._write, args=(model_class, progress_tracker, checkpoint_for, table),
+                             name=f'meddra-writer-{i}')
+            for i in range(self.writers)
+        ]
+        
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        if self._errors:
+            raise self._errors[0]
+        
+        return self._total_records, self._batches_done
+    
+    def _read(self, chunks: Iterable[FileChunk], preprocess: Callable[[pd.DataFrame], pd.DataFrame]) -> None:
+        """Produces (chunk, preprocessed data) items for the writers."""
+        try:
+            for chunk in chunks:
+                stage_start = time.perf_counter()
+                processed_chunk = preprocess(chunk.data)
+                chunk.timings['preprocess'] = time.perf_counter() - stage_start
+                
+                if not self._put((chunk, processed_chunk)):
+                    return
+        except Exception as e:
+            self._fail(e)
+        finally:
+            for _ in range(self.writers):
+                self._put(self._DONE)
+    
+    def _write(self, model_class: Type, progress_tracker: ProgressTracker,
+               checkpoint_for: Optional[Callable], table: Optional[Table]) -> None:
+        """Drains the queue, writing each chunk as a batch."""
+        while True:
+            try:
+                item = self._queue.get(timeout=self._POLL_INTERVAL)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return
+                continue
+            
+            if item is self._DONE or self._stop.is_set():
+                return
+            
+            chunk, processed_chunk = item
+            try:
+                batch_result = self.batch_processor.process_batch(
+                    processed_chunk,
+                    model_class,
+                    chunk.batch_number,
+                    checkpoint=checkpoint_for(chunk) if checkpoint_for else None,
+                    table=table
+                )
+            except Exception as e:
+                self._fail(e)
+                return
+            
+            if not batch_result.success:
+                self._fail(batch_result.error)
+                return
+            
+            with self._lock:
+                self._total_records += batch_result.records_processed
+                self._batches_done += 1
+                self._bytes_done += chunk.size
+                
+                progress_tracker.update(self._batches_done, len(processed_chunk), self._total_records, self._bytes_done)
+                progress_tracker.record_batch(chunk.batch_number, len(processed_chunk), chunk.size,
+                                              {**chunk.timings, **batch_result.details['timings']})
+                progress_tracker.print_progress()
+    
+    def _put(self, item) -> bool:
+        """Puts an item in the queue, giving up if the pipeline was stopped."""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=self._POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def _fail(self, error: Exception) -> None:
+        """Records an error and stops every thread of the pipeline."""
+        with self._lock:
+            self._errors.append(error)
+        self._stop.set()
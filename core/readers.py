@@ -0,0 +1,525 @@
+import functools
+import io
+import itertools
+import mmap
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from config import ProcessingConfig
+from core.base import FileChunk
+from exceptions import InvalidConfigurationError
+
+NUMERIC_DTYPES = ('Int64', 'Float64')
+
+NEWLINE = ord('\n')
+CARRIAGE_RETURN = ord('\r')
+
+class BaseReader(ABC):
+    """
+    Abstract base class for the engines that parse MedDRA files.
+
+    The base class cuts the file into blocks of whole lines, so every engine yields
+    the same FileChunk objects with exact byte ranges; engines only parse a block.
+    """
+
+    name = None
+
+    def __init__(self, config: ProcessingConfig):
+        self.config = config
+
+    def read_chunks(self, file_path: str, columns: List[str], encoding: str,
+                    start_offset: int = 0, first_batch_number: int = 1,
+                    dtypes: Optional[Dict[str, str]] = None,
+                    usecols: Optional[List[str]] = None,
+                    batch_size: Optional[Callable[[], int]] = None) -> Iterator[FileChunk]:
+        """
+        Reads a file in chunks of batch_size lines, starting at a line boundary.
+
+        dtypes maps columns to the dtypes derived from the model (see
+        models.get_column_dtypes); every chunk is cast to them. usecols lists the
+        columns to keep, all of them by default; the others are not parsed.
+        batch_size returns the number of lines of the next chunk when the size is
+        adjusted during the load (see core.batch_sizing); config.batch_size otherwise.
+        """
+        next_size = batch_size or (lambda: self.config.batch_size)
+        with open(file_path, 'rb') as f:
+            f.seek(start_offset)
+            batch_number = first_batch_number
+
+            while True:
+                lines = list(itertools.islice(f, next_size()))
+                if not lines:
+                    break
+
+                df_chunk = apply_dtypes(self.parse(b''.join(lines), columns, encoding, dtypes, usecols), dtypes)
+
+                end_offset = f.tell()
+                yield FileChunk(batch_number, df_chunk, start_offset, end_offset)
+
+                start_offset = end_offset
+                batch_number += 1
+
+    @abstractmethod
+    def parse(self, block: bytes, columns: List[str], encoding: str,
+              dtypes: Optional[Dict[str, str]] = None,
+              usecols: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Parses a block of whole lines into a DataFrame with the given columns.
+
+        Only usecols are kept when given. Columns with a dtype are not inferred:
+        text columns keep the file's text.
+        """
+        pass
+
+class PandasReader(BaseReader):
+    """
+    Parses blocks with pandas.read_csv (C engine).
+
+    read_csv keeps some lines with too many fields, truncated, so blocks whose lines
+    do not all have the expected number of fields are parsed by the csv engine. All
+    columns are parsed and usecols selected afterwards, as read_csv fails on blocks
+    of short lines when given usecols.
+    """
+
+    name = 'pandas'
+
+    def __init__(self, config: ProcessingConfig):
+        super().__init__(config)
+        self._fallback = CsvReader(config)
+
+    def parse(self, block: bytes, columns: List[str], encoding: str,
+              dtypes: Optional[Dict[str, str]] = None,
+              usecols: Optional[List[str]] = None) -> pd.DataFrame:
+        if uniform_field_count(block, len(columns), self.config.separator.encode(encoding)[0]) is None:
+            return self._fallback.parse(block, columns, encoding, dtypes, usecols)
+
+        df = pd.read_csv(
+            io.BytesIO(block),
+            sep=self.config.separator,
+            names=columns,
+            on_bad_lines='skip',
+            encoding=encoding,
+            index_col=False,
+            # Text columns are categorized by the C parser; numbers are cast afterwards
+            dtype={col: dtype for col, dtype in (dtypes or {}).items() if dtype not in NUMERIC_DTYPES},
+        )
+        return df if usecols is None else df[usecols]
+
+class CsvReader(BaseReader):
+    """
+    Parses blocks with str.split, without any CSV machinery.
+
+    MedDRA files are plain delimited text without quoting, so splitting each line
+    is enough. Lines are handled like the pandas engine: one trailing separator is
+    ignored, longer lines are skipped and shorter lines are padded with nulls.
+    Columns without a dtype are inferred the same way pandas does.
+    """
+
+    name = 'csv'
+
+    def parse(self, block: bytes, columns: List[str], encoding: str,
+              dtypes: Optional[Dict[str, str]] = None,
+              usecols: Optional[List[str]] = None) -> pd.DataFrame:
+        separator = self.config.separator
+        width = len(columns)
+
+        rows = []
+        for line in block.decode(encoding).splitlines():
+            if not line:
+                continue
+
+            fields = line.split(separator)
+            if len(fields) > width:
+                if len(fields) == width + 1 and fields[-1] == '':
+                    fields.pop()
+                else:
+                    continue
+            elif len(fields) < width:
+                fields.extend([''] * (width - len(fields)))
+            rows.append(fields)
+
+        df = pd.DataFrame(rows, columns=columns, dtype=object)
+        if usecols is not None:
+            df = df[usecols]
+        for col in df.columns:
+            if not dtypes or col not in dtypes:
+                df[col] = self._infer(df[col].mask(df[col] == ''))
+        return df
+
+    @staticmethod
+    def _infer(series: pd.Series) -> pd.Series:
+        """Converts a column of strings to numbers when every value is numeric."""
+        try:
+            return pd.to_numeric(series)
+        except (ValueError, TypeError):
+            return series
+
+class ArrowReader(BaseReader):
+    """
+    Parses blocks with the multithreaded PyArrow CSV reader.
+
+    PyArrow can only skip rows with an unexpected number of fields, so blocks whose
+    lines do not all have the expected number of fields are parsed by the csv engine.
+    """
+
+    name = 'arrow'
+
+    def __init__(self, config: ProcessingConfig):
+        super().__init__(config)
+        try:
+            import pyarrow
+            from pyarrow import csv
+        except ImportError:
+            raise InvalidConfigurationError("Reader 'arrow' requires pyarrow (pip install pyarrow)")
+        self._pa = pyarrow
+        self._csv = csv
+        self._fallback = CsvReader(config)
+
+    def parse(self, block: bytes, columns: List[str], encoding: str,
+              dtypes: Optional[Dict[str, str]] = None,
+              usecols: Optional[List[str]] = None) -> pd.DataFrame:
+        fields = uniform_field_count(block, len(columns), self.config.separator.encode(encoding)[0])
+        if fields is None:
+            return self._fallback.parse(block, columns, encoding, dtypes, usecols)
+
+        # MedDRA lines end with the separator, which reads as one more empty column
+        column_names = columns + ['_trailing'] if fields > len(columns) else columns
+
+        table = self._csv.read_csv(
+            io.BytesIO(block),
+            read_options=self._csv.ReadOptions(column_names=column_names, encoding=encoding, use_threads=True),
+            parse_options=self._csv.ParseOptions(
+                delimiter=self.config.separator,
+                quote_char=False
+            ),
+            convert_options=self._csv.ConvertOptions(
+                include_columns=columns if usecols is None else usecols,
+                column_types={col: self._pa.string() for col, dtype in (dtypes or {}).items()
+                              if dtype not in NUMERIC_DTYPES}
+            )
+        )
+        return table.to_pandas()
+
+class AutoReader(BaseReader):
+    """
+    Picks the fastest available engine for each file type on this host.
+
+    The first block of a file is parsed with every engine and the quickest one is
+    kept for the rest of the file and for later files of the same type.
+    """
+
+    name = 'auto'
+
+    def __init__(self, config: ProcessingConfig):
+        super().__init__(config)
+        self.engines = [reader_class(config) for reader_class in available_readers()]
+        self._chosen: Dict[str, BaseReader] = {}
+        self._current: Optional[BaseReader] = None
+
+    def read_chunks(self, file_path: str, columns: List[str], encoding: str,
+                    start_offset: int = 0, first_batch_number: int = 1,
+                    dtypes: Optional[Dict[str, str]] = None,
+                    usecols: Optional[List[str]] = None,
+                    batch_size: Optional[Callable[[], int]] = None) -> Iterator[FileChunk]:
+        # Columns identify the file type, and with it the model, across files
+        key = '$'.join(columns)
+        self._current = self._chosen.get(key)
+        for chunk in super().read_chunks(file_path, columns, encoding, start_offset, first_batch_number,
+                                         dtypes, usecols, batch_size):
+            if key not in self._chosen:
+                self._chosen[key] = self._current
+            yield chunk
+
+    def parse(self, block: bytes, columns: List[str], encoding: str,
+              dtypes: Optional[Dict[str, str]] = None,
+              usecols: Optional[List[str]] = None) -> pd.DataFrame:
+        if self._current is not None:
+            return self._current.parse(block, columns, encoding, dtypes, usecols)
+
+        timings = []
+        for engine in self.engines:
+            start_time = time.perf_counter()
+            df = apply_dtypes(engine.parse(block, columns, encoding, dtypes, usecols), dtypes)
+            timings.append((time.perf_counter() - start_time, engine.name, engine, df))
+
+        _, name, self._current, df = min(timings, key=lambda timing: timing[0])
+        print(f"Reader: {name} ({', '.join(f'{n} {t * 1000:.1f}ms' for t, n, _, _ in timings)})")
+        return df
+
+class MmapReader(BaseReader):
+    """
+    Tokenizes memory-mapped files with NumPy.
+
+    Line and field boundaries are found with vectorized searches on the raw bytes,
+    numeric columns are decoded digit by digit straight into int64 arrays, and only
+    text columns create Python strings. Blocks whose lines do not all have the
+    expected number of fields are parsed by the csv engine instead.
+    """
+
+    name = 'mmap'
+    SCAN_WINDOW = 8 * 1024 * 1024
+    MAX_DIGITS = 18
+    # Longest text field decoded through a fixed-width character matrix
+    MAX_VECTOR_WIDTH = 256
+
+    def __init__(self, config: ProcessingConfig):
+        super().__init__(config)
+        self._fallback = CsvReader(config)
+
+    def read_chunks(self, file_path: str, columns: List[str], encoding: str,
+                    start_offset: int = 0, first_batch_number: int = 1,
+                    dtypes: Optional[Dict[str, str]] = None,
+                    usecols: Optional[List[str]] = None,
+                    batch_size: Optional[Callable[[], int]] = None) -> Iterator[FileChunk]:
+        separator = self.config.separator.encode(encoding)
+        if len(separator) != 1 or os.path.getsize(file_path) == 0:
+            yield from self._fallback.read_chunks(file_path, columns, encoding, start_offset, first_batch_number,
+                                                  dtypes, usecols, batch_size)
+            return
+
+        next_size = batch_size or (lambda: self.config.batch_size)
+
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data = np.frombuffer(mm, dtype=np.uint8)
+            try:
+                line_ends = self._find_line_ends(data, start_offset)
+                batch_number = first_batch_number
+
+                first = 0
+                while first < len(line_ends):
+                    ends = line_ends[first:first + next_size()]
+                    first += len(ends)
+                    end_offset = min(int(ends[-1]) + 1, len(data))
+
+                    df_chunk = self._parse_lines(
+                        data, mm, start_offset, ends, separator[0], columns, encoding, dtypes or {}, usecols
+                    )
+                    yield FileChunk(batch_number, df_chunk, start_offset, end_offset)
+
+                    start_offset = end_offset
+                    batch_number += 1
+            finally:
+                # The mmap cannot be closed while NumPy still exports its buffer
+                del data
+
+    def parse(self, block: bytes, columns: List[str], encoding: str,
+              dtypes: Optional[Dict[str, str]] = None,
+              usecols: Optional[List[str]] = None) -> pd.DataFrame:
+        return self._fallback.parse(block, columns, encoding, dtypes, usecols)
+
+    def _find_line_ends(self, data: np.ndarray, start: int) -> np.ndarray:
+        """Returns the position of every line end, scanning a window at a time."""
+        parts = [
+            np.flatnonzero(data[position:position + self.SCAN_WINDOW] == NEWLINE) + position
+            for position in range(start, len(data), self.SCAN_WINDOW)
+        ]
+        line_ends = np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+        # A last line without a newline ends at the end of the file
+        if len(data) > start and data[-1] != NEWLINE:
+            line_ends = np.append(line_ends, len(data))
+        return line_ends
+
+    def _parse_lines(self, data: np.ndarray, mm: mmap.mmap, block_start: int, ends: np.ndarray,
+                     separator: int, columns: List[str], encoding: str,
+                     dtypes: Dict[str, str], usecols: Optional[List[str]]) -> pd.DataFrame:
+        block_end = min(int(ends[-1]) + 1, len(data))
+        starts = np.concatenate(([block_start], ends[:-1] + 1))
+
+        # Strip carriage returns and skip blank lines
+        content_ends = ends.copy()
+        has_cr = (content_ends > starts) & (data[np.maximum(content_ends - 1, 0)] == CARRIAGE_RETURN)
+        content_ends[has_cr] -= 1
+        non_blank = content_ends > starts
+        starts, content_ends = starts[non_blank], content_ends[non_blank]
+
+        separators = np.flatnonzero(data[block_start:block_end] == separator) + block_start
+        counts = np.searchsorted(separators, content_ends) - np.searchsorted(separators, starts)
+
+        width = len(columns)
+        if len(starts) and (counts == width - 1).all():
+            field_ends = separators.reshape(len(starts), width - 1)
+            field_ends = np.column_stack((field_ends, content_ends))
+        elif len(starts) and (counts == width).all() and (data[content_ends - 1] == separator).all():
+            # One trailing separator per line, as in the MedDRA distribution files
+            field_ends = separators.reshape(len(starts), width)
+        else:
+            return apply_dtypes(
+                self._fallback.parse(bytes(mm[block_start:block_end]), columns, encoding, dtypes, usecols), dtypes
+            )
+
+        field_starts = np.column_stack((starts, field_ends[:, :-1] + 1))
+
+        block = bytes(mm[block_start:block_end])
+        # Characters map one to one onto bytes unless the block holds multi-byte sequences
+        code_points = self._code_points(encoding) if len(block.decode(encoding)) == len(block) else None
+
+        frame = {}
+        for position, col in enumerate(columns):
+            if usecols is not None and col not in usecols:
+                continue
+            col_starts = field_starts[:, position]
+            col_ends = field_ends[:, position]
+            dtype = dtypes.get(col, 'object')
+
+            values = None
+            if dtype in NUMERIC_DTYPES:
+                values = self._decode_integers(data, col_starts, col_ends, dtype)
+            if values is None:
+                values = self._decode_text(data, col_starts, col_ends, code_points, block, block_start, encoding)
+            frame[col] = values
+
+        return apply_dtypes(pd.DataFrame(frame), dtypes)
+
+    def _decode_integers(self, data: np.ndarray, starts: np.ndarray, ends: np.ndarray, dtype: str):
+        """Decodes unsigned decimal fields into a nullable array, or None if any is not one."""
+        lengths = ends - starts
+        if len(lengths) == 0 or lengths.max() > self.MAX_DIGITS:
+            return None
+
+        values = np.zeros(len(starts), dtype=np.int64)
+        for offset in range(int(lengths.max())):
+            active = lengths > offset
+            digits = data[np.where(active, starts + offset, 0)].astype(np.int64) - ord('0')
+            if ((digits < 0) | (digits > 9))[active].any():
+                return None
+            values = np.where(active, values * 10 + digits, values)
+
+        missing = lengths == 0
+        if dtype == 'Float64':
+            return pd.arrays.FloatingArray(values.astype(np.float64), missing)
+        return pd.arrays.IntegerArray(values, missing)
+
+    def _decode_text(self, data: np.ndarray, starts: np.ndarray, ends: np.ndarray,
+                     code_points: Optional[np.ndarray], block: bytes, block_start: int,
+                     encoding: str) -> np.ndarray:
+        """Extracts text fields, with NaN for empty fields like pandas."""
+        lengths = ends - starts
+        width = int(lengths.max()) if len(lengths) else 0
+
+        if code_points is None or width > self.MAX_VECTOR_WIDTH:
+            fields = [block[start:end].decode(encoding) if end > start else np.nan
+                      for start, end in zip((starts - block_start).tolist(), (ends - block_start).tolist())]
+            return np.array(fields, dtype=object)
+
+        # Gather the bytes of every field into a zero padded matrix and map them to
+        # code points, which NumPy reads as fixed-width unicode strings
+        offsets = np.arange(max(width, 1))
+        in_field = offsets < lengths[:, None]
+        raw = data[np.where(in_field, starts[:, None] + offsets, 0)]
+        characters = np.where(in_field, code_points[raw], 0).astype(np.uint32)
+
+        values = characters.view(f'U{max(width, 1)}').ravel().astype(object)
+        values[lengths == 0] = np.nan
+        return values
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _code_points(encoding: str) -> np.ndarray:
+        """Returns the code point of each byte value, read as a single-byte encoding."""
+        # Bytes that are not characters on their own (UTF-8 beyond ASCII) never reach the lookup
+        characters = bytes(range(256)).decode(encoding, errors='replace')
+        return np.array([ord(character) for character in characters], dtype=np.uint32)
+
+def count_fields(block: bytes, separator: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Counts the fields of every line of a block of whole lines.
+
+    Returns the number of fields of each line, whether it ends with the separator
+    and whether it is blank, ignoring carriage returns.
+    """
+    data = np.frombuffer(block, dtype=np.uint8)
+    ends = np.flatnonzero(data == NEWLINE)
+    if len(data) and data[-1] != NEWLINE:
+        ends = np.append(ends, len(data))
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    content_ends = ends - ((ends > starts) & (data[np.maximum(ends - 1, 0)] == CARRIAGE_RETURN))
+
+    separators = np.flatnonzero(data == separator)
+    fields = np.searchsorted(separators, content_ends) - np.searchsorted(separators, starts) + 1
+    trailing = (content_ends > starts) & (data[np.maximum(content_ends - 1, 0)] == separator)
+    return fields, trailing, content_ends == starts
+
+def uniform_field_count(block: bytes, width: int, separator: int) -> Optional[int]:
+    """
+    Returns the number of fields of every non-blank line of a block when they all
+    have width fields, or all width + 1 with a trailing separator; None otherwise.
+
+    Readers hand blocks that are not uniform to the csv engine, so that every engine
+    skips lines with too many fields and pads lines with too few in the same way.
+    """
+    fields, trailing, blank = count_fields(block, separator)
+    fields, trailing = fields[~blank], trailing[~blank]
+    if (fields == width).all():
+        return width
+    if ((fields == width + 1) & trailing).all():
+        return width + 1
+    return None
+
+def apply_dtypes(df: pd.DataFrame, dtypes: Optional[Dict[str, str]]) -> pd.DataFrame:
+    """
+    Casts parsed columns to their model dtypes, with empty strings read as nulls.
+
+    Numeric columns holding values that are not numbers are left as parsed, so the
+    database reports the offending value.
+    """
+    if not dtypes:
+        return df
+
+    for col, dtype in dtypes.items():
+        if col not in df.columns:
+            continue
+
+        series = df[col]
+        if series.dtype == object:
+            series = series.mask(series == '')
+
+        if series.dtype == dtype:
+            pass
+        elif dtype in NUMERIC_DTYPES:
+            try:
+                series = pd.to_numeric(series).astype(dtype)
+            except (ValueError, TypeError):
+                pass
+        else:
+            series = series.astype(dtype)
+        df[col] = series
+    return df
+
+def read_file_columns(reader: BaseReader, file_path: str, columns: List[str], encoding: str,
+                      dtypes: Dict[str, str], usecols: List[str]) -> pd.DataFrame:
+    """Reads only some columns of a whole file into one DataFrame, cast to their dtypes."""
+    chunks = reader.read_chunks(
+        file_path, columns, encoding, dtypes={col: dtypes[col] for col in usecols if col in dtypes}, usecols=usecols
+    )
+    frames = [chunk.data for chunk in chunks]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=usecols)
+
+READERS = {
+    PandasReader.name: PandasReader,
+    CsvReader.name: CsvReader,
+    ArrowReader.name: ArrowReader,
+    MmapReader.name: MmapReader,
+    AutoReader.name: AutoReader,
+}
+
+def available_readers() -> List[type]:
+    """Returns the block parsing engines whose dependencies are installed."""
+    readers = [PandasReader, CsvReader]
+    try:
+        import pyarrow.csv
+        readers.append(ArrowReader)
+    except ImportError:
+        pass
+    return readers
+
+def get_reader(name: str, config: ProcessingConfig) -> BaseReader:
+    """Creates the reader engine for the given name."""
+    if name not in READERS:
+        raise InvalidConfigurationError(
+            f"Unknown reader '{name}'. Available readers: {', '.join(READERS)}"
+        )
+    return READERS[name](config)
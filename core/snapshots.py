@@ -0,0 +1,292 @@
+import hashlib
+import json
+import os
+from typing import Callable, Dict, Iterator, List, Optional
+import numpy as np
+import pandas as pd
+from config import ProcessingConfig
+from core.base import FileChunk
+from core.readers import CARRIAGE_RETURN, NEWLINE, BaseReader, apply_dtypes
+from exceptions import InvalidConfigurationError
+from utils.file_utils import get_file_type_from_path
+
+# Column of a snapshot holding the byte offset in the file where each row ends
+END_OFFSET_COLUMN = '__end_offset'
+SNAPSHOT_SUFFIX = '.arrow'
+
+def row_end_offsets(block: bytes, start_offset: int, end_offset: int, rows: int) -> np.ndarray:
+    """
+    Returns the byte offset where each parsed row of a chunk ends.
+
+    Rows are the non-blank lines of the block when there are as many of them. When
+    the reader dropped lines, rows cannot be matched to lines, so every row ends at
+    the end of the chunk and the chunk can only be cut where it was cut when read.
+    The last row always ends at the end of the chunk, taking any blank lines after it.
+    """
+    data = np.frombuffer(block, dtype=np.uint8)
+    ends = np.flatnonzero(data == NEWLINE) + 1
+    if len(data) and data[-1] != NEWLINE:
+        ends = np.append(ends, len(data))
+    starts = np.concatenate(([0], ends[:-1]))
+
+    content_ends = ends - (data[ends - 1] == NEWLINE) if len(ends) else ends
+    content_ends = content_ends - ((content_ends > starts) & (data[np.maximum(content_ends - 1, 0)] == CARRIAGE_RETURN))
+    lines = ends[content_ends > starts]
+
+    if len(lines) == rows:
+        offsets = start_offset + lines.astype(np.int64)
+    else:
+        offsets = np.full(rows, end_offset, dtype=np.int64)
+    if rows:
+        offsets[-1] = end_offset
+    return offsets
+
+class SnapshotCache:
+    """
+    Cache of parsed files in Arrow IPC files, so a release is only parsed once.
+
+    A snapshot holds the typed columns of a file as the reader returned them, plus
+    the byte offset where each row ends in the file. It is named after the file
+    type, version and language, and a digest of the file's SHA-256 checksum and the
+    columns and dtypes read, so a changed file or model never matches an old one.
+
+    Snapshots are written uncompressed as chunks are read, one record batch per
+    chunk, and renamed into place once the last chunk has been read from a file's
+    start. Categories differ between chunks, so category columns are stored as
+    plain text and encoded again for each chunk read. Snapshots are opened
+    memory-mapped, so the Arrow buffers point into the page cache, and each chunk
+    only converts its own slice of the table to pandas. Chunks are cut at row
+    offsets, so their byte ranges match the file and checkpoints stay valid. The
+    least recently used snapshots are evicted when the cache grows beyond
+    max_size_mb.
+    """
+
+    def __init__(self, config: ProcessingConfig):
+        try:
+            import pyarrow
+            import pyarrow.ipc
+        except ImportError:
+            raise InvalidConfigurationError("Snapshots require pyarrow (pip install pyarrow)")
+        self._pa = pyarrow
+        self.config = config
+        self.cache_dir = config.snapshot_dir
+        self.max_bytes = int(config.snapshot_max_mb * 1024 * 1024)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def snapshot_path(self, file_path: str, checksum: str, dtypes: Optional[Dict[str, str]],
+                      usecols: List[str]) -> str:
+        """Returns the path of the snapshot of a file, read with the given columns and dtypes."""
+        schema = json.dumps([checksum, usecols, dtypes or {}], sort_keys=True)
+        digest = hashlib.sha256(schema.encode()).hexdigest()[:16]
+        name = f"{get_file_type_from_path(file_path)}-v{self.config.version}-{self.config.language}-{digest}"
+        return os.path.join(self.cache_dir, name + SNAPSHOT_SUFFIX)
+
+    def read_chunks(self, reader: BaseReader, file_path: str, checksum: str, columns: List[str], encoding: str,
+                    start_offset: int = 0, first_batch_number: int = 1,
+                    dtypes: Optional[Dict[str, str]] = None,
+                    usecols: Optional[List[str]] = None,
+                    batch_size: Optional[Callable[[], int]] = None) -> Iterator[FileChunk]:
+        """
+        Reads a file in chunks from its snapshot, or with the reader when there is none.
+
+        Takes the arguments of BaseReader.read_chunks, plus the reader and the file's
+        checksum. A file read from its start is recorded as it goes and its snapshot
+        written once the last chunk has been read.
+        """
+        usecols = usecols if usecols is not None else columns
+        path = self.snapshot_path(file_path, checksum, dtypes, usecols)
+
+        table = self._open(path, usecols)
+        if table is not None:
+            print(f"Reading snapshot {path}")
+            return self._snapshot_chunks(table, dtypes, start_offset, first_batch_number, batch_size)
+
+        chunks = reader.read_chunks(
+            file_path, columns, encoding, start_offset, first_batch_number, dtypes, usecols, batch_size
+        )
+        if start_offset:
+            return chunks
+        return self._record(chunks, path, file_path)
+
+    def read_file_columns(self, reader: BaseReader, file_path: str, checksum: str, columns: List[str],
+                          encoding: str, dtypes: Dict[str, str], usecols: List[str]) -> pd.DataFrame:
+        """Reads only some columns of a whole file like core.readers.read_file_columns, through the cache."""
+        dtypes = {col: dtypes[col] for col in usecols if col in dtypes}
+        path = self.snapshot_path(file_path, checksum, dtypes, usecols)
+
+        table = self._open(path, usecols)
+        if table is not None:
+            return self._to_pandas(table.select(usecols), dtypes)
+
+        chunks = reader.read_chunks(file_path, columns, encoding, dtypes=dtypes, usecols=usecols)
+        frames = [chunk.data for chunk in self._record(chunks, path, file_path)]
+        return apply_dtypes(pd.concat(frames, ignore_index=True), dtypes) if frames else pd.DataFrame(columns=usecols)
+
+    def _open(self, path: str, usecols: List[str]):
+        """Opens a snapshot memory-mapped, or returns None when it is missing or unreadable."""
+        if not os.path.exists(path):
+            return None
+        try:
+            # The table keeps the mapping open for as long as its buffers are used
+            table = self._pa.ipc.open_file(self._pa.memory_map(path)).read_all()
+            if table.column_names != list(usecols) + [END_OFFSET_COLUMN]:
+                raise ValueError(f"unexpected columns {table.column_names}")
+        except Exception as e:
+            print(f"Ignoring snapshot {path}: {e}")
+            return None
+
+        # The access time orders snapshots for eviction
+        os.utime(path)
+        return table
+
+    def _snapshot_chunks(self, table, dtypes: Optional[Dict[str, str]], start_offset: int,
+                         first_batch_number: int, batch_size: Optional[Callable[[], int]]) -> Iterator[FileChunk]:
+        next_size = batch_size or (lambda: self.config.batch_size)
+        offsets = table.column(END_OFFSET_COLUMN).to_numpy()
+        data = table.select(table.column_names[:-1])
+
+        # Resumed loads start after the last row committed
+        first = int(np.searchsorted(offsets, start_offset, side='right'))
+        batch_number = first_batch_number
+        while first < len(offsets):
+            last = min(first + next_size(), len(offsets))
+            # Rows of chunks whose lines could not be matched share an offset; they are never split
+            while last < len(offsets) and offsets[last - 1] == offsets[last]:
+                last += 1
+
+            end_offset = int(offsets[last - 1])
+            df_chunk = self._to_pandas(data.slice(first, last - first), dtypes)
+            yield FileChunk(batch_number, df_chunk, start_offset, end_offset)
+
+            start_offset = end_offset
+            first = last
+            batch_number += 1
+
+    @staticmethod
+    def _to_pandas(table, dtypes: Optional[Dict[str, str]]) -> pd.DataFrame:
+        """Converts rows of a snapshot to pandas as the readers return them, encoding category columns in Arrow first."""
+        for i, name in enumerate(table.column_names):
+            if (dtypes or {}).get(name) == 'category':
+                table = table.set_column(i, name, table.column(i).dictionary_encode())
+        df = table.to_pandas()
+        # Nulls of text columns read as None; the readers leave NaN (see apply_dtypes)
+        for col in df.columns[df.dtypes == object]:
+            df[col] = df[col].mask(df[col].isna(), np.nan)
+        return df
+
+    def _record(self, chunks: Iterator[FileChunk], path: str, file_path: str) -> Iterator[FileChunk]:
+        """Passes chunks through, writing each one to the snapshot as it is read."""
+        snapshot = _SnapshotWriter(self._pa, path)
+        try:
+            with open(file_path, 'rb') as f:
+                for chunk in chunks:
+                    f.seek(chunk.start_offset)
+                    block = f.read(chunk.end_offset - chunk.start_offset)
+                    offsets = row_end_offsets(block, chunk.start_offset, chunk.end_offset, len(chunk.data))
+                    snapshot.write(chunk.data, offsets)
+                    yield chunk
+            written = snapshot.commit()
+        finally:
+            snapshot.abort()
+
+        if written:
+            print(f"Snapshot written to {path} ({os.path.getsize(path) / 2 ** 20:.1f} MB)")
+            self.evict(keep=path)
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """Removes the least recently used snapshots until the cache fits in max_size_mb."""
+        snapshots = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(SNAPSHOT_SUFFIX):
+                stat = entry.stat()
+                snapshots.append((stat.st_atime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in snapshots)
+        removed = []
+        for _, size, path in sorted(snapshots):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # Already evicted by another process (--jobs)
+                pass
+            total -= size
+            removed.append(path)
+            print(f"Evicted snapshot {path}")
+        return removed
+
+class _SnapshotWriter:
+    """
+    Writes the chunks of a file to a temporary IPC file, renamed to the snapshot
+    path on commit. A chunk that cannot be written abandons the snapshot.
+    """
+
+    def __init__(self, pa, path: str):
+        self._pa = pa
+        self.path = path
+        self.temp_path = f"{path}.{os.getpid()}.tmp"
+        self._sink = None
+        self._writer = None
+        self._schema = None
+        self.failed = False
+
+    def write(self, df: pd.DataFrame, offsets: np.ndarray) -> None:
+        if self.failed:
+            return
+        pa = self._pa
+        try:
+            # Categories differ between chunks, so they are stored as plain text
+            categories = [col for col, dtype in df.dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+            df = df.astype(dict.fromkeys(categories, object))
+            if self._writer is None:
+                schema = pa.Schema.from_pandas(df, preserve_index=False)
+                # Columns empty in the first chunk would be typed null
+                for i, schema_field in enumerate(schema):
+                    if pa.types.is_null(schema_field.type):
+                        schema = schema.set(i, pa.field(schema_field.name, pa.string()))
+                self._schema = schema.append(pa.field(END_OFFSET_COLUMN, pa.int64()))
+                self._sink = pa.OSFile(self.temp_path, 'wb')
+                self._writer = pa.ipc.new_file(self._sink, self._schema)
+
+            batch = pa.RecordBatch.from_pandas(df, schema=self._schema.remove(len(df.columns)), preserve_index=False)
+            self._writer.write_batch(pa.RecordBatch.from_arrays(
+                batch.columns + [pa.array(offsets, type=pa.int64())], schema=self._schema
+            ))
+        except Exception as e:
+            print(f"Snapshot {self.path} not written: {e}")
+            self.failed = True
+            self.abort()
+
+    def commit(self) -> bool:
+        """Closes the snapshot and moves it into place; returns whether it was written."""
+        if self.failed or self._writer is None:
+            return False
+        try:
+            self._writer.close()
+            self._sink.close()
+            self._writer = self._sink = None
+            os.replace(self.temp_path, self.path)
+        except Exception as e:
+            print(f"Snapshot {self.path} not written: {e}")
+            self.failed = True
+            return False
+        return True
+
+    def abort(self) -> None:
+        """Closes and removes the temporary file of a snapshot that was not committed."""
+        for resource in (self._writer, self._sink):
+            if resource is not None:
+                try:
+                    resource.close()
+                except Exception:
+                    pass
+        self._writer = self._sink = None
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+def create_snapshot_cache(config: ProcessingConfig) -> Optional[SnapshotCache]:
+    """Creates the snapshot cache when a snapshot directory is configured."""
+    return SnapshotCache(config) if config.snapshot_dir else None
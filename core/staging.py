@@ -0,0 +1,153 @@
+from typing import Type
+from sqlalchemy import Column, MetaData, Table, delete, func, insert, select, text
+from sqlalchemy.orm import Session
+from config import ProcessingConfig
+from database.connection import DatabaseManager
+from database.partitions import PARTITION_KEYS, PartitionManager
+
+class StagingTable:
+    """
+    Unlogged, index-free copy of a model's table that a file is loaded into.
+
+    Once the whole file is staged, swap() replaces the rows of the configured
+    version and language in the live table in a single transaction, so readers
+    never see a partially loaded version and reloads do not append duplicates.
+    On partitioned tables the staging table is exchanged for the language
+    partition instead of copying its rows.
+    """
+
+    SUFFIX = '_staging'
+
+    def __init__(self, db_manager: DatabaseManager, config: ProcessingConfig, model_class: Type,
+                 partitions: PartitionManager):
+        self.db_manager = db_manager
+        self.config = config
+        self.partitions = partitions
+        self.live_table = model_class.__table__
+        self.table = self._build_table()
+        self.exchanges_partition = partitions.is_partitioned(self.live_table)
+
+    def _build_table(self) -> Table:
+        """Builds the staging table: same columns, no constraints, defaults or indexes."""
+        live = self.live_table
+        prefixes = ['UNLOGGED'] if self.db_manager.engine.dialect.name == 'postgresql' else []
+
+        return Table(
+            live.name + self.SUFFIX,
+            MetaData(),
+            *[Column(col.name, col.type, nullable=True) for col in live.columns],
+            schema=live.schema,
+            prefixes=prefixes
+        )
+
+    def create(self, keep_existing: bool = False) -> None:
+        """Creates an empty staging table, or keeps the current one to resume into it."""
+        engine = self.db_manager.engine
+        if not keep_existing:
+            self.table.drop(engine, checkfirst=True)
+
+        if not self.exchanges_partition:
+            self.table.create(engine, checkfirst=True)
+            return
+
+        # A partition must match the parent, including its NOT NULL columns and id default
+        with self.db_manager.session_scope() as session:
+            session.execute(text(
+                f"CREATE UNLOGGED TABLE IF NOT EXISTS {self._staging_name()} "
+                f"(LIKE {self._preparer.format_table(self.live_table)} INCLUDING DEFAULTS)"
+            ))
+
+    def build_indexes(self) -> None:
+        """
+        Makes a loaded staging table ready to be attached as a partition.
+
+        The table is switched to logged and given the primary key and indexes of the
+        live table, which the attach then adopts instead of building them while
+        holding its lock.
+        """
+        staging_name = self._staging_name()
+
+        with self.db_manager.session_scope() as session:
+            session.execute(text(f"ALTER TABLE {staging_name} SET LOGGED"))
+
+            has_primary_key = session.execute(
+                text("SELECT EXISTS (SELECT 1 FROM pg_constraint "
+                     "WHERE conrelid = to_regclass(:name) AND contype = 'p')"),
+                {'name': staging_name}
+            ).scalar()
+            primary_key_name, *index_names = self._index_names(self.table.name)
+            if not has_primary_key:
+                session.execute(text(
+                    f"ALTER TABLE {staging_name} ADD CONSTRAINT {self._preparer.quote(primary_key_name)} "
+                    f"PRIMARY KEY ({self._column_list(self._primary_key_columns())})"
+                ))
+
+            for index_name, index in zip(index_names, self._live_indexes()):
+                session.execute(text(
+                    f"CREATE {'UNIQUE ' if index.unique else ''}INDEX IF NOT EXISTS {self._preparer.quote(index_name)} "
+                    f"ON {staging_name} ({self._column_list([col.name for col in index.columns])})"
+                ))
+
+    def drop(self) -> None:
+        """Drops the staging table."""
+        self.table.drop(self.db_manager.engine, checkfirst=True)
+
+    def swap(self, session: Session) -> int:
+        """
+        Replaces the live rows of the configured version and language with the staged rows.
+
+        Runs in the caller's session so that it commits as a single transaction.
+        Identifiers generated by the database are assigned by the live table.
+        """
+        if self.exchanges_partition:
+            row_count = session.execute(select(func.count()).select_from(self.table)).scalar()
+            self.partitions.replace_partition(
+                session, self.live_table, self.config.version, self.config.language, self.table.name
+            )
+
+            # Free the staging index names for the next load of this table
+            partition_name = self.partitions.partition_name(
+                self.live_table, self.config.version, self.config.language
+            )
+            for staging_index, partition_index in zip(self._index_names(self.table.name),
+                                                      self._index_names(partition_name)):
+                session.execute(text(
+                    f"ALTER INDEX {self.partitions.qualify(self.live_table, staging_index)} "
+                    f"RENAME TO {self._preparer.quote(partition_index)}"
+                ))
+            return row_count
+
+        live = self.live_table
+        columns = [col.name for col in live.columns if col is not live.autoincrement_column]
+
+        session.execute(delete(live).where(
+            live.c.version == self.config.version,
+            live.c.language == self.config.language
+        ))
+        session.execute(insert(live).from_select(
+            columns,
+            select(*[self.table.c[name] for name in columns])
+        ))
+        return session.execute(select(func.count()).select_from(self.table)).scalar()
+
+    @property
+    def _preparer(self):
+        return self.db_manager.engine.dialect.identifier_preparer
+
+    def _staging_name(self) -> str:
+        return self.partitions.qualify(self.live_table, self.table.name)
+
+    def _primary_key_columns(self):
+        # Partitioned tables carry the partition keys in their primary key
+        columns = self.live_table.primary_key.columns.keys()
+        return columns + [key for key in PARTITION_KEYS if key not in columns]
+
+    def _live_indexes(self):
+        return sorted(self.live_table.indexes, key=lambda index: index.name)
+
+    def _index_names(self, prefix: str):
+        """Returns the primary key index name followed by one name per live index."""
+        return [f"{prefix}_pkey"] + [f"{prefix}_ix{position}" for position in range(1, len(self._live_indexes()) + 1)]
+
+    def _column_list(self, columns) -> str:
+        return ', '.join(self._preparer.quote(col) for col in columns)
@@ -0,0 +1,136 @@
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from sqlalchemy import String
+from config import ProcessingConfig
+from core.readers import NUMERIC_DTYPES, apply_dtypes, count_fields, get_reader
+from models import generate_meddra_file_mappings
+from utils.file_utils import get_file_type_from_path, inspect_file, validate_file_path
+from exceptions import UnsupportedFileTypeError
+
+# Checks run on every line
+CHECKS = ('skipped_line', 'missing_fields', 'not_numeric', 'too_long')
+# Issues kept per check and file for the report; all of them are counted
+MAX_SAMPLES = 10
+
+@dataclass
+class ValidationIssue:
+    """A line of a file that would not load as it is."""
+    line_number: int
+    check: str
+    column: Optional[str] = None
+    value: Optional[str] = None
+
+    def __str__(self) -> str:
+        location = f"line {self.line_number}" + (f", {self.column}" if self.column else "")
+        return f"{location}: {self.check}" + (f" ({self.value!r})" if self.value is not None else "")
+
+@dataclass
+class FileValidation:
+    """The outcome of validating one file."""
+    file_path: str
+    file_type: str
+    lines: int = 0
+    counts: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(CHECKS, 0))
+    samples: List[ValidationIssue] = field(default_factory=list)
+    error: Optional[Exception] = None
+    elapsed_time: float = 0.0
+
+    @property
+    def valid(self) -> bool:
+        return self.error is None and not any(self.counts.values())
+
+    def add(self, check: str, line_numbers: np.ndarray, column: Optional[str] = None,
+            values: Optional[pd.Series] = None) -> None:
+        """Counts the lines failing a check and keeps the first few as samples."""
+        if not len(line_numbers):
+            return
+        self.counts[check] += len(line_numbers)
+
+        kept = sum(1 for issue in self.samples if issue.check == check)
+        for position in range(min(len(line_numbers), MAX_SAMPLES - kept)):
+            value = None if values is None else str(values.iloc[position])
+            self.samples.append(ValidationIssue(int(line_numbers[position]), check, column, value))
+
+class FileValidator:
+    """
+    Checks MedDRA files against the models without touching the database.
+
+    Each file is cut into blocks of whole lines like a load, and every block is
+    checked with vectorized operations:
+
+    - skipped_line: more fields than _column_order, so every reader drops the line
+    - missing_fields: fewer fields than _column_order, so the missing ones load as nulls
+    - not_numeric: a value of a numeric column that does not parse as a number
+    - too_long: a value longer than the String(n) length of its column
+    """
+
+    def __init__(self, config: ProcessingConfig):
+        self.config = config
+        self.file_mappings = generate_meddra_file_mappings(config.load_profile)
+        self.reader = get_reader(config.reader, config)
+
+    def validate(self, file_path: str) -> FileValidation:
+        """Validates a single file."""
+        start_time = time.perf_counter()
+        result = FileValidation(file_path, get_file_type_from_path(file_path))
+        try:
+            validate_file_path(file_path)
+            if result.file_type not in self.file_mappings:
+                raise UnsupportedFileTypeError(result.file_type)
+
+            mapping = self.file_mappings[result.file_type]
+            encoding = inspect_file(file_path)['encoding']
+
+            with open(file_path, 'rb') as f:
+                while True:
+                    lines = list(itertools.islice(f, self.config.batch_size))
+                    if not lines:
+                        break
+                    self._validate_block(b''.join(lines), result.lines + 1, mapping, encoding, result)
+                    result.lines += len(lines)
+        except Exception as e:
+            result.error = e
+
+        result.elapsed_time = time.perf_counter() - start_time
+        return result
+
+    def _validate_block(self, block: bytes, first_line: int, mapping: Dict, encoding: str,
+                        result: FileValidation) -> None:
+        columns = mapping['columns']
+        width = len(columns)
+        separator = self.config.separator.encode(encoding)[0]
+
+        fields, trailing, blank = count_fields(block, separator)
+
+        # One trailing separator is ignored, as MedDRA lines end with one
+        skipped = ~blank & (fields > width) & ~((fields == width + 1) & trailing)
+        missing = ~blank & (fields < width)
+        line_numbers = np.arange(first_line, first_line + len(fields))
+
+        result.add('skipped_line', line_numbers[skipped])
+        result.add('missing_fields', line_numbers[missing])
+
+        # Values are checked on the text the configured reader parses
+        text_dtypes = dict.fromkeys(columns, 'object')
+        df = apply_dtypes(self.reader.parse(block, columns, encoding, text_dtypes), text_dtypes)
+        loaded = line_numbers[~blank & ~skipped]
+        if len(df) != len(loaded):
+            # The reader kept other lines than expected; report rows by position in the block
+            loaded = np.arange(first_line, first_line + len(df))
+
+        table = mapping['model'].__table__
+        for col in mapping['usecols']:
+            values = df[col].reset_index(drop=True)
+            present = values.notna()
+            column_type = table.c[col].type
+
+            if mapping['dtypes'].get(col) in NUMERIC_DTYPES:
+                bad = present & pd.to_numeric(values, errors='coerce').isna()
+                result.add('not_numeric', loaded[bad.to_numpy()], col, values[bad])
+            elif isinstance(column_type, String) and column_type.length:
+                bad = present & (values.str.len() > column_type.length)
+                result.add('too_long', loaded[bad.to_numpy()], col, values[bad])
@@ -0,0 +1,199 @@
+import csv
+import io
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Type
+import pandas as pd
+from sqlalchemy import BigInteger, DateTime, Integer, Numeric, Table, insert
+from sqlalchemy.orm import Session
+from database.connection import DatabaseManager
+from exceptions import InvalidConfigurationError
+
+class BaseWriter(ABC):
+    """Abstract base class for the strategies used to write a batch to the database."""
+
+    name = None
+    # Whether batches can be written to a table other than the model's own (e.g. staging)
+    supports_table_target = True
+
+    def __init__(self, db_manager: DatabaseManager):
+        self.db_manager = db_manager
+
+    @abstractmethod
+    def prepare(self, df: pd.DataFrame, model_class: Type, table: Optional[Table] = None) -> Any:
+        """Converts a preprocessed chunk into the payload consumed by write()."""
+        pass
+
+    @abstractmethod
+    def write(self, session: Session, payload: Any, model_class: Type, table: Optional[Table] = None) -> int:
+        """Writes a prepared payload inside the given session and returns the row count."""
+        pass
+
+    @staticmethod
+    def _target(model_class: Type, table: Optional[Table]) -> Table:
+        """Returns the table to write to, defaulting to the model's table."""
+        return model_class.__table__ if table is None else table
+
+class OrmWriter(BaseWriter):
+    """Writes batches through the ORM using bulk_save_objects."""
+
+    name = 'orm'
+    supports_table_target = False
+
+    def prepare(self, df: pd.DataFrame, model_class: Type, table: Optional[Table] = None) -> List[Any]:
+        return self._create_records_from_dataframe(df, model_class)
+
+    def write(self, session: Session, payload: List[Any], model_class: Type, table: Optional[Table] = None) -> int:
+        session.bulk_save_objects(payload)
+        return len(payload)
+
+    def _create_records_from_dataframe(self, df: pd.DataFrame, model_class: Type) -> List[Any]:
+        """Creates model instances from dataframe rows."""
+        return [model_class(**record_data) for record_data in dataframe_to_rows(df, model_class.__table__)]
+
+class CoreWriter(BaseWriter):
+    """Writes batches with a Core executemany insert, bypassing the ORM entirely."""
+
+    name = 'core'
+
+    def prepare(self, df: pd.DataFrame, model_class: Type, table: Optional[Table] = None) -> List[Dict[str, Any]]:
+        return dataframe_to_rows(df, self._target(model_class, table))
+
+    def write(self, session: Session, payload: List[Dict[str, Any]], model_class: Type,
+              table: Optional[Table] = None) -> int:
+        if not payload:
+            return 0
+
+        # A list of parameter sets runs as executemany, batched with insertmanyvalues
+        session.execute(insert(self._target(model_class, table)), payload)
+        return len(payload)
+
+@dataclass
+class CopyPayload:
+    """A batch rendered in COPY text format."""
+    buffer: io.StringIO
+    columns: List[str]
+    row_count: int
+
+# Characters escaped in COPY text values
+COPY_ESCAPED_PATTERN = re.compile(r'[\\\t\n\r]')
+COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+class CopyWriter(BaseWriter):
+    """Streams batches into PostgreSQL with COPY ... FROM STDIN (psycopg2 only)."""
+
+    name = 'copy'
+    NULL = '\\N'
+
+    def prepare(self, df: pd.DataFrame, model_class: Type, table: Optional[Table] = None) -> CopyPayload:
+        table = self._target(model_class, table)
+        columns = [col for col in df.columns if col in table.c]
+
+        # Format column by column, then let to_csv stitch the rows together
+        formatted = pd.DataFrame({col: self._get_formatter(table.c[col].type)(df[col]) for col in columns})
+        buffer = io.StringIO()
+        formatted.to_csv(buffer, sep='\t', na_rep=self.NULL, header=False, index=False,
+                         quoting=csv.QUOTE_NONE, lineterminator='\n')
+        buffer.seek(0)
+
+        return CopyPayload(buffer=buffer, columns=columns, row_count=len(df))
+
+    def write(self, session: Session, payload: CopyPayload, model_class: Type, table: Optional[Table] = None) -> int:
+        if payload.row_count == 0:
+            return 0
+
+        preparer = self.db_manager.engine.dialect.identifier_preparer
+        statement = "COPY {} ({}) FROM STDIN".format(
+            preparer.format_table(self._target(model_class, table)),
+            ', '.join(preparer.quote(col) for col in payload.columns)
+        )
+
+        # Run COPY on the session's own DBAPI connection so it shares its transaction
+        cursor = session.connection().connection.cursor()
+        try:
+            cursor.copy_expert(statement, payload.buffer)
+        finally:
+            cursor.close()
+
+        return payload.row_count
+
+    def _get_formatter(self, column_type) -> Callable[[pd.Series], pd.Series]:
+        """Returns the COPY text formatter of a column for a SQLAlchemy column type; nulls stay null."""
+        if isinstance(column_type, (Integer, BigInteger)):
+            return self._format_integer
+        if isinstance(column_type, Numeric):
+            return self._format_numeric
+        if isinstance(column_type, DateTime):
+            return self._format_datetime
+        return self._format_text
+
+    @staticmethod
+    def _format_integer(values: pd.Series) -> pd.Series:
+        numbers = pd.to_numeric(values)
+        present = numbers.dropna()
+        fractional = present[present % 1 != 0]
+        if len(fractional):
+            raise ValueError(f"Non integer value for integer column: {fractional.iloc[0]}")
+        return numbers.astype('Int64')
+
+    @staticmethod
+    def _format_numeric(values: pd.Series) -> pd.Series:
+        # Values that are not numbers fail here rather than in COPY; to_csv writes floats
+        # in their shortest round-tripping form, avoiding binary noise
+        pd.to_numeric(values)
+        return values
+
+    @staticmethod
+    def _format_datetime(values: pd.Series) -> pd.Series:
+        return pd.to_datetime(values).dt.strftime('%Y-%m-%dT%H:%M:%S.%f%z')
+
+    @staticmethod
+    def _format_text(values: pd.Series) -> pd.Series:
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Only the categories need escaping
+            categories = CopyWriter._escape_text(pd.Series(values.cat.categories.astype(str)))
+            return values.cat.rename_categories(categories.tolist())
+        present = values.notna()
+        return CopyWriter._escape_text(values[present].astype(str)).reindex(values.index)
+
+    @staticmethod
+    def _escape_text(text: pd.Series) -> pd.Series:
+        """Escapes backslashes, tabs and line breaks, checking the whole column at once first."""
+        if not COPY_ESCAPED_PATTERN.search(''.join(text.tolist())):
+            return text
+        return text.str.translate(COPY_ESCAPES)
+
+def dataframe_to_rows(df: pd.DataFrame, table) -> List[Dict[str, Any]]:
+    """Converts a chunk into insert parameter dicts in one columnar pass."""
+    columns = [col for col in df.columns if col in table.c]
+    frame = df[columns].astype(object)
+    return frame.where(frame.notna(), None).to_dict('records')
+
+WRITERS = {
+    OrmWriter.name: OrmWriter,
+    CoreWriter.name: CoreWriter,
+    CopyWriter.name: CopyWriter,
+}
+
+def get_writer(name: str, db_manager: DatabaseManager, staging: bool = False) -> BaseWriter:
+    """
+    Creates the writer for the given name, falling back when it is unsupported.
+
+    Staging loads write to tables that have no mapped class, so the ORM writer is
+    replaced by Core inserts there.
+    """
+    if name not in WRITERS:
+        raise InvalidConfigurationError(
+            f"Unknown writer '{name}'. Available writers: {', '.join(WRITERS)}"
+        )
+
+    if name == CopyWriter.name and not db_manager.supports_copy():
+        print(f"Writer '{name}' requires PostgreSQL with psycopg2, falling back to '{OrmWriter.name}'")
+        name = OrmWriter.name
+
+    if staging and not WRITERS[name].supports_table_target:
+        print(f"Writer '{name}' cannot write to staging tables, using '{CoreWriter.name}'")
+        name = CoreWriter.name
+
+    return WRITERS[name](db_manager)
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, make_url, text
 from sqlalchemy.orm import sessionmaker, Session
 from contextlib import contextmanager
 from typing import Generator
@@ -12,6 +12,7 @@ class DatabaseManager:
         self.config = config
         self._engine = None
         self._session_factory = None
+        self._async_engine = None
         
     @property
     def engine(self):
@@ -23,6 +24,22 @@ class DatabaseManager:
                 raise DatabaseConnectionError(self.config.url, e)
         return self._engine
     
+    @property
+    def async_engine(self):
+        """Lazy initialization of the asyncio database engine (PostgreSQL with asyncpg)."""
+        if self._async_engine is None:
+            try:
+                from sqlalchemy.ext.asyncio import create_async_engine
+                
+                url = make_url(self.config.url)
+                if url.get_backend_name() != 'postgresql':
+                    raise ValueError("the async backend requires a PostgreSQL database")
+                
+                self._async_engine = create_async_engine(url.set(drivername='postgresql+asyncpg'))
+            except Exception as e:
+                raise DatabaseConnectionError(self.config.url, e)
+        return self._async_engine
+    
     @property
     def session_factory(self):
         """Lazy initialization of session factory."""
@@ -47,6 +64,11 @@ class DatabaseManager:
         finally:
             session.close()
     
+    def supports_copy(self) -> bool:
+        """Checks if the engine can stream data with COPY ... FROM STDIN."""
+        dialect = self.engine.dialect
+        return dialect.name == 'postgresql' and dialect.driver == 'psycopg2'
+    
     def test_connection(self) -> bool:
         """Tests if database connection is working."""
         try:
@@ -63,3 +85,9 @@ class DatabaseManager:
             self._engine.dispose()
             self._engine = None
             self._session_factory = None
+    
+    async def close_async(self) -> None:
+        """Closes the asyncio database engine."""
+        if self._async_engine:
+            await self._async_engine.dispose()
+            self._async_engine = None
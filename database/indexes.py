@@ -0,0 +1,62 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Generator, Iterable, Optional
+from sqlalchemy import Table, text
+from database.connection import DatabaseManager
+
+class IndexManager:
+    """Drops and rebuilds the secondary indexes declared on the models around bulk loads."""
+
+    def __init__(self, db_manager: DatabaseManager):
+        self.db_manager = db_manager
+
+    def drop_indexes(self, tables: Iterable[Table]) -> int:
+        """Drops the secondary indexes of the tables, returning how many were dropped."""
+        dropped = 0
+        with self.db_manager.engine.begin() as conn:
+            for table in tables:
+                for index in table.indexes:
+                    index.drop(conn, checkfirst=True)
+                    dropped += 1
+        return dropped
+
+    def rebuild_indexes(self, tables: Iterable[Table], workers: Optional[int] = None) -> None:
+        """
+        Recreates the secondary indexes from the model metadata, one table per worker.
+
+        Each table is analyzed once its indexes are built so the planner sees the
+        freshly loaded data.
+        """
+        tables = list(tables)
+        if not tables:
+            return
+
+        workers = workers or min(len(tables), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='meddra-index') as executor:
+            # list() re-raises the first failure once all builds have finished
+            list(executor.map(self._rebuild_table, tables))
+
+    @contextmanager
+    def deferred(self, tables: Iterable[Table], workers: Optional[int] = None) -> Generator[None, None, None]:
+        """Drops the indexes for the duration of a load and always rebuilds them afterwards."""
+        tables = sorted(set(tables), key=lambda table: table.fullname)
+
+        dropped = self.drop_indexes(tables)
+        print(f"Deferred {dropped} indexes on {len(tables)} tables")
+        try:
+            yield
+        finally:
+            start_time = time.time()
+            print(f"Rebuilding indexes on {len(tables)} tables...")
+            self.rebuild_indexes(tables, workers)
+            print(f"Indexes rebuilt and tables analyzed in {time.time() - start_time:.1f}s")
+
+    def _rebuild_table(self, table: Table) -> None:
+        preparer = self.db_manager.engine.dialect.identifier_preparer
+
+        with self.db_manager.engine.begin() as conn:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+            conn.execute(text(f"ANALYZE {preparer.format_table(table)}"))
@@ -0,0 +1,149 @@
+import decimal
+import re
+from typing import Dict, Optional
+from sqlalchemy import Integer, MetaData, PrimaryKeyConstraint, String, Table, delete, func, select, text
+from sqlalchemy.orm import Session
+from database.connection import DatabaseManager
+
+PARTITION_KEYS = ('version', 'language')
+
+def is_partitionable(table: Table) -> bool:
+    """Checks if a table carries the version and language columns it is partitioned by."""
+    return (all(key in table.c for key in PARTITION_KEYS)
+            and table.info.get('partitioned', True))
+
+def build_partitioned_metadata(metadata: MetaData) -> MetaData:
+    """
+    Copies the tables of a metadata, declaring the MedDRA tables as partitioned.
+
+    Tables are list partitioned by version; each version partition is in turn list
+    partitioned by language when it is created (see PartitionManager). PostgreSQL
+    requires the partition keys in the primary key, so they are appended to it.
+    """
+    partitioned = MetaData()
+
+    for table in metadata.sorted_tables:
+        copy = table.to_metadata(partitioned)
+        if not is_partitionable(table):
+            continue
+
+        # Composite keys are not autoincrement by default; keep the serial id
+        autoincrement_column = table.autoincrement_column
+        if autoincrement_column is not None and isinstance(autoincrement_column.type, Integer):
+            copy.c[autoincrement_column.name].autoincrement = True
+
+        for key in PARTITION_KEYS:
+            copy.c[key].primary_key = True
+        copy.append_constraint(PrimaryKeyConstraint(
+            *table.primary_key.columns.keys(), *PARTITION_KEYS, name=table.primary_key.name
+        ))
+        copy.dialect_kwargs['postgresql_partition_by'] = 'LIST (version)'
+
+    return partitioned
+
+class PartitionManager:
+    """Creates, replaces and drops the version/language partitions of MedDRA tables."""
+
+    def __init__(self, db_manager: DatabaseManager):
+        self.db_manager = db_manager
+        self._partitioned: Dict[str, bool] = {}
+
+    @property
+    def preparer(self):
+        return self.db_manager.engine.dialect.identifier_preparer
+
+    def is_partitioned(self, table: Table) -> bool:
+        """Checks if the table was created partitioned in the database."""
+        key = table.fullname
+        if key not in self._partitioned:
+            partitioned = False
+            if self.db_manager.engine.dialect.name == 'postgresql' and is_partitionable(table):
+                with self.db_manager.engine.connect() as conn:
+                    partitioned = conn.execute(
+                        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+                             "WHERE partrelid = to_regclass(:name))"),
+                        {'name': self.preparer.format_table(table)}
+                    ).scalar()
+            self._partitioned[key] = partitioned
+        return self._partitioned[key]
+
+    def partition_name(self, table: Table, version: float, language: Optional[str] = None) -> str:
+        """Returns the name of a version partition, or of its language sub-partition."""
+        name = f"{table.name}_v{self._version_literal(version).replace('.', '_')}"
+        if language is not None:
+            name += '_' + re.sub(r'\W', '_', language.lower())
+        return name
+
+    def qualify(self, table: Table, name: str) -> str:
+        """Quotes a relation name in the schema of the given table."""
+        if table.schema:
+            return f"{self.preparer.quote_schema(table.schema)}.{self.preparer.quote(name)}"
+        return self.preparer.quote(name)
+
+    def ensure_partition(self, session: Session, table: Table, version: float, language: str) -> None:
+        """Creates the version partition and its language sub-partition if missing."""
+        version_partition = self._ensure_version_partition(session, table, version)
+        session.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {self.qualify(table, self.partition_name(table, version, language))} "
+            f"PARTITION OF {version_partition} FOR VALUES IN ({self._language_literal(language)})"
+        ))
+
+    def replace_partition(self, session: Session, table: Table, version: float, language: str,
+                          source_name: str) -> None:
+        """
+        Exchanges the language partition for a fully loaded table with the same columns.
+
+        The current partition is dropped and the source table renamed and attached in
+        its place, so the exchange commits atomically with the session.
+        """
+        version_partition = self._ensure_version_partition(session, table, version)
+        partition_name = self.partition_name(table, version, language)
+
+        session.execute(text(f"DROP TABLE IF EXISTS {self.qualify(table, partition_name)}"))
+        session.execute(text(
+            f"ALTER TABLE {self.qualify(table, source_name)} RENAME TO {self.preparer.quote(partition_name)}"
+        ))
+        session.execute(text(
+            f"ALTER TABLE {version_partition} ATTACH PARTITION {self.qualify(table, partition_name)} "
+            f"FOR VALUES IN ({self._language_literal(language)})"
+        ))
+
+    def drop_partition(self, table: Table, version: float, language: Optional[str] = None) -> None:
+        """Drops a whole release, or one of its languages, from a partitioned table."""
+        with self.db_manager.session_scope() as session:
+            session.execute(text(
+                f"DROP TABLE IF EXISTS {self.qualify(table, self.partition_name(table, version, language))}"
+            ))
+
+    def remove_version(self, table: Table, version: float, language: str) -> int:
+        """
+        Removes the rows of a version and language from a table, returning how many there were.
+
+        The language partition of a partitioned table is dropped; other tables have
+        the rows deleted.
+        """
+        condition = [table.c.version == version, table.c.language == language]
+        if not self.is_partitioned(table):
+            with self.db_manager.session_scope() as session:
+                return session.execute(delete(table).where(*condition)).rowcount
+
+        with self.db_manager.engine.connect() as conn:
+            rows = conn.execute(select(func.count()).select_from(table).where(*condition)).scalar()
+        self.drop_partition(table, version, language)
+        return rows
+
+    def _ensure_version_partition(self, session: Session, table: Table, version: float) -> str:
+        version_partition = self.qualify(table, self.partition_name(table, version))
+        session.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {version_partition} PARTITION OF {self.preparer.format_table(table)} "
+            f"FOR VALUES IN ({self._version_literal(version)}) PARTITION BY LIST (language)"
+        ))
+        return version_partition
+
+    @staticmethod
+    def _version_literal(version: float) -> str:
+        # Matches the Numeric(5, 2) version column, so 28.0 and 28.00 share a partition
+        return format(decimal.Decimal(str(version)).quantize(decimal.Decimal('0.01')), 'f')
+
+    def _language_literal(self, language: str) -> str:
+        return String().literal_processor(self.db_manager.engine.dialect)(language)
@@ -7,6 +7,9 @@ class UnsupportedFileTypeError(MedDRAProcessingError):
     def __init__(self, file_type: str):
         self.file_type = file_type
         super().__init__(f"Unsupported file type: '{file_type}'")
+    
+    def __reduce__(self):
+        return (self.__class__, (self.file_type,))
 
 class FileProcessingError(MedDRAProcessingError):
     """Raised when file processing fails."""
@@ -14,6 +17,9 @@ class FileProcessingError(MedDRAProcessingError):
         self.file_path = file_path
         self.original_error = original_error
         super().__init__(f"Error processing file '{file_path}': {original_error}")
+    
+    def __reduce__(self):
+        return (self.__class__, (self.file_path, self.original_error))
 
 class BatchProcessingError(MedDRAProcessingError):
     """Raised when batch processing fails."""
@@ -21,6 +27,9 @@ class BatchProcessingError(MedDRAProcessingError):
         self.batch_number = batch_number
         self.original_error = original_error
         super().__init__(f"Error processing batch {batch_number}: {original_error}")
+    
+    def __reduce__(self):
+        return (self.__class__, (self.batch_number, self.original_error))
 
 class DatabaseConnectionError(MedDRAProcessingError):
     """Raised when database connection fails."""
@@ -28,7 +37,14 @@ class DatabaseConnectionError(MedDRAProcessingError):
         self.db_url = db_url
         self.original_error = original_error
         super().__init__(f"Error connecting to database: {original_error}")
+    
+    def __reduce__(self):
+        return (self.__class__, (self.db_url, self.original_error))
 
 class InvalidConfigurationError(MedDRAProcessingError):
     """Raised when configuration is invalid."""
+    pass
+
+class CheckpointError(MedDRAProcessingError):
+    """Raised when a load cannot be resumed from its checkpoints."""
     pass
\ No newline at end of file
@@ -1,12 +1,25 @@
 import argparse
+import contextlib
 import sys
-from typing import List, Optional
-from config import AppConfig
-from database.connection import DatabaseManager
-from core.file_processor import FileProcessor
-from utils.file_utils import find_meddra_files, get_file_type_from_path
+from datetime import datetime
+from typing import List, Optional, Tuple
+from utils.file_utils import (
+    MEDDRA_FILE_TYPES, find_meddra_files, get_file_type_from_path, inspect_file, validate_file_path
+)
 from exceptions import MedDRAProcessingError, InvalidConfigurationError
 
+# Configuration, pandas, NumPy, SQLAlchemy and the models are imported once a load
+# starts, so --help and argument errors return without paying for them.
+
+def batch_size_argument(value: str):
+    """Parses --batch-size: a number of lines, or auto."""
+    if value == 'auto':
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid batch size: '{value}' (expected a number or 'auto')")
+
 class MedDRACLI:
     """Command Line Interface for MedDRA file processing."""
     
@@ -14,14 +27,23 @@ class MedDRACLI:
         self.config = None
         self.db_manager = None
         self.file_processor = None
+        self.started_at = None
     
     def run(self) -> int:
         """Main entry point for the CLI."""
         try:
             args = self._parse_arguments()
+            if args.file_path and not self._check_single_file(args.file_path):
+                return 1
+            if args.dry_run:
+                return self._validate_files(args)
+            
             self._initialize_components(args)
             self._validate_setup()
+            self.started_at = datetime.now()
             
+            if args.drop_version is not None:
+                return self._drop_version(args.drop_version)
             if args.file_path:
                 return self._process_single_file(args.file_path)
             else:
@@ -51,6 +73,30 @@ class MedDRACLI:
                 
                 # Process with custom settings
                 python cli.py --path /path/to/files --version 27.1 --language es --batch-size 1000
+                
+                # Adjust the batch size of each file to a 0.5s write latency
+                python cli.py --path /path/to/files --batch-size auto --target-batch-seconds 0.5
+                
+                # Stream batches with PostgreSQL COPY
+                python cli.py --path /path/to/files --writer copy
+                
+                # Load the files of a release in 4 parallel processes
+                python cli.py --path /path/to/files --jobs 4
+                
+                # Check a release against the models without a database
+                python cli.py --path /path/to/files --dry-run
+                
+                # Also check that the codes referenced across the files exist
+                python cli.py --path /path/to/files --dry-run --check-integrity
+                
+                # Cache the parsed files, so reruns over the same release skip parsing
+                python cli.py --path /path/to/files --snapshot-dir ~/.cache/meddra-snapshots
+                
+                # Write a JSON run report and a Prometheus textfile
+                python cli.py --path /path/to/files --report run.json --prometheus-textfile meddra.prom
+                
+                # Remove the Spanish rows of version 27.1
+                python cli.py --drop-version 27.1 --language es
                             """
         )
         
@@ -64,6 +110,11 @@ class MedDRACLI:
             '--path',
             help='Directory containing MedDRA .asc files'
         )
+        file_group.add_argument(
+            '--drop-version',
+            type=float,
+            help='Remove a loaded MedDRA version in --language from every table, dropping its partitions on partitioned tables'
+        )
         
         # Processing options
         parser.add_argument(
@@ -79,51 +130,273 @@ class MedDRACLI:
         )
         parser.add_argument(
             '--batch-size',
-            type=int,
+            type=batch_size_argument,
             default=5000,
-            help='Batch size for processing (default: 5000)'
+            help='Batch size for processing, or auto to adjust it per file to the write latency and memory (default: 5000)'
+        )
+        parser.add_argument(
+            '--target-batch-seconds',
+            type=float,
+            default=1.0,
+            help='Write latency per batch aimed for with --batch-size auto (default: 1.0)'
+        )
+        parser.add_argument(
+            '--memory-budget-mb',
+            type=float,
+            help='Resident memory above which --batch-size auto shrinks batches (default: no limit)'
+        )
+        parser.add_argument(
+            '--writer',
+            choices=['orm', 'core', 'copy'],
+            default='orm',
+            help='Write engine: orm (bulk_save_objects), core (executemany insert) or copy (PostgreSQL COPY, falls back to orm) (default: orm)'
+        )
+        parser.add_argument(
+            '--reader',
+            choices=['pandas', 'csv', 'arrow', 'mmap', 'auto'],
+            default='pandas',
+            help='Parse engine: pandas (read_csv), csv (str.split), arrow (PyArrow CSV), mmap (NumPy tokenizer) or auto (fastest per file type) (default: pandas)'
+        )
+        parser.add_argument(
+            '--load-profile',
+            choices=['full', 'pruned'],
+            default='full',
+            help='Columns loaded: full (every file column) or pruned (skip the legacy code fields that are always empty since MedDRA 15.0) (default: full)'
+        )
+        parser.add_argument(
+            '--snapshot-dir',
+            help='Cache the parsed columns of each file in Arrow files in this directory and read unchanged files from them (requires pyarrow)'
+        )
+        parser.add_argument(
+            '--snapshot-max-mb',
+            type=float,
+            default=1024.0,
+            help='Size above which the least recently used snapshots are evicted (default: 1024)'
+        )
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=1,
+            help='Number of files loaded in parallel worker processes with --path (default: 1)'
+        )
+        parser.add_argument(
+            '--pipeline-workers',
+            type=int,
+            default=0,
+            help='Writer threads fed by a background reader; 0 reads and writes on one thread (default: 0)'
+        )
+        parser.add_argument(
+            '--backend',
+            choices=['sync', 'async'],
+            default='sync',
+            help='Execution backend: sync (SQLAlchemy sessions) or async (asyncpg binary COPY, PostgreSQL only) (default: sync)'
+        )
+        parser.add_argument(
+            '--async-concurrency',
+            type=int,
+            default=4,
+            help='Batch writes in flight per file with --backend async (default: 4)'
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Resume an interrupted load from its last committed batches instead of starting over'
+        )
+        parser.add_argument(
+            '--staging',
+            action='store_true',
+            help='Load each file into an unlogged staging table, then swap its version/language in atomically'
+        )
+        parser.add_argument(
+            '--defer-indexes',
+            action='store_true',
+            help='Drop secondary indexes during the load, then rebuild them in parallel and analyze the tables'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Load every file with --path, including those already loaded with the same contents'
+        )
+        parser.add_argument(
+            '--delta-from',
+            type=float,
+            help='Previous MedDRA version in the database; only rows that changed since it are written'
+        )
+        
+        # Reporting options
+        parser.add_argument(
+            '--report',
+            help='Write a JSON run report with the time per stage, rates and peak memory of every file and batch'
+        )
+        parser.add_argument(
+            '--prometheus-textfile',
+            help='Write the run metrics in the Prometheus text format (for the node_exporter textfile collector)'
+        )
+        parser.add_argument(
+            '--profile',
+            choices=['cpu', 'mem', 'both'],
+            help='Load each file under cProfile (cpu), tracemalloc (mem) or both, writing per-file reports next to the run report'
+        )
+        parser.add_argument(
+            '--progress-interval',
+            type=float,
+            default=2.0,
+            help='Minimum seconds between progress lines; 0 prints one per batch (default: 2.0)'
         )
         
         # Additional options
-        # parser.add_argument(
-        #     '--dry-run',
-        #     action='store_true',
-        #     help='Show what would be processed without actually processing'
-        # )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate the files against the models without connecting to the database'
+        )
+        parser.add_argument(
+            '--check-integrity',
+            action='store_true',
+            help='Check that the codes referenced across the hierarchy files exist: in the files with --dry-run, in the loaded version otherwise'
+        )
         parser.add_argument(
             '--verbose',
             action='store_true',
             help='Enable verbose output'
         )
         
-        return parser.parse_args()
+        args = parser.parse_args()
+        if args.drop_version is not None and args.dry_run:
+            parser.error('--dry-run cannot be combined with --drop-version')
+        return args
     
     def _initialize_components(self, args: argparse.Namespace) -> None:
         """Initializes application components."""
         try:
+            from config import AppConfig
+            
             # Create configuration
+            if args.batch_size == 'auto':
+                batch_size_options = {'adaptive_batch_size': True}
+            else:
+                batch_size_options = {'batch_size': args.batch_size}
+            
             self.config = AppConfig.from_env(
                 version=args.version,
                 language=args.language,
-                batch_size=args.batch_size
+                target_batch_seconds=args.target_batch_seconds,
+                memory_budget_mb=args.memory_budget_mb,
+                writer=args.writer,
+                reader=args.reader,
+                load_profile=args.load_profile,
+                snapshot_dir=args.snapshot_dir,
+                snapshot_max_mb=args.snapshot_max_mb,
+                jobs=args.jobs,
+                pipeline_workers=args.pipeline_workers,
+                backend=args.backend,
+                async_concurrency=args.async_concurrency,
+                resume=args.resume,
+                staging=args.staging,
+                defer_indexes=args.defer_indexes,
+                delta_from=args.delta_from,
+                force=args.force,
+                progress_interval=args.progress_interval,
+                report=args.report,
+                prometheus_textfile=args.prometheus_textfile,
+                profile=args.profile,
+                check_integrity=args.check_integrity,
+                **batch_size_options
             )
             
+            from database.connection import DatabaseManager
+            from core.file_processor import create_file_processor
+            
             # Initialize database manager
             self.db_manager = DatabaseManager(self.config.database)
             
             # Initialize file processor
-            self.file_processor = FileProcessor(self.db_manager, self.config.processing)
+            self.file_processor = create_file_processor(self.db_manager, self.config.processing)
             
             if args.verbose:
                 print("Configuration loaded successfully:")
                 print(f"  Database URL: {self.config.database.url}")
                 print(f"  Version: {self.config.processing.version}")
                 print(f"  Language: {self.config.processing.language}")
-                print(f"  Batch size: {self.config.processing.batch_size}")
+                if self.config.processing.adaptive_batch_size:
+                    print(f"  Batch size: auto (target {self.config.processing.target_batch_seconds}s, "
+                          f"memory budget {self.config.processing.memory_budget_mb} MB)")
+                else:
+                    print(f"  Batch size: {self.config.processing.batch_size}")
+                print(f"  Writer: {self.config.processing.writer}")
+                print(f"  Reader: {self.config.processing.reader}")
+                print(f"  Load profile: {self.config.processing.load_profile}")
+                print(f"  Snapshot dir: {self.config.processing.snapshot_dir}")
+                print(f"  Jobs: {self.config.processing.jobs}")
+                print(f"  Pipeline workers: {self.config.processing.pipeline_workers}")
+                print(f"  Backend: {self.config.processing.backend}")
+                print(f"  Resume: {self.config.processing.resume}")
+                print(f"  Staging: {self.config.processing.staging}")
+                print(f"  Defer indexes: {self.config.processing.defer_indexes}")
+                print(f"  Delta from: {self.config.processing.delta_from}")
+                print(f"  Force: {self.config.processing.force}")
+                print(f"  Report: {self.config.processing.report}")
+                print(f"  Prometheus textfile: {self.config.processing.prometheus_textfile}")
+                print(f"  Profile: {self.config.processing.profile}")
+                print(f"  Check integrity: {self.config.processing.check_integrity}")
                 
         except Exception as e:
             raise InvalidConfigurationError(f"Failed to initialize components: {e}")
     
+    def _validate_files(self, args: argparse.Namespace) -> int:
+        """Validates files against the models without connecting to the database."""
+        try:
+            from config import ProcessingConfig
+            from core.validation import FileValidator
+            
+            processing_config = ProcessingConfig(
+                version=args.version,
+                language=args.language,
+                reader=args.reader,
+                load_profile=args.load_profile,
+                snapshot_dir=args.snapshot_dir,
+                snapshot_max_mb=args.snapshot_max_mb,
+                **({} if args.batch_size == 'auto' else {'batch_size': args.batch_size})
+            )
+            validator = FileValidator(processing_config)
+        except Exception as e:
+            raise InvalidConfigurationError(f"Failed to initialize components: {e}")
+        
+        if args.file_path:
+            files = [args.file_path]
+        else:
+            files = []
+            for file_path in find_meddra_files(args.path):
+                if get_file_type_from_path(file_path) in validator.file_mappings:
+                    files.append(file_path)
+                else:
+                    print(f"Skipping unsupported file type: {get_file_type_from_path(file_path)}")
+        
+        print(f"Validating {len(files)} files")
+        invalid_files = 0
+        for file_path in files:
+            result = validator.validate(file_path)
+            if result.error is not None:
+                print(f"✗ {file_path}: {result.error}")
+            elif result.valid:
+                print(f"✓ {file_path}: {result.lines} lines ({result.elapsed_time:.2f}s)")
+            else:
+                problems = ', '.join(f"{count} {check}" for check, count in result.counts.items() if count)
+                print(f"✗ {file_path}: {result.lines} lines, {problems} ({result.elapsed_time:.2f}s)")
+                for issue in result.samples:
+                    print(f"    {issue}")
+            invalid_files += not result.valid
+        
+        print(f"\n=== Validation Summary ===")
+        print(f"Valid files: {len(files) - invalid_files}/{len(files)}")
+        
+        consistent = True
+        if args.check_integrity:
+            from core.integrity import IntegrityChecker, run_integrity_check
+            consistent = run_integrity_check(IntegrityChecker(processing_config), files)
+        
+        return 1 if invalid_files or not consistent else 0
+    
     def _validate_setup(self) -> None:
         """Validates that the setup is correct."""
         if not self.db_manager.test_connection():
@@ -131,22 +404,55 @@ class MedDRACLI:
         
         print("Setup validation passed")
     
+    def _check_single_file(self, file_path: str) -> bool:
+        """Checks that a single file exists and has a supported type, before the components are initialized."""
+        validate_file_path(file_path)
+        
+        file_type = get_file_type_from_path(file_path)
+        if file_type not in MEDDRA_FILE_TYPES:
+            print(f"Error: Unsupported file type '{file_type}'")
+            print(f"Supported types: {', '.join(MEDDRA_FILE_TYPES)}")
+            return False
+        return True
+    
+    def _drop_version(self, version: float) -> int:
+        """Removes a version in the configured language from every table that records versions."""
+        from sqlalchemy import inspect
+        from database.partitions import PARTITION_KEYS
+        from models import Base
+        
+        language = self.config.processing.language
+        print(f"Dropping version {version} ({language})")
+        
+        # The load manifest and checkpoints are cleared with the rows they describe
+        inspector = inspect(self.db_manager.engine)
+        total_rows = 0
+        for table in Base.metadata.sorted_tables:
+            if not all(key in table.c for key in PARTITION_KEYS):
+                continue
+            if not inspector.has_table(table.name, schema=table.schema):
+                continue
+            
+            rows = self.file_processor.partitions.remove_version(table, version, language)
+            if rows:
+                print(f"  {table.name}: {rows} rows removed")
+            total_rows += rows
+        
+        print(f"Removed {total_rows} rows of version {version} ({language})")
+        return 0
+    
     def _process_single_file(self, file_path: str) -> int:
         """Processes a single file."""
         print(f"Processing single file: {file_path}")
         
-        file_type = get_file_type_from_path(file_path)
-        if not self.file_processor.is_file_type_supported(file_type):
-            supported_types = self.file_processor.get_supported_file_types()
-            print(f"Error: Unsupported file type '{file_type}'")
-            print(f"Supported types: {', '.join(supported_types)}")
-            return 1
+        with self._deferred_indexes([file_path]):
+            result = self.file_processor.process(file_path)
         
-        result = self.file_processor.process(file_path)
+        self._write_reports([(file_path, result)])
         
         if result.success:
             print(f"Successfully processed {result.records_processed} records")
-            return 0
+            return self._check_integrity()
         else:
             print(f"Failed to process file: {result.error}")
             return 1
@@ -166,6 +472,7 @@ class MedDRACLI:
             total_records = 0
             processed_files = 0
             failed_files = []
+            supported_files = []
             
             for file_path in files:
                 file_type = get_file_type_from_path(file_path)
@@ -174,20 +481,36 @@ class MedDRACLI:
                     print(f"Skipping unsupported file type: {file_type}")
                     continue
                 
-                print(f"\n--- Processing {file_path} ---")
-                result = self.file_processor.process(file_path)
-                
-                if result.success:
-                    total_records += result.records_processed
-                    processed_files += 1
-                    print(f"✓ Successfully processed {result.records_processed} records")
-                else:
-                    failed_files.append((file_path, result.error))
-                    print(f"✗ Failed to process: {result.error}")
+                supported_files.append(file_path)
+            
+            unchanged_files = 0
+            if not self.config.processing.force:
+                supported_files, unchanged_files = self._skip_unchanged_files(supported_files)
+            
+            if self.config.processing.jobs > 1:
+                results = self._process_files_in_parallel(supported_files)
+            else:
+                results = self._process_files_sequentially(supported_files)
+            
+            completed = []
+            with self._deferred_indexes(supported_files):
+                for file_path, result in results:
+                    completed.append((file_path, result))
+                    if result.success:
+                        total_records += result.records_processed
+                        processed_files += 1
+                        print(f"✓ Successfully processed {result.records_processed} records")
+                    else:
+                        failed_files.append((file_path, result.error))
+                        print(f"✗ Failed to process: {result.error}")
+            
+            self._write_reports(completed)
             
             # Summary
             print(f"\n=== Processing Summary ===")
             print(f"Total files processed: {processed_files}/{len(files)}")
+            if unchanged_files:
+                print(f"Unchanged files skipped: {unchanged_files}")
             print(f"Total records processed: {total_records}")
             
             if failed_files:
@@ -197,12 +520,91 @@ class MedDRACLI:
                 return 1
             else:
                 print("All files processed successfully!")
-                return 0
+                return self._check_integrity()
                 
         except Exception as e:
             print(f"Error processing directory: {e}")
             return 1
     
+    def _skip_unchanged_files(self, files: List[str]) -> Tuple[List[str], int]:
+        """Leaves out the files already loaded with the same contents, returning the others and the count left out."""
+        from core.manifest import LoadManifest
+        
+        manifest = LoadManifest(self.db_manager, self.config.processing)
+        loaded = manifest.loaded_files()
+        if not loaded:
+            return files, 0
+        
+        changed_files = []
+        for file_path in files:
+            entry = loaded.get(get_file_type_from_path(file_path))
+            if entry and manifest.is_unchanged(entry, inspect_file(file_path)['checksum']):
+                print(f"Skipping unchanged {entry.file_type}: {entry.records_loaded} records loaded "
+                      f"on {entry.created_at:%Y-%m-%d %H:%M} (use --force to reload)")
+            else:
+                changed_files.append(file_path)
+        return changed_files, len(files) - len(changed_files)
+    
+    def _check_integrity(self) -> int:
+        """Checks the codes referenced across the loaded tables, if configured, returning the exit code."""
+        if not self.config.processing.check_integrity:
+            return 0
+        
+        from core.integrity import IntegrityChecker, run_integrity_check
+        
+        checker = IntegrityChecker(self.config.processing, self.db_manager)
+        return 0 if run_integrity_check(checker) else 1
+    
+    def _deferred_indexes(self, files: List[str]):
+        """Returns the context in which the files are loaded, deferring index builds if configured."""
+        if not self.config.processing.defer_indexes:
+            return contextlib.nullcontext()
+        
+        from database.indexes import IndexManager
+        
+        tables = [
+            self.file_processor.file_mappings[get_file_type_from_path(file_path)]['model'].__table__
+            for file_path in files
+        ]
+        return IndexManager(self.db_manager).deferred(tables)
+    
+    def _process_files_sequentially(self, files: List[str]):
+        """Processes files one after another, yielding (file_path, result) pairs."""
+        for file_path in files:
+            print(f"\n--- Processing {file_path} ---")
+            yield file_path, self.file_processor.process(file_path)
+    
+    def _process_files_in_parallel(self, files: List[str]):
+        """Processes files in a process pool, yielding (file_path, result) pairs."""
+        from core.parallel import process_files_in_parallel
+        
+        jobs = self.config.processing.jobs
+        print(f"Processing {len(files)} files with {jobs} parallel jobs (largest first)")
+        
+        # Workers create their own engines; never fork with live pooled connections
+        self.db_manager.close()
+        
+        for file_path, result in process_files_in_parallel(files, self.config, jobs):
+            print(f"\n--- Finished {file_path} ---")
+            yield file_path, result
+    
+    def _write_reports(self, results) -> None:
+        """Writes the run report and Prometheus textfile, if configured."""
+        processing = self.config.processing
+        if not processing.report and not processing.prometheus_textfile:
+            return
+        
+        from utils.metrics import build_run_report, write_prometheus_textfile, write_run_report
+        
+        elapsed = (datetime.now() - self.started_at).total_seconds()
+        report = build_run_report(results, self.config, self.started_at, elapsed)
+        if processing.report:
+            write_run_report(report, processing.report)
+            print(f"Run report written to {processing.report}")
+        if processing.prometheus_textfile:
+            write_prometheus_textfile(report, processing.prometheus_textfile)
+            print(f"Prometheus metrics written to {processing.prometheus_textfile}")
+    
     def _cleanup(self) -> None:
         """Cleans up resources."""
         if self.db_manager:
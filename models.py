@@ -121,6 +121,15 @@ class MeddraHlgtPrefTerm(Base):
 
     __meddra_file_info__ = {
         'filename': 'hlgt.asc',
+        'prunable_columns': [
+            'hlgt_whoart_code',
+            'hlgt_harts_code',
+            'hlgt_costart_sym',
+            'hlgt_icd9_code',
+            'hlgt_icd9cm_code',
+            'hlgt_icd10_code',
+            'hlgt_jart_code',
+        ],
         '_column_order': [
             'hlgt_code', 
             'hlgt_name',
@@ -188,6 +197,15 @@ class MeddraHltPrefTerm(Base):
 
     __meddra_file_info__ = {
         'filename': 'hlt.asc',
+        'prunable_columns': [
+            'hlt_whoart_code',
+            'hlt_harts_code',
+            'hlt_costart_sym',
+            'hlt_icd9_code',
+            'hlt_icd9cm_code',
+            'hlt_icd10_code',
+            'hlt_jart_code',
+        ],
         '_column_order': [
             'hlt_code', 
             'hlt_name',
@@ -231,6 +249,16 @@ class MeddraLowLevelTerm(Base):
     )
     __meddra_file_info__: ClassVar[Dict[str, str]] = {
         'filename': 'llt.asc',
+        'categorical_columns': ['llt_currency'],
+        'prunable_columns': [
+            'llt_whoart_code',
+            'llt_harts_code',
+            'llt_costart_sym',
+            'llt_icd9_code',
+            'llt_icd9cm_code',
+            'llt_icd10_code',
+            'llt_jart_code',
+        ],
         '_column_order': [
             'llt_code',
             'llt_name',
@@ -319,6 +347,8 @@ class MeddraMdHierarchy(Base):
     
     __meddra_file_info__ = {
         'filename': 'mdhier.asc',
+        'categorical_columns': ['hlt_name', 'hlgt_name', 'soc_name', 'soc_abbrev', 'primary_soc_fg'],
+        'prunable_columns': ['null_field'],
         '_column_order': [
             'pt_code', 
             'hlt_code',
@@ -368,6 +398,16 @@ class MeddraPrefTerm(Base):
 
     __meddra_file_info__ = {
         'filename': 'pt.asc',
+        'prunable_columns': [
+            'null_field',
+            'pt_whoart_code',
+            'pt_harts_code',
+            'pt_costart_sym',
+            'pt_icd9_code',
+            'pt_icd9cm_code',
+            'pt_icd10_code',
+            'pt_jart_code',
+        ],
         '_column_order': [
             'pt_code', 'pt_name', 'null_field', 'pt_soc_code',
             'pt_whoart_code', 'pt_harts_code', 'pt_costart_sym',
@@ -404,6 +444,7 @@ class MeddraRelease(Base):
     
     __meddra_file_info__ = {
         'filename': 'meddra_release.asc',
+        'prunable_columns': ['null_field_a', 'null_field_b', 'null_field_c'],
         '_column_order': [
             'meddra_version', 'language_version',
             'null_field_a', 'null_field_b', 'null_field_c'
@@ -436,6 +477,7 @@ class MeddraSmqContent(Base):
     
     __meddra_file_info__ = {
         'filename': 'smq_content.asc',
+        'categorical_columns': ['term_category', 'term_status', 'term_addition_version', 'term_last_modified_version'],
         '_column_order': [
             'smq_code', 
             'term_code',
@@ -475,6 +517,7 @@ class MeddraSmqList(Base):
     
     __meddra_file_info__ = {
         'filename': 'smq_list.asc',
+        'categorical_columns': ['meddra_version', 'status'],
         '_column_order': [
             'smq_code', 
             'smq_name', 
@@ -567,6 +610,16 @@ class MeddraSocTerm(Base):
 
     __meddra_file_info__ = {
         'filename': 'soc.asc',
+        'categorical_columns': ['soc_abbrev'],
+        'prunable_columns': [
+            'soc_whoart_code',
+            'soc_harts_code',
+            'soc_costart_sym',
+            'soc_icd9_code',
+            'soc_icd9cm_code',
+            'soc_icd10_code',
+            'soc_jart_code',
+        ],
         '_column_order': [
             'soc_code', 
             'soc_name', 
@@ -600,6 +653,50 @@ class MeddraSocTerm(Base):
     language: Mapped[Optional[str]] = mapped_column(String(8))
     version: Mapped[Optional[decimal.Decimal]] = mapped_column(Numeric(5, 2))
 
+class MeddraLoadCheckpoint(Base):
+    __tablename__ = 'meddra_load_checkpoint'
+    __table_args__ = (
+        PrimaryKeyConstraint('id', name='meddra_load_checkpoint_pk'),
+        Index('ix1_load_checkpoint01', 'file_type', 'version', 'language'),
+        # Bookkeeping table, never partitioned by version/language
+        {'info': {'partitioned': False}}
+    )
+
+    # One row per committed batch, written in the same transaction as the batch rows
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+
+    file_type: Mapped[str] = mapped_column(String(50))
+    file_checksum: Mapped[str] = mapped_column(String(64))
+    batch_number: Mapped[int] = mapped_column(Integer)
+    start_offset: Mapped[int] = mapped_column(BigInteger, comment='Byte offset of the first line of the batch')
+    end_offset: Mapped[int] = mapped_column(BigInteger, comment='Byte offset just after the last line of the batch')
+    records_loaded: Mapped[int] = mapped_column(Integer)
+
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime(True), server_default=text('now()'))
+    language: Mapped[Optional[str]] = mapped_column(String(8))
+    version: Mapped[Optional[decimal.Decimal]] = mapped_column(Numeric(5, 2))
+
+class MeddraLoadManifest(Base):
+    __tablename__ = 'meddra_load_manifest'
+    __table_args__ = (
+        PrimaryKeyConstraint('id', name='meddra_load_manifest_pk'),
+        Index('ix1_load_manifest01', 'file_type', 'version', 'language', unique=True),
+        # Bookkeeping table, never partitioned by version/language
+        {'info': {'partitioned': False}}
+    )
+
+    # One row per file, version and language, written once the file is completely loaded
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+
+    file_type: Mapped[str] = mapped_column(String(50))
+    file_checksum: Mapped[str] = mapped_column(String(64), comment='SHA-256 of the loaded file')
+    load_profile: Mapped[str] = mapped_column(String(10))
+    records_loaded: Mapped[int] = mapped_column(Integer)
+
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime(True), server_default=text('now()'))
+    language: Mapped[Optional[str]] = mapped_column(String(8))
+    version: Mapped[Optional[decimal.Decimal]] = mapped_column(Numeric(5, 2))
+
 def get_model_columns(model_class) -> List[str]:
     """Extract column names from a model, excluding certain columns."""
     meddra_file_cols = model_class.__meddra_file_info__.get('_column_order', [])
@@ -617,9 +714,55 @@ def get_model_columns(model_class) -> List[str]:
         columns.append(name)
     return columns
 
-def generate_meddra_file_mappings():
+def get_prunable_columns(model_class) -> List[str]:
+    """Extract the file columns a model declares as always empty, which pruned loads skip."""
+    meddra_file_cols = model_class.__meddra_file_info__.get('_column_order', [])
+    prunable = model_class.__meddra_file_info__.get('prunable_columns', [])
+    
+    for name in prunable:
+        if name not in meddra_file_cols:
+            raise ValueError(f"Prunable column {name} not found in model {model_class.__name__}")
+    return list(prunable)
+
+def get_categorical_columns(model_class) -> List[str]:
+    """Extract the file columns a model declares as holding few distinct values."""
+    meddra_file_cols = model_class.__meddra_file_info__.get('_column_order', [])
+    categorical = model_class.__meddra_file_info__.get('categorical_columns', [])
+    
+    for name in categorical:
+        if name not in meddra_file_cols:
+            raise ValueError(f"Categorical column {name} not found in model {model_class.__name__}")
+    return list(categorical)
+
+def get_column_dtypes(model_class) -> Dict[str, str]:
+    """
+    Map the file columns of a model to the pandas dtypes their values are read as.
+
+    Codes become nullable numbers. The columns listed under categorical_columns
+    (flags, abbreviations, versions and the names repeated on every mdhier row) are
+    read as categories; term names are nearly unique, so they and the other text
+    columns stay plain objects.
+    """
+    categorical = get_categorical_columns(model_class)
+    dtypes = {}
+    for name in get_model_columns(model_class):
+        column_type = model_class.__table__.c[name].type
+        if isinstance(column_type, (Integer, BigInteger)):
+            dtypes[name] = 'Int64'
+        elif isinstance(column_type, Numeric):
+            dtypes[name] = 'Float64'
+        elif name in categorical:
+            dtypes[name] = 'category'
+        else:
+            dtypes[name] = 'object'
+    return dtypes
+
+def generate_meddra_file_mappings(load_profile: str = 'full'):
     """
     Dynamically generate MedDRA file mappings from model class attributes.
+    
+    With the 'pruned' load profile, the prunable columns of each model are left out
+    of 'usecols', the columns that are parsed and written.
     """
     mappings = {}
     
@@ -633,26 +776,43 @@ def generate_meddra_file_mappings():
             # else:
 
             columns = get_model_columns(cls)
+            prunable = get_prunable_columns(cls) if load_profile == 'pruned' else []
             
             mappings[filename] = {
                 'model': cls,
-                'columns': columns
+                'columns': columns,
+                'usecols': [col for col in columns if col not in prunable],
+                'dtypes': get_column_dtypes(cls)
             }
     
     return mappings
 
 if __name__ == "__main__":
+    import argparse
     from config import DatabaseConfig
     from sqlalchemy import create_engine
 
+    parser = argparse.ArgumentParser(description='Creates the MedDRA tables')
+    parser.add_argument(
+        '--partitioned',
+        action='store_true',
+        help='Create the MedDRA tables list partitioned by version and language (PostgreSQL only)'
+    )
+    args = parser.parse_args()
+
     # Carga la configuración de la base de datos desde las variables de entorno
     db_config = DatabaseConfig.from_env()
     engine = create_engine(db_config.url)
 
+    metadata = Base.metadata
+    if args.partitioned:
+        from database.partitions import build_partitioned_metadata
+        metadata = build_partitioned_metadata(Base.metadata)
+
     with engine.connect() as conn:
         conn.execute(text('CREATE SCHEMA IF NOT EXISTS meddra'))
         conn.commit()
 
     # Crea todas las tablas definidas en los modelos si no existen
-    Base.metadata.drop_all(engine)  # Drop all tables first
-    Base.metadata.create_all(engine)  # Recreate all tables
\ No newline at end of file
+    metadata.drop_all(engine)  # Drop all tables first
+    metadata.create_all(engine)  # Recreate all tables
\ No newline at end of file
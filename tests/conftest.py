@@ -0,0 +1,27 @@
+import pytest
+from sqlalchemy import text
+from config import DatabaseConfig
+from database.connection import DatabaseManager
+from models import Base
+
+@pytest.fixture
+def db_manager(tmp_path):
+    """A SQLite database holding every MedDRA table."""
+    db_manager = DatabaseManager(DatabaseConfig(url=f"sqlite:///{tmp_path / 'meddra.db'}"))
+    Base.metadata.create_all(db_manager.engine)
+    yield db_manager
+    db_manager.close()
+
+@pytest.fixture
+def fail_on_insert(db_manager):
+    """Makes inserts of a given code into a table fail in the database, or succeed again."""
+    def install(table, column, code, version=28.0):
+        with db_manager.session_scope() as session:
+            session.execute(text(f"DROP TRIGGER IF EXISTS fail_{table.name}"))
+            if code is not None:
+                session.execute(text(
+                    f"CREATE TRIGGER fail_{table.name} BEFORE INSERT ON {table.name} "
+                    f"WHEN NEW.version = {version} AND NEW.{column} = {code} "
+                    f"BEGIN SELECT RAISE(ABORT, 'insert failed'); END"
+                ))
+    return install
@@ -0,0 +1,32 @@
+from core.batch_sizing import BatchSizeController, estimate_row_width
+from models import MeddraHltPrefComp, MeddraLowLevelTerm
+
+def batch(seconds, rss_mb=100.0, rows=1000):
+    return {'rows': rows, 'rss_mb': rss_mb, 'seconds': {'read': 5.0, 'records': seconds / 2, 'flush': seconds / 2}}
+
+def test_size_grows_while_batches_meet_the_target_and_halves_when_they_miss_it():
+    controller = BatchSizeController(1000, target_seconds=1.0)
+
+    controller.observe(batch(0.5))
+    controller.observe(batch(0.5))
+    assert controller() == 1500
+    # Read time is not part of the write latency
+    controller.observe(batch(1.5))
+    assert controller() == 750
+    assert (controller.increases, controller.decreases, controller.sizes) == (2, 1, [1250, 1500, 750])
+
+def test_memory_budget_and_bounds():
+    controller = BatchSizeController(150, target_seconds=1.0, memory_budget_mb=200.0)
+
+    controller.observe(batch(0.1, rss_mb=300.0))
+    assert controller() == BatchSizeController.MIN_SIZE
+    controller.observe(batch(0.1, rows=0))
+    assert controller.sizes == [BatchSizeController.MIN_SIZE]
+    assert BatchSizeController(10 ** 6, target_seconds=1.0)() == BatchSizeController.MAX_SIZE
+
+def test_initial_size_follows_the_row_width():
+    narrow = BatchSizeController.for_model(MeddraHltPrefComp, 1.0)
+    wide = BatchSizeController.for_model(MeddraLowLevelTerm, 1.0)
+
+    assert estimate_row_width(MeddraHltPrefComp) == 16
+    assert narrow() > wide()
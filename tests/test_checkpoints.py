@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import func, select
+from config import ProcessingConfig
+from core.base import FileChunk
+from core.checkpoints import CheckpointLedger, ResumeState
+from core.file_processor import FileProcessor
+from exceptions import CheckpointError
+from models import MeddraHltPrefComp, MeddraLoadCheckpoint
+
+TABLE = MeddraHltPrefComp.__table__
+
+def chunk(start, end, batch_number=0):
+    return FileChunk(batch_number, None, start, end)
+
+def write_file(tmp_path, pt_codes):
+    path = tmp_path / 'hlt_pt.asc'
+    path.write_text(''.join(f"10000001${code}$\n" for code in pt_codes))
+    return str(path)
+
+def loaded_codes(db_manager):
+    with db_manager.session_scope() as session:
+        return sorted(int(code) for code in session.scalars(select(TABLE.c.pt_code).where(TABLE.c.version == 28.0)))
+
+def test_resume_state_continues_after_the_contiguous_batches():
+    state = ResumeState([(10, 20, 2, 5), (0, 10, 1, 5), (30, 40, 4, 5)])
+
+    assert (state.batches_loaded, state.records_loaded) == (3, 15)
+    assert (state.resume_offset, state.first_batch_number) == (20, 3)
+    # Batches committed after the gap are skipped, the gap itself is loaded
+    chunks = [chunk(20, 30), chunk(30, 40), chunk(40, 50)]
+    assert [(c.start_offset, c.end_offset) for c in state.skip_committed(chunks)] == [(20, 30), (40, 50)]
+
+def test_resume_state_rejects_chunks_overlapping_committed_batches():
+    state = ResumeState([(0, 10, 1, 5), (30, 40, 3, 5)])
+
+    with pytest.raises(CheckpointError):
+        state.is_committed(chunk(25, 35))
+
+def test_resume_after_a_partial_load_loads_every_row_once(tmp_path, db_manager, fail_on_insert):
+    pt_codes = list(range(20000001, 20000011))
+    file_path = write_file(tmp_path, pt_codes)
+    config = ProcessingConfig(version=28.0, batch_size=3, writer='core')
+    fail_on_insert(TABLE, 'pt_code', 20000008)
+
+    result = FileProcessor(db_manager, config).process(file_path)
+
+    assert not result.success
+    # The two batches before the failing one are committed with their checkpoints
+    assert loaded_codes(db_manager) == pt_codes[:6]
+    with db_manager.session_scope() as session:
+        assert session.execute(select(func.count()).select_from(MeddraLoadCheckpoint)).scalar() == 2
+
+    fail_on_insert(TABLE, 'pt_code', None)
+    resumed = ProcessingConfig(version=28.0, batch_size=3, writer='core', resume=True)
+    result = FileProcessor(db_manager, resumed).process(file_path)
+
+    assert result.success
+    assert loaded_codes(db_manager) == pt_codes
+
+def test_resume_rejects_a_changed_file(tmp_path, db_manager):
+    ledger = CheckpointLedger(db_manager, ProcessingConfig(version=28.0), 'hlt_pt.asc', 'old-checksum')
+    ledger.prepare()
+    with db_manager.session_scope() as session:
+        ledger.record(session, 3, chunk(0, 10, 1))
+
+    resumed = CheckpointLedger(db_manager, ProcessingConfig(version=28.0, resume=True), 'hlt_pt.asc', 'new-checksum')
+    with pytest.raises(CheckpointError):
+        resumed.prepare()
@@ -0,0 +1,18 @@
+import pytest
+from config import ProcessingConfig
+
+@pytest.mark.parametrize('options', [
+    {'writer': 'copy'},
+    {'writer': 'core'},
+    {'pipeline_workers': 2},
+    {'resume': True},
+    {'staging': True},
+    {'delta_from': 27.0},
+])
+def test_async_backend_rejects_sync_only_options(options):
+    with pytest.raises(ValueError):
+        ProcessingConfig(backend='async', **options)
+
+def test_async_backend_accepts_its_defaults():
+    config = ProcessingConfig(backend='async', async_concurrency=8)
+    assert (config.writer, config.pipeline_workers) == ('orm', 0)
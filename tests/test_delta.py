@@ -0,0 +1,55 @@
+from datetime import datetime
+import pandas as pd
+from sqlalchemy import insert, select
+from config import ProcessingConfig
+from core.file_processor import FileProcessor
+from models import MeddraHlgtHltComp
+
+TABLE = MeddraHlgtHltComp.__table__
+
+def insert_version(db_manager, version, rows):
+    now = datetime.now()
+    with db_manager.session_scope() as session:
+        session.execute(insert(TABLE), [
+            {'hlgt_code': hlgt, 'hlt_code': hlt, 'created_at': now, 'updated_at': now,
+             'language': 'en', 'version': version}
+            for hlgt, hlt in rows
+        ])
+
+def write_file(tmp_path, rows):
+    path = tmp_path / 'hlgt_hlt.asc'
+    path.write_text(''.join(f"{hlgt}${hlt}$\n" for hlgt, hlt in rows))
+    return str(path)
+
+def version_rows(db_manager, version):
+    with db_manager.engine.connect() as conn:
+        rows = pd.read_sql(select(TABLE.c.hlgt_code, TABLE.c.hlt_code).where(TABLE.c.version == version), conn)
+    return sorted((int(hlgt), int(hlt)) for hlgt, hlt in rows.itertuples(index=False))
+
+def test_delta_load_writes_changed_rows_and_carries_the_others(tmp_path, db_manager):
+    insert_version(db_manager, 27.0, [(1, 10), (1, 11), (1, 11), (2, 20), (3, 30)])
+    new_rows = [(1, 10), (1, 11), (1, 11), (2, 21), (4, 40)]
+    config = ProcessingConfig(version=28.0, delta_from=27.0, batch_size=2, writer='core')
+
+    result = FileProcessor(db_manager, config).process(write_file(tmp_path, new_rows))
+
+    assert result.success
+    assert result.records_processed == 5
+    assert result.details['delta'] == {
+        'previous_rows': 5, 'rows_written': 2, 'rows_carried': 3, 'rows_removed': 2
+    }
+    assert version_rows(db_manager, 28.0) == sorted(new_rows)
+    assert len(version_rows(db_manager, 27.0)) == 5
+
+def test_failed_carry_forward_leaves_no_carried_rows(tmp_path, db_manager, fail_on_insert):
+    insert_version(db_manager, 27.0, [(1, 10), (1, 11), (1, 12), (2, 20)])
+    file_path = write_file(tmp_path, [(1, 10), (1, 11), (1, 12), (2, 21)])
+    # The second of three single-row carry-forward batches fails
+    fail_on_insert(TABLE, 'hlt_code', 11)
+    config = ProcessingConfig(version=28.0, delta_from=27.0, batch_size=1, writer='core')
+
+    result = FileProcessor(db_manager, config).process(file_path)
+
+    assert not result.success
+    # Only the committed batch of the changed row remains
+    assert version_rows(db_manager, 28.0) == [(2, 21)]
@@ -0,0 +1,23 @@
+from models import generate_meddra_file_mappings
+from utils import file_utils
+from utils.file_utils import MEDDRA_FILE_TYPES, inspect_file
+
+def test_file_types_match_the_models():
+    assert sorted(MEDDRA_FILE_TYPES) == sorted(generate_meddra_file_mappings())
+
+def test_inspection_is_reused_until_the_file_changes(tmp_path, monkeypatch):
+    path = tmp_path / 'soc.asc'
+    path.write_bytes(b'10000001$Blood$\n')
+    first = inspect_file(str(path))
+
+    def scan_again(*args):
+        raise AssertionError('file scanned again')
+
+    monkeypatch.setattr(file_utils, '_scan_file', scan_again)
+    assert inspect_file(str(path)) == first
+    monkeypatch.undo()
+
+    path.write_bytes(b'10000001$Blood$\n10000002$Heart$\n')
+    changed = inspect_file(str(path))
+    assert changed['line_count'] == 2
+    assert changed['checksum'] != first['checksum']
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+from core.hierarchy import MISSING, CodeIndex, MeddraHierarchy
+
+def build_hierarchy():
+    mdhier = pd.DataFrame({
+        'pt_code': [100, 100, 200],
+        'hlt_code': [10, 11, 12],
+        'hlgt_code': [20, 21, 22],
+        'soc_code': [30, 31, 30],
+        'pt_soc_code': [31, 31, 30],
+        'primary_soc_fg': ['N', 'Y', 'Y'],
+    })
+    llt = pd.DataFrame({'llt_code': [1000, 1001, 2000], 'pt_code': [100, 100, 200]})
+    return MeddraHierarchy(mdhier, llt)
+
+def test_scalar_lookups_put_the_primary_soc_first():
+    hierarchy = build_hierarchy()
+
+    assert hierarchy.llt_to_pt(1001) == 100
+    assert hierarchy.primary_soc(100) == 31
+    assert hierarchy.pt_to_socs(100).tolist() == [31, 30]
+    assert hierarchy.pt_paths(100).tolist() == [[11, 21, 31], [10, 20, 30]]
+    assert hierarchy.llt_to_pt(9999) is None
+    assert hierarchy.pt_to_socs(999).tolist() == []
+
+def test_bulk_lookups_mark_unknown_codes():
+    hierarchy = build_hierarchy()
+
+    assert hierarchy.llts_to_pts(np.array([2000, 9999, 1000])).tolist() == [200, MISSING, 100]
+    assert hierarchy.primary_socs(np.array([200, 100])).tolist() == [30, 31]
+    index, socs = hierarchy.pts_to_socs(np.array([999, 100, 200]))
+    assert list(zip(index.tolist(), socs.tolist())) == [(1, 31), (1, 30), (2, 30)]
+
+def test_code_index_falls_back_to_binary_search_for_sparse_codes():
+    dense = CodeIndex(np.array([10, 11, 13]))
+    sparse = CodeIndex(np.array([10, 10 ** 9]))
+
+    assert dense.positions(np.array([13, 12, 10])).tolist() == [2, MISSING, 0]
+    assert sparse.positions(np.array([10 ** 9, 5])).tolist() == [1, MISSING]
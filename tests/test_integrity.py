@@ -0,0 +1,35 @@
+import pandas as pd
+from config import ProcessingConfig
+from core.integrity import IntegrityChecker
+
+def results_by_name(results):
+    return {str(result.relationship): result for result in results}
+
+def test_smq_terms_are_checked_against_the_file_of_their_level():
+    codes = {
+        'smq_content.asc': pd.DataFrame({
+            'smq_code': [20000001] * 5,
+            'term_code': [10000001, 10000002, 10000003, 10000004, 10000009],
+            'term_level': [1, 2, 3, 4, 5],
+        }),
+        'smq_list.asc': pd.DataFrame({'smq_code': [20000001]}),
+        'soc.asc': pd.DataFrame({'soc_code': [10000001]}),
+        'hlgt.asc': pd.DataFrame({'hlgt_code': [10000002]}),
+        'hlt.asc': pd.DataFrame({'hlt_code': [10000003]}),
+        'llt.asc': pd.DataFrame({'llt_code': [10000004], 'pt_code': [10000004]}),
+    }
+    results = results_by_name(IntegrityChecker(ProcessingConfig()).check(codes))
+
+    assert results['smq_content.term_code (term_level in 1) -> soc.soc_code'].rows_checked == 1
+    assert results['smq_content.term_code (term_level in 2) -> hlgt.hlgt_code'].valid
+    assert results['smq_content.term_code (term_level in 3) -> hlt.hlt_code'].valid
+    llt = results['smq_content.term_code (term_level in 4, 5) -> llt.llt_code']
+    assert (llt.rows_checked, llt.samples) == (2, [10000009])
+
+def test_codes_keep_their_precision():
+    codes = IntegrityChecker._as_int64(pd.Series(['9007199254740993', None, 'x', '12'], dtype=object))
+    assert codes.tolist() == [9007199254740993, 12]
+
+def test_null_codes_are_dropped():
+    codes = IntegrityChecker._as_int64(pd.Series([10000001.0, None]))
+    assert codes.tolist() == [10000001]
@@ -0,0 +1,23 @@
+from config import ProcessingConfig
+from core.manifest import LoadManifest
+
+def test_completed_files_are_unchanged_for_the_same_checksum_and_profile(db_manager):
+    manifest = LoadManifest(db_manager, ProcessingConfig(version=28.0))
+    manifest.start('llt.asc')
+    manifest.complete('llt.asc', 'abc', 85000)
+
+    entry = manifest.loaded_files()['llt.asc']
+
+    assert entry.records_loaded == 85000
+    assert manifest.is_unchanged(entry, 'abc')
+    assert not manifest.is_unchanged(entry, 'def')
+    assert not LoadManifest(db_manager, ProcessingConfig(version=28.0, load_profile='pruned')).is_unchanged(entry, 'abc')
+
+def test_entries_are_kept_per_version_and_cleared_when_a_load_starts(db_manager):
+    manifest = LoadManifest(db_manager, ProcessingConfig(version=28.0))
+    manifest.start('pt.asc')
+    manifest.complete('pt.asc', 'abc', 27000)
+
+    assert LoadManifest(db_manager, ProcessingConfig(version=28.1)).loaded_files() == {}
+    manifest.start('pt.asc')
+    assert manifest.loaded_files() == {}
@@ -0,0 +1,20 @@
+from models import generate_meddra_file_mappings
+
+def categorical(file_type):
+    dtypes = generate_meddra_file_mappings()[file_type]['dtypes']
+    return sorted(col for col, dtype in dtypes.items() if dtype == 'category')
+
+def test_only_repeated_text_columns_are_categorical():
+    assert categorical('llt.asc') == ['llt_currency']
+    assert categorical('mdhier.asc') == ['hlgt_name', 'hlt_name', 'primary_soc_fg', 'soc_abbrev', 'soc_name']
+    assert categorical('soc.asc') == ['soc_abbrev']
+    assert categorical('smq_list.asc') == ['meddra_version', 'status']
+    for file_type in ('pt.asc', 'hlt.asc', 'hlgt.asc', 'meddra_release.asc'):
+        assert categorical(file_type) == []
+
+def test_term_names_stay_objects():
+    mappings = generate_meddra_file_mappings()
+    assert mappings['llt.asc']['dtypes']['llt_name'] == 'object'
+    assert mappings['pt.asc']['dtypes']['pt_name'] == 'object'
+    assert mappings['mdhier.asc']['dtypes']['pt_name'] == 'object'
+    assert mappings['smq_list.asc']['dtypes']['smq_name'] == 'object'
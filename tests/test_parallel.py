@@ -0,0 +1,31 @@
+import os
+from sqlalchemy import func, select
+from config import AppConfig, ProcessingConfig
+from core.parallel import process_files_in_parallel, schedule_largest_first
+from models import MeddraHlgtHltComp, MeddraHltPrefComp
+
+def test_largest_files_are_scheduled_first(tmp_path):
+    sizes = {'soc.asc': 10, 'llt.asc': 300, 'pt.asc': 20}
+    for name, size in sizes.items():
+        (tmp_path / name).write_bytes(b'x' * size)
+
+    ordered = schedule_largest_first([str(tmp_path / name) for name in sizes])
+
+    assert [os.path.basename(path) for path in ordered] == ['llt.asc', 'pt.asc', 'soc.asc']
+
+def test_files_are_loaded_in_worker_processes(tmp_path, db_manager):
+    hlt_pt = tmp_path / 'hlt_pt.asc'
+    hlt_pt.write_text(''.join(f"10000001${code}$\n" for code in range(20000001, 20000031)))
+    hlgt_hlt = tmp_path / 'hlgt_hlt.asc'
+    hlgt_hlt.write_text('10000002$10000001$\n')
+    config = AppConfig(database=db_manager.config, processing=ProcessingConfig(batch_size=10, writer='core'))
+    db_manager.close()
+
+    results = dict(process_files_in_parallel([str(hlt_pt), str(hlgt_hlt)], config, jobs=2))
+
+    assert {path: result.records_processed for path, result in results.items()} == {
+        str(hlt_pt): 30, str(hlgt_hlt): 1
+    }
+    with db_manager.session_scope() as session:
+        for model_class, rows in ((MeddraHltPrefComp, 30), (MeddraHlgtHltComp, 1)):
+            assert session.execute(select(func.count()).select_from(model_class.__table__)).scalar() == rows
@@ -0,0 +1,31 @@
+from datetime import datetime
+from sqlalchemy import func, insert, select
+from database.partitions import PartitionManager
+from models import MeddraHltPrefComp
+
+TABLE = MeddraHltPrefComp.__table__
+
+def test_partition_names_match_the_version_column(db_manager):
+    partitions = PartitionManager(db_manager)
+
+    assert partitions.partition_name(TABLE, 28.0) == 'meddra_hlt_pref_comp_v28_00'
+    assert partitions.partition_name(TABLE, 27.1, 'pt-BR') == 'meddra_hlt_pref_comp_v27_10_pt_br'
+
+def test_remove_version_deletes_only_that_version_and_language(db_manager):
+    now = datetime.now()
+    with db_manager.session_scope() as session:
+        session.execute(insert(TABLE), [
+            {'hlt_code': 1, 'pt_code': 2, 'created_at': now, 'updated_at': now, 'version': version, 'language': language}
+            for version, language in [(27.1, 'en'), (27.1, 'en'), (27.1, 'es'), (28.0, 'en')]
+        ])
+
+    removed = PartitionManager(db_manager).remove_version(TABLE, 27.1, 'en')
+
+    with db_manager.session_scope() as session:
+        remaining = session.execute(
+            select(TABLE.c.version, TABLE.c.language, func.count()).group_by(TABLE.c.version, TABLE.c.language)
+        ).all()
+    assert removed == 2
+    assert sorted((float(version), language, count) for version, language, count in remaining) == [
+        (27.1, 'es', 1), (28.0, 'en', 1)
+    ]
@@ -0,0 +1,53 @@
+import pandas as pd
+import pytest
+from sqlalchemy import select
+from config import ProcessingConfig
+from core.base import FileChunk
+from core.batch_processor import BatchProcessor
+from core.file_processor import FileProcessor
+from core.pipeline import ChunkPipeline
+from exceptions import BatchProcessingError
+from models import MeddraHltPrefComp
+from utils.progress import ProgressTracker
+
+TABLE = MeddraHltPrefComp.__table__
+
+def write_file(tmp_path, pt_codes):
+    path = tmp_path / 'hlt_pt.asc'
+    path.write_text(''.join(f"10000001${code}$\n" for code in pt_codes))
+    return str(path)
+
+def loaded_codes(db_manager):
+    with db_manager.session_scope() as session:
+        return sorted(int(code) for code in session.scalars(select(TABLE.c.pt_code).where(TABLE.c.version == 28.0)))
+
+def test_pipeline_writes_every_chunk(tmp_path, db_manager):
+    pt_codes = list(range(20000001, 20000021))
+    config = ProcessingConfig(version=28.0, batch_size=3, writer='core', pipeline_workers=3)
+
+    result = FileProcessor(db_manager, config).process(write_file(tmp_path, pt_codes))
+
+    assert result.success
+    assert (result.records_processed, result.details['batches_processed']) == (20, 7)
+    assert loaded_codes(db_manager) == pt_codes
+
+def test_pipeline_returns_the_error_of_a_failed_batch(tmp_path, db_manager, fail_on_insert):
+    fail_on_insert(TABLE, 'pt_code', 20000011)
+    config = ProcessingConfig(version=28.0, batch_size=3, writer='core', pipeline_workers=2)
+
+    result = FileProcessor(db_manager, config).process(write_file(tmp_path, range(20000001, 20000021)))
+
+    assert not result.success
+    assert isinstance(result.error, BatchProcessingError)
+    assert 20000011 not in loaded_codes(db_manager)
+
+def test_pipeline_reraises_reader_errors(db_manager):
+    def chunks():
+        data = pd.DataFrame({'hlt_code': [10000001], 'pt_code': [20000001]})
+        yield FileChunk(1, data, 0, 18)
+        raise ValueError('unreadable block')
+
+    pipeline = ChunkPipeline(BatchProcessor(db_manager, ProcessingConfig(writer='core')), writers=2)
+    with pytest.raises(ValueError, match='unreadable block'):
+        pipeline.run(chunks(), lambda df: df.assign(version=28.0, language='en'), MeddraHltPrefComp,
+                     ProgressTracker(1))
@@ -0,0 +1,21 @@
+import threading
+from utils.profiling import FileProfiler
+
+def allocate_in_worker():
+    return [str(value) * 10 for value in range(50000)]
+
+def load_with_worker():
+    results = []
+    worker = threading.Thread(target=lambda: results.append(allocate_in_worker()))
+    worker.start()
+    worker.join()
+    return len(results[0])
+
+def test_worker_threads_are_profiled(tmp_path):
+    result, outputs = FileProfiler('both', str(tmp_path), 'llt').run(load_with_worker)
+
+    assert result == 50000
+    assert 'allocate_in_worker' in open(outputs['cpu']).read()
+    allocations = open(outputs['allocations']).read()
+    assert allocations.startswith('Peak traced memory:')
+    assert 'largest sample' in allocations
@@ -0,0 +1,52 @@
+import pandas as pd
+import pytest
+from config import ProcessingConfig
+from core.readers import available_readers, get_reader
+from models import generate_meddra_file_mappings
+
+# Good lines, a line with too many fields, a short line, a blank line and a line
+# whose extra field sits where the trailing separator goes
+HLGT_LINES = [
+    b'10000001$Good one$$$$$$$$\n',
+    b'10000002$Too long$$$$$$$$$extra$\n',
+    b'10000003$Short\n',
+    b'\n',
+    b'10000004$Good two$$$$$$$$\r\n',
+    b'10000006$Nonempty tenth$$$$$$$$x\n',
+    b'10000007$Short again$$\n',
+    b'10000008$Good three$$$$$$$$',
+]
+
+ENGINES = [reader_class.name for reader_class in available_readers()] + ['mmap']
+
+def read_rows(path, engine, profile, batch_size):
+    mapping = generate_meddra_file_mappings(profile)['hlgt.asc']
+    reader = get_reader(engine, ProcessingConfig(reader=engine, batch_size=batch_size))
+    chunks = reader.read_chunks(
+        str(path), mapping['columns'], 'utf-8', dtypes=mapping['dtypes'], usecols=mapping['usecols']
+    )
+    frames = [chunk.data for chunk in chunks]
+    return pd.concat(frames, ignore_index=True)
+
+@pytest.mark.parametrize('profile', ['full', 'pruned'])
+@pytest.mark.parametrize('batch_size', [1, 2, 5000])
+def test_engines_skip_long_lines_and_pad_short_ones(tmp_path, profile, batch_size):
+    path = tmp_path / 'hlgt.asc'
+    path.write_bytes(b''.join(HLGT_LINES))
+
+    expected = read_rows(path, 'csv', profile, batch_size)
+    assert expected['hlgt_code'].tolist() == [10000001, 10000003, 10000004, 10000007, 10000008]
+    assert expected['hlgt_name'].tolist() == ['Good one', 'Short', 'Good two', 'Short again', 'Good three']
+
+    for engine in ENGINES:
+        pd.testing.assert_frame_equal(read_rows(path, engine, profile, batch_size), expected, obj=engine)
+
+@pytest.mark.parametrize('batch_size', [1, 5000])
+def test_engines_pad_blocks_of_short_lines(tmp_path, batch_size):
+    path = tmp_path / 'hlgt.asc'
+    path.write_bytes(b'10000003$Short\n10000007$Short again$$\n')
+
+    expected = read_rows(path, 'csv', 'pruned', batch_size)
+    assert len(expected) == 2
+    for engine in ENGINES:
+        pd.testing.assert_frame_equal(read_rows(path, engine, 'pruned', batch_size), expected, obj=engine)
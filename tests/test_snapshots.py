@@ -0,0 +1,47 @@
+import os
+import pandas as pd
+import pytest
+from config import ProcessingConfig
+from core.readers import get_reader
+from models import generate_meddra_file_mappings
+
+pytest.importorskip('pyarrow')
+
+from core.snapshots import SnapshotCache
+
+PT_LINES = ''.join(f'{10000000 + i}$Term {i % 7}$${10000000 + i % 3}$$$$$$$$\n' for i in range(25))
+
+def read(cache, path, **kwargs):
+    mapping = generate_meddra_file_mappings()['pt.asc']
+    reader = get_reader('pandas', cache.config)
+    return cache.read_chunks(
+        reader, str(path), 'checksum', mapping['columns'], 'utf-8',
+        dtypes=mapping['dtypes'], usecols=mapping['usecols'], **kwargs
+    )
+
+def test_snapshot_returns_the_chunks_parsed(tmp_path):
+    path = tmp_path / 'pt.asc'
+    path.write_text(PT_LINES)
+    cache = SnapshotCache(ProcessingConfig(snapshot_dir=str(tmp_path / 'cache'), batch_size=10))
+
+    parsed = list(read(cache, path))
+    assert [len(chunk.data) for chunk in parsed] == [10, 10, 5]
+    assert len(os.listdir(cache.cache_dir)) == 1
+    cached = list(read(cache, path))
+
+    assert [(c.start_offset, c.end_offset) for c in cached] == [(c.start_offset, c.end_offset) for c in parsed]
+    for parsed_chunk, cached_chunk in zip(parsed, cached):
+        pd.testing.assert_frame_equal(cached_chunk.data, parsed_chunk.data, check_categorical=False)
+
+    resumed = list(read(cache, path, start_offset=parsed[1].start_offset))
+    assert sum(len(chunk.data) for chunk in resumed) == 15
+
+def test_snapshot_is_only_written_for_files_read_to_the_end(tmp_path):
+    path = tmp_path / 'pt.asc'
+    path.write_text(PT_LINES)
+    cache = SnapshotCache(ProcessingConfig(snapshot_dir=str(tmp_path / 'cache'), batch_size=10))
+
+    chunks = read(cache, path)
+    next(chunks)
+    chunks.close()
+    assert os.listdir(cache.cache_dir) == []
@@ -0,0 +1,37 @@
+from sqlalchemy import inspect, select
+from config import ProcessingConfig
+from core.file_processor import FileProcessor
+from models import MeddraHltPrefComp
+
+TABLE = MeddraHltPrefComp.__table__
+
+def write_file(tmp_path, pt_codes):
+    path = tmp_path / 'hlt_pt.asc'
+    path.write_text(''.join(f"10000001${code}$\n" for code in pt_codes))
+    return str(path)
+
+def loaded_codes(db_manager):
+    with db_manager.session_scope() as session:
+        return sorted(int(code) for code in session.scalars(select(TABLE.c.pt_code).where(TABLE.c.version == 28.0)))
+
+def test_staging_load_replaces_the_version(tmp_path, db_manager):
+    config = ProcessingConfig(version=28.0, batch_size=2, writer='core', staging=True)
+    FileProcessor(db_manager, config).process(write_file(tmp_path, [20000001, 20000002, 20000003]))
+
+    result = FileProcessor(db_manager, config).process(write_file(tmp_path, [20000002, 20000004]))
+
+    assert result.success
+    assert result.records_processed == 2
+    assert loaded_codes(db_manager) == [20000002, 20000004]
+    assert not inspect(db_manager.engine).has_table(TABLE.name + '_staging')
+
+def test_failed_swap_keeps_the_live_rows(tmp_path, db_manager, fail_on_insert):
+    config = ProcessingConfig(version=28.0, batch_size=2, writer='core', staging=True)
+    FileProcessor(db_manager, config).process(write_file(tmp_path, [20000001, 20000002, 20000003]))
+    # Staged rows load fine; copying them into the live table fails
+    fail_on_insert(TABLE, 'pt_code', 20000005)
+
+    result = FileProcessor(db_manager, config).process(write_file(tmp_path, [20000004, 20000005]))
+
+    assert not result.success
+    assert loaded_codes(db_manager) == [20000001, 20000002, 20000003]
@@ -0,0 +1,38 @@
+import pandas as pd
+import pytest
+from config import ProcessingConfig
+from core.readers import available_readers, get_reader
+from core.validation import FileValidator
+from models import generate_meddra_file_mappings
+
+HLGT_LINES = [
+    b'10000001$Good one$$$$$$$$\n',
+    b'10000002$Too long$$$$$$$$$extra$\n',
+    b'10000003$Short\n',
+    b'\n',
+    b'10000004$Good two$$$$$$$$\r\n',
+    b'10000006$Nonempty tenth$$$$$$$$x\n',
+    b'10000008$Good three$$$$$$$$',
+]
+
+ENGINES = [reader_class.name for reader_class in available_readers()] + ['mmap']
+
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize('batch_size', [1, 5000])
+def test_dry_run_matches_the_rows_loaded(tmp_path, engine, batch_size):
+    path = tmp_path / 'hlgt.asc'
+    path.write_bytes(b''.join(HLGT_LINES))
+    config = ProcessingConfig(reader=engine, batch_size=batch_size)
+
+    result = FileValidator(config).validate(str(path))
+    assert result.error is None
+    assert result.counts['skipped_line'] == 2
+    assert result.counts['missing_fields'] == 1
+    assert [issue.line_number for issue in result.samples if issue.check == 'skipped_line'] == [2, 6]
+
+    mapping = generate_meddra_file_mappings(config.load_profile)['hlgt.asc']
+    chunks = get_reader(engine, config).read_chunks(
+        str(path), mapping['columns'], 'utf-8', dtypes=mapping['dtypes'], usecols=mapping['usecols']
+    )
+    rows = pd.concat([chunk.data for chunk in chunks], ignore_index=True)
+    assert len(rows) == result.lines - HLGT_LINES.count(b'\n') - result.counts['skipped_line']
@@ -0,0 +1,27 @@
+import pandas as pd
+import pytest
+from core.writers import CopyWriter
+from models import generate_meddra_file_mappings
+
+LLT = generate_meddra_file_mappings()['llt.asc']
+
+def test_copy_buffer_escapes_text_and_writes_nulls():
+    df = pd.DataFrame({
+        'llt_code': pd.array([10000001, None], dtype='Int64'),
+        'llt_name': pd.Series(['Tab\there', None], dtype='category'),
+        'llt_harts_code': pd.array([12.5, None], dtype='Float64'),
+        'llt_currency': pd.Series(['Back\\slash\nline', 'Y'], dtype=object),
+    })
+    payload = CopyWriter(None).prepare(df, LLT['model'])
+
+    assert payload.columns == ['llt_code', 'llt_name', 'llt_harts_code', 'llt_currency']
+    assert payload.row_count == 2
+    assert payload.buffer.getvalue() == (
+        '10000001\tTab\\there\t12.5\tBack\\\\slash\\nline\n'
+        '\\N\t\\N\t\\N\tY\n'
+    )
+
+def test_copy_buffer_rejects_fractional_integers():
+    df = pd.DataFrame({'llt_code': [10000001.5]})
+    with pytest.raises(ValueError):
+        CopyWriter(None).prepare(df, LLT['model'])
@@ -1,8 +1,24 @@
+import codecs
+import hashlib
+import mmap
 import os
-from typing import List, Generator
+from typing import Dict, List, Generator, Tuple
 from pathlib import Path
 from exceptions import FileProcessingError
 
+INSPECTION_BLOCK_SIZE = 8 * 1024 * 1024
+
+# Inspections by absolute path with the size and modification time they were made at,
+# so skipping unchanged files, loading and checking a file share a single pass
+_inspections: Dict[str, Tuple[Tuple[int, int], dict]] = {}
+
+# Files the models load (see models.generate_meddra_file_mappings), listed here so
+# the CLI can reject other files before importing the models
+MEDDRA_FILE_TYPES = (
+    'hlgt.asc', 'hlgt_hlt.asc', 'hlt.asc', 'hlt_pt.asc', 'intl_ord.asc', 'llt.asc', 'mdhier.asc',
+    'meddra_release.asc', 'pt.asc', 'smq_content.asc', 'smq_list.asc', 'soc.asc', 'soc_hlgt.asc',
+)
+
 def validate_file_path(file_path: str) -> None:
     """Validates that a file path exists and is readable."""
     if not os.path.exists(file_path):
@@ -41,47 +57,96 @@ def get_file_type_from_path(file_path: str) -> str:
     """Extracts file type from file path."""
     return Path(file_path).stem + Path(file_path).suffix.lower()
 
-def count_file_lines(file_path: str, encodings: List[str] = ['iso-8859-1', 'latin1', 'utf-8', 'cp1252']) -> int:
+def detect_encoding(sample: bytes, encodings: List[str] = ['utf-8', 'cp1252', 'latin1']) -> str:
     """
-    Counts the number of lines in a file trying different encodings.
+    Returns the first encoding able to decode a sample of the file.
     
-    Args:
-        file_path: Path to the file
-        encodings: List of encodings to try, in order of preference. For Spanish MedDRA files,
-                  'iso-8859-1' or 'latin1' should be tried first.
+    The sample may be cut in the middle of a multi-byte character, so a trailing
+    incomplete sequence is accepted. 'latin1' decodes any byte and is the last resort
+    for Spanish MedDRA files.
     """
-    validate_file_path(file_path)
-    
-    last_error = None
     for encoding in encodings:
         try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                return sum(1 for _ in f)
-        except UnicodeDecodeError as e:
-            last_error = e
-            print(f"Failed to decode with {encoding}, trying next encoding...")
+            decoder = codecs.getincrementaldecoder(encoding)()
+            decoder.decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
             continue
-        except Exception as e:
-            raise FileProcessingError(file_path, e)
-            
-    # If we get here, none of the encodings worked
-    raise FileProcessingError(
-        file_path,
-        last_error or UnicodeDecodeError(
-            'utf-8', b'', 0, 1,
-            f"Could not decode file with any of these encodings: {', '.join(encodings)}"
-        )
+    
+    raise UnicodeDecodeError(
+        encodings[-1], sample, 0, len(sample),
+        f"Could not decode file with any of these encodings: {', '.join(encodings)}"
     )
 
-def get_file_info(file_path: str) -> dict:
-    """Gets basic information about a file."""
+def inspect_file(file_path: str) -> dict:
+    """
+    Inspects a file in a single pass over its raw bytes.
+    
+    The file is memory-mapped and scanned block by block to count newlines and
+    compute a SHA-256 checksum. The encoding is decided from the first block that
+    contains non-ASCII bytes; pure ASCII files are reported as 'utf-8'. The result
+    is reused until the file's size or modification time changes.
+    """
     validate_file_path(file_path)
     
     stat = os.stat(file_path)
+    key = os.path.abspath(file_path)
+    signature = (stat.st_size, stat.st_mtime_ns)
+    cached = _inspections.get(key)
+    if cached is None or cached[0] != signature:
+        cached = _inspections[key] = (signature, _scan_file(file_path, stat.st_size))
+    return dict(cached[1])
+
+def _scan_file(file_path: str, size: int) -> dict:
+    """Counts the lines, computes the checksum and detects the encoding of a file."""
+    checksum = hashlib.sha256()
+    newline_count = 0
+    encoding = None
+    last_byte = b''
+    
+    try:
+        if size > 0:
+            with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for offset in range(0, size, INSPECTION_BLOCK_SIZE):
+                    block = mm[offset:offset + INSPECTION_BLOCK_SIZE]
+                    checksum.update(block)
+                    newline_count += block.count(b'\n')
+                    
+                    if encoding is None and not block.isascii():
+                        # Blocks after the first may start in the middle of a UTF-8 character
+                        start = 0
+                        while offset and start < 3 and 0x80 <= block[start] <= 0xBF:
+                            start += 1
+                        encoding = detect_encoding(block[start:])
+                
+                last_byte = mm[size - 1:size]
+    except Exception as e:
+        raise FileProcessingError(file_path, e)
+    
+    # A last line without a trailing newline still counts as a line
+    line_count = newline_count + (1 if last_byte and last_byte != b'\n' else 0)
+    
+    return {
+        'size': size,
+        'line_count': line_count,
+        'encoding': encoding or 'utf-8',
+        'checksum': checksum.hexdigest()
+    }
+
+def count_file_lines(file_path: str) -> int:
+    """Counts the number of lines in a file on its raw bytes, without decoding it."""
+    return inspect_file(file_path)['line_count']
+
+def get_file_info(file_path: str) -> dict:
+    """Gets basic information about a file."""
+    inspection = inspect_file(file_path)
+    
     return {
         'path': file_path,
         'name': os.path.basename(file_path),
-        'size': stat.st_size,
+        'size': inspection['size'],
         'type': get_file_type_from_path(file_path),
-        'line_count': count_file_lines(file_path)
-    }
\ No newline at end of file
+        'line_count': inspection['line_count'],
+        'encoding': inspection['encoding'],
+        'checksum': inspection['checksum']
+    }
@@ -0,0 +1,144 @@
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Stages of a batch, in the order they run
+STAGES = ('read', 'preprocess', 'records', 'flush', 'commit')
+
+def current_rss_mb() -> float:
+    """Returns the resident set size of this process, or its peak where that is all there is."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+def peak_rss_mb() -> float:
+    """Returns the peak resident set size of this process so far."""
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+def build_run_report(results: Iterable[Tuple[str, Any]], config, started_at: datetime,
+                     elapsed: float) -> Dict[str, Any]:
+    """
+    Builds the run report from the (file_path, ProcessorResult) pairs of a run.
+
+    Each loaded file contributes the metrics its progress tracker collected:
+    totals, rates, peak memory, time per stage and one entry per batch.
+    """
+    processing = config.processing
+    files = []
+    for file_path, result in results:
+        entry = {
+            'file_path': file_path,
+            'success': result.success,
+            'records_processed': result.records_processed,
+            'error': None if result.success else str(result.error),
+        }
+        entry.update(result.details.get('metrics', {}))
+        for key in ('batch_sizing', 'profile'):
+            if key in result.details:
+                entry[key] = result.details[key]
+        files.append(entry)
+
+    return {
+        'started_at': started_at.isoformat(timespec='seconds'),
+        'elapsed_seconds': elapsed,
+        'config': {
+            'version': processing.version,
+            'language': processing.language,
+            'batch_size': 'auto' if processing.adaptive_batch_size else processing.batch_size,
+            'target_batch_seconds': processing.target_batch_seconds,
+            'memory_budget_mb': processing.memory_budget_mb,
+            'reader': processing.reader,
+            'writer': processing.writer,
+            'backend': processing.backend,
+            'load_profile': processing.load_profile,
+            'jobs': processing.jobs,
+            'pipeline_workers': processing.pipeline_workers,
+            'profile': processing.profile,
+        },
+        'totals': {
+            'files': len(files),
+            'failed_files': sum(1 for entry in files if not entry['success']),
+            'records': sum(entry['records_processed'] for entry in files),
+            'stage_seconds': {
+                stage: sum(entry.get('stages', {}).get(stage, {}).get('seconds', 0.0) for entry in files)
+                for stage in STAGES
+            },
+            'peak_rss_mb': max([entry.get('peak_rss_mb', 0.0) for entry in files] + [peak_rss_mb()]),
+        },
+        'files': files,
+    }
+
+def write_run_report(report: Dict[str, Any], path: str) -> None:
+    """Writes the run report as JSON."""
+    _write_atomically(path, json.dumps(report, indent=2, default=str))
+
+def write_prometheus_textfile(report: Dict[str, Any], path: str) -> None:
+    """
+    Writes the run report in the Prometheus text format.
+
+    The file is replaced atomically, as the node_exporter textfile collector expects.
+    """
+    metrics: List[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]] = [
+        ('meddra_load_success', 'gauge', 'Whether the last load of the file succeeded', []),
+        ('meddra_load_records', 'gauge', 'Records loaded from the file', []),
+        ('meddra_load_bytes', 'gauge', 'Bytes of the file read', []),
+        ('meddra_load_duration_seconds', 'gauge', 'Wall time spent loading the file', []),
+        ('meddra_load_records_per_second', 'gauge', 'Records loaded per second', []),
+        ('meddra_load_bytes_per_second', 'gauge', 'Bytes read per second', []),
+        ('meddra_load_peak_rss_bytes', 'gauge', 'Highest resident memory seen while loading the file', []),
+        ('meddra_load_stage_seconds', 'gauge', 'Time spent in each stage of the batches of the file', []),
+    ]
+    samples = {name: values for name, _, _, values in metrics}
+
+    for entry in report['files']:
+        labels = {'file': os.path.basename(entry['file_path'])}
+        samples['meddra_load_success'].append((labels, 1.0 if entry['success'] else 0.0))
+        samples['meddra_load_records'].append((labels, entry['records_processed']))
+        if 'elapsed_seconds' not in entry:
+            continue
+        samples['meddra_load_bytes'].append((labels, entry['bytes']))
+        samples['meddra_load_duration_seconds'].append((labels, entry['elapsed_seconds']))
+        samples['meddra_load_records_per_second'].append((labels, entry['rows_per_sec']))
+        samples['meddra_load_bytes_per_second'].append((labels, entry['bytes_per_sec']))
+        samples['meddra_load_peak_rss_bytes'].append((labels, entry['peak_rss_mb'] * 2 ** 20))
+        for stage, stage_metrics in entry['stages'].items():
+            samples['meddra_load_stage_seconds'].append(({**labels, 'stage': stage}, stage_metrics['seconds']))
+
+    lines = []
+    for name, metric_type, help_text, values in metrics:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for labels, value in values:
+            rendered = ','.join(f'{key}="{_escape_label(label)}"' for key, label in labels.items())
+            lines.append(f"{name}{{{rendered}}} {float(value or 0.0)!r}")
+
+    lines.append("# HELP meddra_load_last_run_timestamp_seconds When the last load finished")
+    lines.append("# TYPE meddra_load_last_run_timestamp_seconds gauge")
+    lines.append(f"meddra_load_last_run_timestamp_seconds {time.time():.0f}")
+    _write_atomically(path, '\n'.join(lines) + '\n')
+
+def report_directory(report_path: Optional[str]) -> str:
+    """Returns the directory files belonging to a run report are written to."""
+    return os.path.dirname(os.path.abspath(report_path)) if report_path else os.getcwd()
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _write_atomically(path: str, content: str) -> None:
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, 'w') as f:
+        f.write(content)
+    os.replace(temporary_path, path)
@@ -0,0 +1,156 @@
+import cProfile
+import os
+import pstats
+import threading
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Lines kept in the text reports
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+
+# Seconds between memory samples, and the growth over the largest sample that takes a new snapshot
+SAMPLE_INTERVAL = 0.05
+SAMPLE_GROWTH = 1.05
+
+class PeakSampler:
+    """
+    Keeps a tracemalloc snapshot of the largest traced memory seen while a load runs.
+
+    tracemalloc only records the size of its peak, not what was allocated then, so a
+    background thread polls the traced memory and takes a new snapshot whenever it
+    grows past the largest sample. The snapshot kept is the closest to the peak.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL, growth: float = SAMPLE_GROWTH):
+        self.interval = interval
+        self.growth = growth
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self.snapshot_size = 0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='meddra-peak-sampler', daemon=True)
+
+    def start(self) -> None:
+        self._sample()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+        self._sample()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self._sample()
+
+    def _sample(self) -> None:
+        current, _ = tracemalloc.get_traced_memory()
+        if self.snapshot is None or current > self.snapshot_size * self.growth:
+            self.snapshot = tracemalloc.take_snapshot()
+            self.snapshot_size = current
+
+class FileProfiler:
+    """
+    Runs the load of one file under cProfile and/or tracemalloc and writes its reports.
+
+    - cpu: <name>.pstats (for pstats or snakeviz) and <name>.cpu.txt, the top
+      functions by cumulative time over every thread of the load
+    - mem: <name>.allocations.txt, the peak traced memory and the lines holding the
+      most memory at the sample closest to it
+
+    cProfile only sees the thread it is enabled on, so each thread started during the
+    load (pipeline reader and writers, asyncio.to_thread workers) gets its own
+    profiler, and their stats are merged into the report.
+    """
+
+    def __init__(self, mode: str, output_dir: str, name: str):
+        self.cpu = mode in ('cpu', 'both')
+        self.memory = mode in ('mem', 'both')
+        self.output_dir = output_dir
+        self.name = name
+        self._thread_profilers: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def run(self, func: Callable, *args, **kwargs) -> Tuple[Any, Dict[str, str]]:
+        """Calls func under the profilers, returning its result and the reports written."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        outputs = {}
+
+        started_tracing = False
+        sampler = None
+        if self.memory:
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            sampler = PeakSampler()
+            sampler.start()
+
+        profiler = cProfile.Profile() if self.cpu else None
+        if profiler:
+            threading.setprofile(self._profile_thread)
+        try:
+            if profiler:
+                result = profiler.runcall(func, *args, **kwargs)
+            else:
+                result = func(*args, **kwargs)
+        finally:
+            if profiler:
+                threading.setprofile(None)
+            if sampler:
+                sampler.stop()
+                _, peak = tracemalloc.get_traced_memory()
+                if started_tracing:
+                    tracemalloc.stop()
+                outputs['allocations'] = self._write_allocations(sampler, peak)
+            if profiler:
+                outputs.update(self._write_cpu(profiler))
+
+        for kind, path in outputs.items():
+            print(f"Profile ({kind}) written to {path}")
+        return result, outputs
+
+    def _profile_thread(self, frame, event, arg) -> None:
+        """Starts a profiler on a new thread, on its first profiling event."""
+        profiler = cProfile.Profile()
+        try:
+            # Replaces this hook for the rest of the thread
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ profiles every thread with the profiler already running
+            return
+        with self._lock:
+            self._thread_profilers.append(profiler)
+
+    def _path(self, suffix: str) -> str:
+        return os.path.join(self.output_dir, f"{self.name}{suffix}")
+
+    def _write_cpu(self, profiler: cProfile.Profile) -> Dict[str, str]:
+        stats = pstats.Stats(profiler)
+        with self._lock:
+            for thread_profiler in self._thread_profilers:
+                stats.add(thread_profiler)
+            self._thread_profilers.clear()
+
+        stats_path = self._path('.pstats')
+        stats.dump_stats(stats_path)
+
+        summary_path = self._path('.cpu.txt')
+        with open(summary_path, 'w') as f:
+            stats.stream = f
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP_FUNCTIONS)
+        return {'pstats': stats_path, 'cpu': summary_path}
+
+    def _write_allocations(self, sampler: PeakSampler, peak: int) -> str:
+        # Leave out the allocations of tracemalloc itself
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        statistics = sampler.snapshot.filter_traces(filters).statistics('lineno')
+
+        path = self._path('.allocations.txt')
+        with open(path, 'w') as f:
+            f.write(f"Peak traced memory: {peak / 2 ** 20:.1f} MB\n")
+            f.write(f"Top {TOP_ALLOCATIONS} lines by memory held at the largest sample "
+                    f"({sampler.snapshot_size / 2 ** 20:.1f} MB):\n")
+            for statistic in statistics[:TOP_ALLOCATIONS]:
+                f.write(f"{statistic}\n")
+        return path
@@ -1,24 +1,97 @@
-from typing import Optional
+import time
+from typing import Any, Callable, Dict, List, Optional
 from datetime import datetime
+from utils.metrics import STAGES, current_rss_mb
 
 class ProgressTracker:
-    """Tracks progress of batch processing operations."""
+    """
+    Tracks progress of batch processing operations.
+
+    Besides progress, it collects the metrics of the run report: the time each batch
+    spent in every stage, rows and bytes per second and the peak resident memory.
+    Progress lines are printed at most once every print_interval seconds.
+    """
     
-    def __init__(self, total_items: int, operation_name: str = "Processing"):
+    def __init__(self, total_items: int, operation_name: str = "Processing", total_bytes: Optional[int] = None,
+                 print_interval: float = 0.0):
         self.total_items = total_items
+        self.total_bytes = total_bytes
         self.operation_name = operation_name
+        self.print_interval = print_interval
         self.processed_items = 0
+        self.processed_bytes = 0
         self.current_batch = 0
         self.start_time = datetime.now()
+        self.stage_seconds = dict.fromkeys(STAGES, 0.0)
+        self.batches: List[Dict[str, Any]] = []
+        self.rows = 0
+        self.bytes = 0
+        self.peak_rss_mb = current_rss_mb()
+        # Called with each recorded batch, such as by the adaptive batch size controller
+        self.listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._last_print: Optional[float] = None
+        self._printed_complete = False
         
-    def update(self, batch_number: int, batch_size: int, items_processed: int) -> None:
+    def update(self, batch_number: int, batch_size: int, items_processed: int,
+               bytes_processed: Optional[int] = None) -> None:
         """Updates progress tracking."""
 
         self.current_batch = batch_number
         self.processed_items = items_processed
+        if bytes_processed is not None:
+            self.processed_bytes = bytes_processed
+    
+    def record_batch(self, batch_number: int, rows: int, size: int, timings: Dict[str, float]) -> None:
+        """Records the rows, bytes and time per stage of a written batch."""
+        rss_mb = current_rss_mb()
+        self.peak_rss_mb = max(self.peak_rss_mb, rss_mb)
+        self.rows += rows
+        self.bytes += size
+        for stage, seconds in timings.items():
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+        
+        batch = {
+            'batch_number': batch_number,
+            'rows': rows,
+            'bytes': size,
+            'seconds': {stage: round(seconds, 6) for stage, seconds in timings.items()},
+            'rss_mb': round(rss_mb, 1)
+        }
+        self.batches.append(batch)
+        for listener in self.listeners:
+            listener(batch)
+    
+    def summary(self) -> Dict[str, Any]:
+        """Returns the metrics collected for the run report."""
+        elapsed = self.get_elapsed_time()
+        return {
+            'elapsed_seconds': elapsed,
+            'rows': self.rows,
+            'bytes': self.bytes,
+            'rows_per_sec': self.rows / elapsed if elapsed else None,
+            'bytes_per_sec': self.bytes / elapsed if elapsed else None,
+            'peak_rss_mb': self.peak_rss_mb,
+            'stages': {
+                stage: {
+                    'seconds': seconds,
+                    'rows_per_sec': self.rows / seconds if seconds else None
+                }
+                for stage, seconds in self.stage_seconds.items()
+            },
+            'batches': sorted(self.batches, key=lambda batch: batch['batch_number'])
+        }
+    
+    def _tracks_bytes(self) -> bool:
+        """Progress is measured on bytes consumed when the total size is known."""
+        return self.total_bytes is not None
         
     def get_progress_percentage(self) -> int:
         """Calculates progress percentage."""
+        if self._tracks_bytes():
+            if self.total_bytes == 0:
+                return 100
+            return min(100, int((self.processed_bytes / self.total_bytes) * 100))
+        
         if self.total_items == 0:
             return 100
 
@@ -30,12 +103,17 @@ class ProgressTracker:
     
     def get_estimated_time_remaining(self) -> Optional[float]:
         """Estimates remaining time in seconds."""
-        if self.processed_items == 0:
+        if self._tracks_bytes():
+            processed, total = self.processed_bytes, self.total_bytes
+        else:
+            processed, total = self.processed_items, self.total_items
+        
+        if processed == 0:
             return None
         
         elapsed = self.get_elapsed_time()
-        rate = self.processed_items / elapsed
-        remaining_items = self.total_items - self.processed_items
+        rate = processed / elapsed
+        remaining_items = total - processed
         
         if rate > 0:
             return remaining_items / rate
@@ -55,12 +133,24 @@ class ProgressTracker:
             
         return message
     
-    def print_progress(self) -> None:
-        """Prints current progress."""
+    def print_progress(self, force: bool = False) -> None:
+        """Prints current progress, unless a line was printed less than print_interval seconds ago."""
+        now = time.monotonic()
+        complete = self.is_complete()
+        if complete and self._printed_complete:
+            return
+        if not force and not complete and self._last_print is not None \
+                and now - self._last_print < self.print_interval:
+            return
+        
+        self._last_print = now
+        self._printed_complete = complete
         print(self.format_progress_message())
     
     def is_complete(self) -> bool:
         """Checks if processing is complete."""
+        if self._tracks_bytes():
+            return self.processed_bytes >= self.total_bytes
         return self.processed_items >= self.total_items
 
 def format_file_size(size_bytes: int) -> str: